@@ -0,0 +1,225 @@
+"""
+Compact text digest of the latest metrics for grounding the AI assistant.
+
+The digest is a list of short lines (national overviews per disease plus one
+line per state), built once per data generation and stored in app_meta. For each
+question, only the lines whose state or topic the question mentions are picked,
+up to a token budget, so prompts never query or format the whole database.
+"""
+import json
+import os
+import re
+import sqlite3
+import threading
+
+import numpy as np
+
+from Backend.db import read_data_generation
+from Backend.derived_metrics import get_derived_metrics
+
+DIGEST_KEY = "ai_digest"
+DIGEST_TOKEN_BUDGET = int(os.environ.get("AI_DIGEST_TOKEN_BUDGET", "600"))
+TOP_N = 5
+
+TOPIC_KEYWORDS = {
+    "covid": ("covid", "coronavirus", "sars-cov-2", "positivity", "cases"),
+    "rsv": ("rsv", "respiratory syncytial", "syncytial")
+}
+# Questions about rankings or trends get the national overview lines
+OVERVIEW_KEYWORDS = (
+    "highest", "lowest", "most", "least", "top", "worst", "best", "rank", "which state",
+    "compare", "trend", "rising", "falling", "increas", "decreas", "national", "average",
+    "season", "latest", "current", "this week"
+)
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def estimate_tokens(text):
+    """Rough token count (about four characters per token for English text)"""
+    return len(text) // 4 + 1
+
+
+def _ranked(values, fmt):
+    ranked = sorted(values.items(), key=lambda item: item[1], reverse=True)
+    top = ", ".join(f"{state} ({fmt(value)})" for state, value in ranked[:TOP_N])
+    bottom = ", ".join(f"{state} ({fmt(value)})" for state, value in ranked[-TOP_N:][::-1])
+    return top, bottom
+
+
+def _latest_values(conn, metric_type, period):
+    rows = conn.execute(
+        "SELECT state, metric_value FROM state_metrics WHERE metric_type = ? AND year = ? AND metric_value IS NOT NULL",
+        (metric_type, period)
+    ).fetchall()
+    return {state: float(value) for state, value in rows}
+
+
+def _rsv_latest(conn):
+    """Latest week per state with its 4-week average and week-over-week growth, plus season context"""
+    frame = get_derived_metrics("RSV_Rate", conn=conn)
+    frame = frame[frame["week"].notna()]
+    if frame.empty:
+        return None
+    latest_week = frame["week"].max()
+    latest = frame[frame["week"] == latest_week].set_index("state")
+
+    # Seasons run October to September
+    season_start = latest_week.replace(month=10, day=1)
+    if latest_week.month < 10:
+        season_start = season_start.replace(year=latest_week.year - 1)
+    season = frame[frame["week"] >= season_start]
+    peaks = season.loc[season.groupby("state")["metric_value"].idxmax()].set_index("state")
+
+    national = frame.groupby("week")["metric_value"].mean()
+    return {
+        "week": latest_week.strftime("%Y-%m-%d"),
+        "season_start": season_start.strftime("%Y-%m-%d"),
+        "latest": latest,
+        "peaks": peaks,
+        "national_now": float(national.iloc[-4:].mean()),
+        "national_before": float(national.iloc[-8:-4].mean()) if len(national) >= 8 else np.nan
+    }
+
+
+def build_digest(conn):
+    """Digest entries ({'topic', 'state', 'text'}) from an open connection"""
+    entries = []
+    positivity = _latest_values(conn, "COVID_Positivity", "Past 4 Weeks")
+    cases = _latest_values(conn, "COVID_Cases", "Current")
+    rsv = _rsv_latest(conn)
+
+    if positivity:
+        top, bottom = _ranked(positivity, lambda v: f"{v:.1f}%")
+        entries.append({"topic": "covid", "state": None, "text":
+                        f"COVID-19 test positivity, past 4 weeks: national average "
+                        f"{np.mean(list(positivity.values())):.1f}%. Highest: {top}. Lowest: {bottom}."})
+    if cases:
+        top, _ = _ranked(cases, lambda v: f"{v:,.0f}")
+        entries.append({"topic": "covid", "state": None, "text":
+                        f"COVID-19 cases (current totals): highest: {top}."})
+    if rsv is not None:
+        rates = rsv["latest"]["metric_value"].dropna().to_dict()
+        top, bottom = _ranked(rates, lambda v: f"{v:.2f}")
+        entries.append({"topic": "rsv", "state": None, "text":
+                        f"RSV hospitalization rate per 100k, week ending {rsv['week']}: national average "
+                        f"{np.mean(list(rates.values())):.2f}. Highest: {top}. Lowest: {bottom}."})
+        peaks = rsv["peaks"]["metric_value"].to_dict()
+        top, _ = _ranked(peaks, lambda v: f"{v:.2f}")
+        entries.append({"topic": "rsv", "state": None, "text":
+                        f"RSV season since {rsv['season_start']}: highest weekly rate so far: {top}."})
+        if not np.isnan(rsv["national_before"]) and rsv["national_before"] > 0:
+            change = rsv["national_now"] / rsv["national_before"] - 1
+            direction = "up" if change >= 0 else "down"
+            entries.append({"topic": "rsv", "state": None, "text":
+                            f"RSV trend: national 4-week average {rsv['national_now']:.2f} per 100k, "
+                            f"{direction} {abs(change):.0%} from the 4 weeks before."})
+
+    states = set(positivity) | set(cases) | (set(rsv["latest"].index) if rsv is not None else set())
+    for state in sorted(states):
+        parts = []
+        if state in positivity:
+            parts.append(f"COVID positivity {positivity[state]:.1f}%")
+        if state in cases:
+            parts.append(f"COVID cases {cases[state]:,.0f}")
+        if rsv is not None and state in rsv["latest"].index:
+            row = rsv["latest"].loc[state]
+            detail = f"4-wk avg {row['rolling_4wk']:.2f}"
+            if not np.isnan(row["wow_growth"]):
+                detail += f", {row['wow_growth']:+.0%} week over week"
+            parts.append(f"RSV rate {row['metric_value']:.2f} per 100k (week ending {rsv['week']}, {detail})")
+            if state in rsv["peaks"].index:
+                peak = rsv["peaks"].loc[state]
+                parts.append(f"season peak {peak['metric_value']:.2f} (week ending {peak['week'].strftime('%Y-%m-%d')})")
+        entries.append({"topic": None, "state": state, "text": f"{state}: " + "; ".join(parts) + "."})
+    return entries
+
+
+def refresh_digest(db_name="health_data.db"):
+    """Rebuild the digest for the current data generation and store it in app_meta"""
+    conn = sqlite3.connect(db_name)
+    try:
+        generation = read_data_generation(conn)
+        entries = build_digest(conn)
+        conn.execute(
+            "INSERT INTO app_meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (DIGEST_KEY, json.dumps({"generation": generation, "entries": entries}))
+        )
+        conn.commit()
+        with _cache_lock:
+            _cache[db_name] = (generation, entries)
+        return entries
+    finally:
+        conn.close()
+
+
+def get_digest(db_name="health_data.db"):
+    """Digest entries for the current data generation (memory, then app_meta, then rebuilt)"""
+    try:
+        conn = sqlite3.connect(db_name)
+        try:
+            generation = read_data_generation(conn)
+            with _cache_lock:
+                cached = _cache.get(db_name)
+            if cached is not None and cached[0] == generation:
+                return cached[1]
+            row = conn.execute("SELECT value FROM app_meta WHERE key = ?", (DIGEST_KEY,)).fetchone()
+        finally:
+            conn.close()
+        if row:
+            stored = json.loads(row[0])
+            if stored.get("generation") == generation:
+                with _cache_lock:
+                    _cache[db_name] = (generation, stored["entries"])
+                return stored["entries"]
+        return refresh_digest(db_name)
+    except (sqlite3.Error, ValueError) as e:
+        print(f"Error loading AI data digest: {e}")
+        return []
+
+
+def select_context(entries, question, token_budget=DIGEST_TOKEN_BUDGET):
+    """
+    Digest lines relevant to `question`, within `token_budget`: lines for the
+    states it names first, then the overviews of the diseases it mentions (all
+    overviews for ranking/trend questions). Empty if nothing matches.
+    """
+    text = question.lower()
+    topics = {topic for topic, words in TOPIC_KEYWORDS.items() if any(word in text for word in words)}
+    wants_overview = any(word in text for word in OVERVIEW_KEYWORDS)
+
+    # Longest names first, blanking each match, so "Virginia" doesn't also match
+    # inside "West Virginia" but still does when the question names both
+    remaining = text
+    named = set()
+    for state in sorted({entry["state"] for entry in entries if entry["state"]}, key=len, reverse=True):
+        pattern = rf"\b{re.escape(state.lower())}\b"
+        if re.search(pattern, remaining):
+            named.add(state)
+            remaining = re.sub(pattern, " ", remaining)
+    states = [entry for entry in entries if entry["state"] in named]
+
+    overview_topics = topics or (set(TOPIC_KEYWORDS) if wants_overview or states else set())
+    if states and not wants_overview:
+        overview_topics = set()
+    overviews = [entry for entry in entries if entry["state"] is None and entry["topic"] in overview_topics]
+
+    selected = []
+    used = 0
+    for entry in states + overviews:
+        cost = estimate_tokens(entry["text"])
+        if used + cost > token_budget:
+            break
+        selected.append(entry["text"])
+        used += cost
+    return "\n".join(selected)
+
+
+def build_prompt_context(question, db_name="health_data.db", token_budget=DIGEST_TOKEN_BUDGET):
+    """System-prompt addition with the data relevant to `question`, or "" """
+    context = select_context(get_digest(db_name), question, token_budget)
+    if not context:
+        return ""
+    return ("Latest figures from the Diseases Data Tracker database (cite them when relevant, "
+            "and say when a question goes beyond them):\n" + context)
@@ -0,0 +1,133 @@
+"""
+SQLite cache of complete AI assistant answers.
+
+Entries are keyed on the normalized prompt, model, system prompt and data
+generation, so new data or a different prompt setup never serves an old answer.
+Entries expire after AI_CACHE_TTL_HOURS, and the least recently used ones are
+dropped beyond AI_CACHE_MAX_ENTRIES. Hit/miss counters persist in app_meta.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+
+from Backend.db import create_meta_table
+
+AI_CACHE_TTL_SECONDS = float(os.environ.get("AI_CACHE_TTL_HOURS", "24")) * 3600
+AI_CACHE_MAX_ENTRIES = int(os.environ.get("AI_CACHE_MAX_ENTRIES", "500"))
+
+HITS_KEY = "ai_cache_hits"
+MISSES_KEY = "ai_cache_misses"
+
+
+def normalize_prompt(prompt):
+    """Case, spacing and trailing punctuation don't change the question"""
+    return re.sub(r"\s+", " ", prompt).strip().lower().rstrip("?!. ")
+
+
+def make_cache_key(prompt, model, system_prompt, generation):
+    payload = json.dumps([normalize_prompt(prompt), model, system_prompt, generation])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, db_name="health_data.db", ttl_seconds=AI_CACHE_TTL_SECONDS,
+                 max_entries=AI_CACHE_MAX_ENTRIES):
+        self.db_name = str(db_name)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        conn = sqlite3.connect(self.db_name)
+        try:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS ai_response_cache (
+                    key TEXT PRIMARY KEY,
+                    model TEXT,
+                    generation INTEGER,
+                    response TEXT,
+                    created_at REAL,
+                    last_used REAL,
+                    hits INTEGER DEFAULT 0
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_ai_response_cache_last_used ON ai_response_cache (last_used)")
+            conn.commit()
+        finally:
+            conn.close()
+        create_meta_table(self.db_name)
+
+    def _count(self, conn, counter_key):
+        conn.execute("""
+            INSERT INTO app_meta (key, value) VALUES (?, '1')
+            ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1
+        """, (counter_key,))
+
+    def get(self, prompt, model, system_prompt, generation):
+        """Cached answer, or None (counted as a miss)"""
+        key = make_cache_key(prompt, model, system_prompt, generation)
+        now = time.time()
+        conn = sqlite3.connect(self.db_name)
+        try:
+            row = conn.execute(
+                "SELECT response FROM ai_response_cache WHERE key = ? AND created_at >= ?",
+                (key, now - self.ttl_seconds)
+            ).fetchone()
+            if row is None:
+                self._count(conn, MISSES_KEY)
+            else:
+                conn.execute("UPDATE ai_response_cache SET last_used = ?, hits = hits + 1 WHERE key = ?", (now, key))
+                self._count(conn, HITS_KEY)
+            conn.commit()
+            return row[0] if row else None
+        except sqlite3.Error as e:
+            print(f"Error reading AI response cache: {e}")
+            return None
+        finally:
+            conn.close()
+
+    def put(self, prompt, model, system_prompt, generation, response):
+        if not response.strip():
+            return
+        key = make_cache_key(prompt, model, system_prompt, generation)
+        now = time.time()
+        conn = sqlite3.connect(self.db_name)
+        try:
+            conn.execute("""
+                INSERT OR REPLACE INTO ai_response_cache (key, model, generation, response, created_at, last_used, hits)
+                VALUES (?, ?, ?, ?, ?, ?, 0)
+            """, (key, model, generation, response, now, now))
+            self._evict(conn, now)
+            conn.commit()
+        except sqlite3.Error as e:
+            print(f"Error writing AI response cache: {e}")
+        finally:
+            conn.close()
+
+    def _evict(self, conn, now):
+        conn.execute("DELETE FROM ai_response_cache WHERE created_at < ?", (now - self.ttl_seconds,))
+        conn.execute("""
+            DELETE FROM ai_response_cache WHERE key IN (
+                SELECT key FROM ai_response_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?
+            )
+        """, (self.max_entries,))
+
+    def stats(self):
+        """{'hits', 'misses', 'hit_rate', 'entries'}"""
+        conn = sqlite3.connect(self.db_name)
+        try:
+            counters = dict(conn.execute(
+                "SELECT key, value FROM app_meta WHERE key IN (?, ?)", (HITS_KEY, MISSES_KEY)
+            ).fetchall())
+            entries = conn.execute("SELECT COUNT(*) FROM ai_response_cache").fetchone()[0]
+        finally:
+            conn.close()
+        hits = int(counters.get(HITS_KEY, 0))
+        misses = int(counters.get(MISSES_KEY, 0))
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "entries": entries
+        }
@@ -0,0 +1,176 @@
+"""
+Figure builders for the stats page and report.py. Kept free of Qt so they can run
+on worker threads (each with its own sqlite connection) and from the CLI.
+"""
+import pandas as pd
+import plotly.graph_objects as go
+
+from Backend.derived_metrics import get_derived_metrics
+from Backend.downsample import lttb_indices
+from Backend.metric_queries import get_date_bounds, query_metric_range
+
+
+def load_date_bounds(conn, metric='RSV_Rate'):
+    """(first, last) ISO dates with data for `metric` (read-only; create_tables migrates older databases)"""
+    return get_date_bounds(conn, metric)
+
+
+def build_covid_figure(conn):
+    """COVID cases bar chart, or None if there is nothing to show"""
+    query = "SELECT state, metric_value FROM state_metrics WHERE metric_type = 'COVID_Cases' AND year = 'Current'"
+    data = pd.read_sql(query, conn)
+    
+    data = data[data['metric_value'] > 0]
+    
+    if data.empty:
+        return None
+    
+    data = data.sort_values('metric_value', ascending=False)
+    
+    fig = go.Figure(data=[
+        go.Bar(
+            x=data['state'], 
+            y=data['metric_value'],
+            marker_color='#1f77b4',  
+            hovertemplate='<b>%{x}</b><br>Cases: %{y:,.0f}<extra></extra>'
+        )
+    ])
+    
+    fig.update_layout(
+        title={
+            'text': 'COVID-19 Cases by State',
+            'font': {'color': 'white', 'size': 20}
+        },
+        xaxis_title={'text': 'State', 'font': {'color': 'white', 'size': 14}},
+        yaxis_title={'text': 'Number of Cases', 'font': {'color': 'white', 'size': 14}},
+        xaxis={'tickfont': {'color': 'white'}},
+        yaxis={'tickfont': {'color': 'white'}},
+        plot_bgcolor='#27293D',  
+        paper_bgcolor='#27293D',
+        margin=dict(l=40, r=40, t=60, b=40),
+    )
+    return fig
+
+
+def build_rsv_figure(conn, start_date, end_date, granularity='weekly'):
+    """
+    Estimated RSV cases bar chart for the first week (or month) each state
+    reports inside [start_date, end_date], or None
+    """
+    # Estimated counts come from the shared derived-metrics cache (recomputed once per data generation)
+    derived = get_derived_metrics('RSV_Rate', conn=conn)
+    dated = derived[derived['week_date'].notna()]
+    in_range = dated[(dated['week_date'] >= start_date) & (dated['week_date'] <= end_date)]
+    if in_range.empty:
+        return None
+    
+    if granularity == 'monthly':
+        periods = in_range['week_date'].str[:7] + '-01'
+    else:
+        periods = in_range['week_date']
+    by_period = (in_range.assign(year=periods)
+                 .groupby(['state', 'year'], as_index=False)['estimated_count'].mean())
+    
+    # Sorted by state then period, so the first row per state is its first period
+    rsv_data = by_period.groupby('state', sort=False).head(1)
+    rsv_data = rsv_data[rsv_data['estimated_count'] > 0]
+    
+    if rsv_data.empty:
+        return None
+    
+    rsv_data = rsv_data.sort_values('estimated_count', ascending=False)
+    
+    fig = go.Figure(data=[
+        go.Bar(
+            x=rsv_data['state'], 
+            y=rsv_data['estimated_count'],
+            customdata=rsv_data['year'],
+            marker_color='#ff7f0e',  
+            hovertemplate='<b>%{x}</b><br>Cases (thousands): %{y:,.1f}<br>Period: %{customdata}<extra></extra>'
+        )
+    ])
+    
+    fig.update_layout(
+        title={
+            'text': f'Estimated RSV Cases by State (in thousands) ({start_date} to {end_date})',
+            'font': {'color': 'white', 'size': 20}
+        },
+        xaxis_title={'text': 'State', 'font': {'color': 'white', 'size': 14}},
+        yaxis_title={'text': 'Estimated Cases (thousands)', 'font': {'color': 'white', 'size': 14}},
+        xaxis={'tickfont': {'color': 'white'}},
+        yaxis={'tickfont': {'color': 'white'}},
+        plot_bgcolor='#27293D',
+        paper_bgcolor='#27293D',
+        margin=dict(l=40, r=40, t=60, b=40),
+    )
+    return fig
+
+
+def build_trend_figure(conn, metric, start_date, end_date, granularity='weekly', max_points=1000):
+    """
+    One line per state over [start_date, end_date], or None. Series longer than
+    `max_points` (normally the chart's pixel width) are downsampled with LTTB, so
+    zooming into a narrower range brings back full resolution.
+    """
+    rows = query_metric_range(conn, metric, start_date, end_date, granularity)
+    if not rows:
+        return None
+    
+    frame = pd.DataFrame(rows, columns=['state', 'period', 'metric_value']).dropna()
+    frame['period'] = pd.to_datetime(frame['period'], format='ISO8601')
+    
+    traces = []
+    for state, series in frame.groupby('state', sort=True):
+        x = series['period'].to_numpy()
+        y = series['metric_value'].to_numpy()
+        if len(x) > max_points:
+            keep = lttb_indices(x.astype('datetime64[D]').astype(float), y, max_points)
+            x, y = x[keep], y[keep]
+        traces.append(go.Scatter(
+            x=x,
+            y=y,
+            mode='lines',
+            name=state,
+            line={'width': 1.5},
+            hovertemplate=f'<b>{state}</b><br>%{{x|%Y-%m-%d}}<br>Rate: %{{y:,.2f}}<extra></extra>'
+        ))
+    
+    fig = go.Figure(data=traces)
+    fig.update_layout(
+        title={
+            'text': f'RSV Rate by State ({start_date} to {end_date}, {granularity})',
+            'font': {'color': 'white', 'size': 20}
+        },
+        xaxis_title={'text': 'Week', 'font': {'color': 'white', 'size': 14}},
+        yaxis_title={'text': 'Rate per 100k', 'font': {'color': 'white', 'size': 14}},
+        xaxis={'tickfont': {'color': 'white'}, 'type': 'date'},
+        yaxis={'tickfont': {'color': 'white'}},
+        legend={'font': {'color': 'white'}},
+        hovermode='closest',
+        plot_bgcolor='#27293D',
+        paper_bgcolor='#27293D',
+        margin=dict(l=40, r=40, t=60, b=40),
+    )
+    return fig
+
+
+def build_chart_payload(conn, metric, start_date=None, end_date=None, granularity='weekly',
+                        chart_type='by_state', max_points=1000):
+    """
+    Run the queries and build the figure for one selection. Dates are ISO strings
+    and are ignored for metrics without dated rows (COVID_Cases). chart_type is
+    'by_state' (bar chart) or 'trend' (one line per state).
+    Returns {'title': ..., 'figure': <figure JSON or None>}.
+    """
+    if metric == 'COVID_Cases':
+        title = "COVID-19 Cases"
+        fig = build_covid_figure(conn)
+    elif metric == 'RSV_Rate' and chart_type == 'trend':
+        title = f"RSV Trends ({start_date} to {end_date}, {granularity})"
+        fig = build_trend_figure(conn, metric, start_date, end_date, granularity, max_points)
+    elif metric == 'RSV_Rate':
+        title = f"RSV Cases ({start_date} to {end_date}, {granularity})"
+        fig = build_rsv_figure(conn, start_date, end_date, granularity)
+    else:
+        raise ValueError(f"Unknown metric type: {metric}")
+    return {'title': title, 'figure': fig.to_json() if fig is not None else None}
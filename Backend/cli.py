@@ -0,0 +1,161 @@
+"""
+Headless command line for servers without a display. Only the Backend package
+is imported, and each command imports what it needs when it runs, so `status`
+stays cheap and nothing loads Qt.
+
+    python -m Backend.cli refresh [--skip-model-check]
+    python -m Backend.cli generate-heatmaps [--mode raster] [--output-dir DIR]
+    python -m Backend.cli export --output-dir reports --formats html,png
+    python -m Backend.cli status
+
+benchmarks/bench_importtime.py checks the import time of this module against
+a budget.
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import time
+
+from Backend.db import read_data_generation
+
+FAILED_STAGES_PREFIX = "Failed stages: "
+
+
+def cmd_refresh(args):
+    from Backend.main import back_main
+
+    start = time.perf_counter()
+    # "== <stage>" lines are also how the GUI follows a refresh it runs through this command
+    failed = back_main(progress=lambda stage: print(f"== {stage}", flush=True),
+                       check_model=not args.skip_model_check)
+    print(f"Refresh finished in {time.perf_counter() - start:.1f}s")
+    if failed:
+        print(f"{FAILED_STAGES_PREFIX}{', '.join(failed)}")
+        return 1
+    return 0
+
+
+def cmd_generate_heatmaps(args):
+    from Backend.generate_heatmap import DISEASE_CONFIGS, get_disease_periods, start_gen
+
+    start = time.perf_counter()
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+        start_gen(mode=args.mode, db_name=args.db, output_dir=args.output_dir)
+        print(f"Heatmaps written to {args.output_dir} in {time.perf_counter() - start:.1f}s")
+        return 0
+
+    # Fill the app's cache, so the heatmap page opens without rendering
+    from Backend.heatmap_cache import HeatmapCache
+
+    cache = HeatmapCache(db_name=args.db, mode=args.mode)
+    rendered = cached = 0
+    for disease in DISEASE_CONFIGS:
+        for period in get_disease_periods(disease, db_name=args.db):
+            if cache.lookup(disease, period):
+                cached += 1
+            elif cache.generate(disease, period):
+                rendered += 1
+    print(f"Rendered {rendered} heatmaps ({cached} already cached) into {cache.cache_dir} "
+          f"in {time.perf_counter() - start:.1f}s")
+    return 0
+
+
+def cmd_export(args):
+    # The report and the stats page share Backend.charts (pandas/plotly, no Qt)
+    from report import CHART_FORMATS, generate_report
+
+    formats = [fmt.strip() for fmt in args.formats.split(",") if fmt.strip()]
+    unknown = set(formats) - set(CHART_FORMATS)
+    if unknown:
+        print(f"Unknown format(s): {', '.join(sorted(unknown))}")
+        return 2
+
+    start = time.perf_counter()
+    results = generate_report(args.db, args.output_dir, formats, args.granularity,
+                              args.workers, heatmaps=not args.no_heatmaps)
+    written = sum(len(result['files']) for result in results)
+    print(f"Wrote {written} files for {len(results)} charts/heatmaps to {args.output_dir} "
+          f"in {time.perf_counter() - start:.1f}s")
+    return 0
+
+
+def cmd_status(args):
+    if not os.path.exists(args.db):
+        print(f"Database {args.db} does not exist (run: python -m Backend.cli refresh)")
+        return 1
+
+    conn = sqlite3.connect(args.db)
+    try:
+        print(f"Database: {args.db} ({os.path.getsize(args.db) / 1024 / 1024:.1f} MB)")
+        print(f"Data generation: {read_data_generation(conn)}")
+        try:
+            rows = conn.execute("""
+                SELECT metric_type, COUNT(*), COUNT(DISTINCT state), MAX(week_date)
+                FROM state_metrics GROUP BY metric_type ORDER BY metric_type
+            """).fetchall()
+        except sqlite3.OperationalError:
+            # Databases from before week_date was added
+            rows = conn.execute("""
+                SELECT metric_type, COUNT(*), COUNT(DISTINCT state), NULL
+                FROM state_metrics GROUP BY metric_type ORDER BY metric_type
+            """).fetchall()
+        if not rows:
+            print("No metrics stored yet")
+        for metric_type, count, states, latest in rows:
+            print(f"  {metric_type:<18} {count:>8} rows  {states:>3} states"
+                  + (f"  latest week {latest}" if latest else ""))
+    except sqlite3.Error as e:
+        print(f"Database error in status: {e}")
+        return 1
+    finally:
+        conn.close()
+
+    cache_dir = os.environ.get("HEATMAP_CACHE_DIR", "heatmap_cache")
+    if os.path.isdir(cache_dir):
+        files = [os.path.join(cache_dir, name) for name in os.listdir(cache_dir) if name.endswith(".html")]
+        size = sum(os.path.getsize(path) for path in files)
+        print(f"Heatmap cache: {len(files)} files, {size / 1024 / 1024:.1f} MB in {cache_dir}")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m Backend.cli", description="Diseases Data Tracker (headless)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    refresh = commands.add_parser("refresh", help="scrape and download every data source into health_data.db")
+    refresh.add_argument("--skip-model-check", action="store_true",
+                         help="don't check for (or pull) the Ollama model")
+    refresh.set_defaults(handler=cmd_refresh)
+
+    heatmaps = commands.add_parser("generate-heatmaps", help="render every disease/period heatmap")
+    heatmaps.add_argument("--db", default="health_data.db")
+    heatmaps.add_argument("--mode", choices=["browser", "raster"], default=None,
+                          help="render mode (default: HEATMAP_RENDER_MODE)")
+    heatmaps.add_argument("--output-dir", default=None,
+                          help="write plain files here instead of filling the app's heatmap cache")
+    heatmaps.set_defaults(handler=cmd_generate_heatmaps)
+
+    export = commands.add_parser("export", help="static report of every chart and heatmap (see report.py)")
+    export.add_argument("--db", default="health_data.db")
+    export.add_argument("--output-dir", default="reports")
+    export.add_argument("--formats", default="html,svg,png", help="comma separated chart formats (html, svg, png)")
+    export.add_argument("--granularity", default="weekly", choices=["weekly", "monthly"])
+    export.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    export.add_argument("--no-heatmaps", action="store_true")
+    export.set_defaults(handler=cmd_export)
+
+    status = commands.add_parser("status", help="show what the database holds")
+    status.add_argument("--db", default="health_data.db")
+    status.set_defaults(handler=cmd_status)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""
+Bounded chat history for the AI assistant. Recent turns are kept verbatim up
+to a token budget; older turns are folded into a short extractive summary (the
+gist of each question and answer), so the prompt size stays flat however long
+the conversation gets.
+"""
+import os
+import re
+
+from Backend.ai_digest import estimate_tokens
+
+AI_MEMORY_TOKEN_BUDGET = int(os.environ.get("AI_MEMORY_TOKEN_BUDGET", "1200"))
+AI_SUMMARY_TOKEN_BUDGET = int(os.environ.get("AI_SUMMARY_TOKEN_BUDGET", "300"))
+
+SUMMARY_WORDS = 30
+
+
+def gist(text, max_words=SUMMARY_WORDS):
+    """First sentence of a message with the Markdown stripped, cut to max_words"""
+    plain = re.sub(r"[#*_`>|]+", "", text)
+    plain = re.sub(r"\s+", " ", plain).strip()
+    sentence = re.split(r"(?<=[.!?])\s", plain, maxsplit=1)[0]
+    words = sentence.split()
+    if len(words) > max_words:
+        sentence = " ".join(words[:max_words]) + "..."
+    return sentence
+
+
+class ConversationMemory:
+    def __init__(self, token_budget=AI_MEMORY_TOKEN_BUDGET, summary_budget=AI_SUMMARY_TOKEN_BUDGET):
+        self.token_budget = token_budget
+        self.summary_budget = summary_budget
+        self.turns = []
+        self.summary_lines = []
+
+    def add_exchange(self, question, answer):
+        """Record one question and its answer, then compress whatever no longer fits"""
+        self.turns.append({'role': 'user', 'content': question})
+        self.turns.append({'role': 'assistant', 'content': answer})
+        self._compress()
+
+    def clear(self):
+        self.turns = []
+        self.summary_lines = []
+
+    def _tokens(self, turns):
+        return sum(estimate_tokens(turn['content']) for turn in turns)
+
+    def _compress(self):
+        # Always keep the latest exchange verbatim, even if it alone is over budget
+        while len(self.turns) > 2 and self._tokens(self.turns) > self.token_budget:
+            question, answer = self.turns[0], self.turns[1]
+            del self.turns[:2]
+            self.summary_lines.append(f"- User asked: {gist(question['content'])} "
+                                      f"Assistant answered: {gist(answer['content'])}")
+
+        while len(self.summary_lines) > 1 and estimate_tokens("\n".join(self.summary_lines)) > self.summary_budget:
+            self.summary_lines.pop(0)
+
+    def messages(self):
+        """Chat messages to send before the new question: summary first, then recent turns"""
+        messages = []
+        if self.summary_lines:
+            messages.append({
+                'role': 'system',
+                'content': "Summary of the earlier conversation:\n" + "\n".join(self.summary_lines)
+            })
+        return messages + [dict(turn) for turn in self.turns]
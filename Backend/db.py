@@ -0,0 +1,172 @@
+import sqlite3
+
+# Every ingestion write bumps this counter, so caches (rendered heatmaps, charts,
+# derived metrics) can tell whether what they hold is still current.
+DATA_GENERATION_KEY = "data_generation"
+
+
+def create_meta_table(db_name="health_data.db"):
+    conn = sqlite3.connect(db_name)
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS app_meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )
+    """)
+    conn.commit()
+    conn.close()
+
+
+def read_data_generation(conn):
+    """Data generation as seen by an already open connection."""
+    try:
+        row = conn.execute(
+            "SELECT value FROM app_meta WHERE key = ?", (DATA_GENERATION_KEY,)
+        ).fetchone()
+        return int(row[0]) if row else 0
+    except sqlite3.Error:
+        return 0
+
+
+def get_data_generation(db_name="health_data.db"):
+    """Return the current data generation, or 0 if the database has never been written."""
+    try:
+        conn = sqlite3.connect(db_name)
+    except sqlite3.Error as e:
+        print(f"Database error in get_data_generation: {e}")
+        return 0
+    try:
+        return read_data_generation(conn)
+    finally:
+        conn.close()
+
+
+def bump_data_generation(conn):
+    """
+    Increment the data generation inside the caller's transaction, so the bump is
+    committed (or rolled back) together with the rows that caused it.
+    """
+    conn.execute("""
+        INSERT INTO app_meta (key, value) VALUES (?, '1')
+        ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1
+    """, (DATA_GENERATION_KEY,))
+
+
+def parse_week_date(value):
+    """
+    Normalise a period string to an ISO date ('YYYY-MM-DD'), or None for labels
+    such as 'Current' or 'Past 4 Weeks'. Accepts ISO dates/timestamps and MM/DD/YYYY.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if len(value) >= 10 and value[4] == "-" and value[7] == "-" and value[:4].isdigit():
+        return value[:10]
+    if len(value) >= 10 and value[2] == "/" and value[5] == "/" and value[6:10].isdigit():
+        return f"{value[6:10]}-{value[0:2]}-{value[3:5]}"
+    return None
+
+
+def ensure_week_date_column(conn):
+    """
+    Add and backfill state_metrics.week_date (the parsed ISO date of `year`) on
+    databases created before it existed, and make sure the covering index used
+    for date-range scans is present.
+    """
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(state_metrics)")]
+    if not columns:
+        return
+    if "week_date" not in columns:
+        conn.execute("ALTER TABLE state_metrics ADD COLUMN week_date TEXT")
+        conn.execute("""
+            UPDATE state_metrics SET week_date = substr(year, 1, 10)
+            WHERE year GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]*'
+        """)
+        conn.execute("""
+            UPDATE state_metrics
+               SET week_date = substr(year, 7, 4) || '-' || substr(year, 1, 2) || '-' || substr(year, 4, 2)
+            WHERE year GLOB '[0-9][0-9]/[0-9][0-9]/[0-9][0-9][0-9][0-9]*'
+        """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_state_metrics_type_date
+        ON state_metrics (metric_type, week_date, state, metric_value)
+    """)
+    conn.commit()
+
+
+# Metrics shown on the dashboard stat cards
+SNAPSHOT_METRICS = ("COVID_Positivity", "COVID_Recovered", "COVID_Deaths")
+
+
+def create_snapshot_table(db_name="health_data.db"):
+    conn = sqlite3.connect(db_name)
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS metric_snapshot (
+            metric_type TEXT PRIMARY KEY,
+            metric_value REAL,
+            generation INTEGER
+        )
+    """)
+    conn.commit()
+    conn.close()
+
+
+def _snapshot_select():
+    """(query, params) for each metric's average over the latest row of every state."""
+    placeholders = ", ".join("?" for _ in SNAPSHOT_METRICS)
+    # Scrapes append rather than replace (COVID_Positivity is always 'Past 4 Weeks'
+    # with no week_date), so the newest row per state is the highest id.
+    query = f"""
+        SELECT metric_type, AVG(metric_value)
+        FROM state_metrics
+        WHERE id IN (
+            SELECT MAX(id) FROM state_metrics
+            WHERE metric_type IN ({placeholders})
+            GROUP BY state, metric_type
+        )
+        GROUP BY metric_type
+    """
+    return query, SNAPSHOT_METRICS
+
+
+def refresh_metric_snapshot(conn):
+    """
+    Rebuild metric_snapshot inside the caller's transaction. Call it right after
+    bump_data_generation so the snapshot is committed with the rows it summarises.
+    """
+    generation = read_data_generation(conn)
+    query, params = _snapshot_select()
+    conn.execute("DELETE FROM metric_snapshot")
+    conn.executemany(
+        "INSERT INTO metric_snapshot (metric_type, metric_value, generation) VALUES (?, ?, ?)",
+        [(metric, value, generation) for metric, value in conn.execute(query, params).fetchall()]
+    )
+
+
+def get_metric_snapshot(db_name="health_data.db"):
+    """
+    {metric_type: average} for SNAPSHOT_METRICS, plus the data generation it
+    belongs to. Read-only: ingestion keeps metric_snapshot current, and a stale or
+    missing snapshot (a database from an older version) is computed on the fly.
+    """
+    conn = sqlite3.connect(db_name)
+    try:
+        generation = read_data_generation(conn)
+        try:
+            rows = conn.execute("SELECT metric_type, metric_value, generation FROM metric_snapshot").fetchall()
+        except sqlite3.OperationalError:
+            rows = []
+        if rows and all(row[2] == generation for row in rows):
+            averages = [(metric, value) for metric, value, _ in rows]
+        else:
+            averages = conn.execute(*_snapshot_select()).fetchall()
+        values = {metric: 0.0 for metric in SNAPSHOT_METRICS}
+        values.update({metric: value or 0.0 for metric, value in averages})
+        return values, generation
+    except sqlite3.Error as e:
+        print(f"Database error in get_metric_snapshot: {e}")
+        return {metric: 0.0 for metric in SNAPSHOT_METRICS}, 0
+    finally:
+        conn.close()
@@ -0,0 +1,178 @@
+"""
+Per-state derived metrics (per-100k rates, estimated counts, 4-week rolling
+means and week-over-week growth), computed for every state and week at once
+with vectorized pandas/NumPy and cached per data generation.
+"""
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+from Backend.db import read_data_generation
+
+STATE_POPULATIONS = {
+    "Alabama": 5118425,
+    "Alaska": 733583,
+    "Arizona": 7359197,
+    "Arkansas": 3045637,
+    "California": 39029342,
+    "Colorado": 5877610,
+    "Connecticut": 3626205,
+    "Delaware": 1018396,
+    "Florida": 22484482,
+    "Georgia": 11029227,
+    "Hawaii": 1440196,
+    "Idaho": 1965509,
+    "Illinois": 12582032,
+    "Indiana": 6833037,
+    "Iowa": 3200517,
+    "Kansas": 2942939,
+    "Kentucky": 4512310,
+    "Louisiana": 4590241,
+    "Maine": 1385340,
+    "Maryland": 6164660,
+    "Massachusetts": 6981974,
+    "Michigan": 10037261,
+    "Minnesota": 5717184,
+    "Mississippi": 2940057,
+    "Missouri": 6177957,
+    "Montana": 1122867,
+    "Nebraska": 1967923,
+    "Nevada": 3177772,
+    "New Hampshire": 1395231,
+    "New Jersey": 9261699,
+    "New Mexico": 2113344,
+    "New York": 19571216,
+    "North Carolina": 10698973,
+    "North Dakota": 779261,
+    "Ohio": 11756058,
+    "Oklahoma": 4019800,
+    "Oregon": 4240137,
+    "Pennsylvania": 12961683,
+    "Rhode Island": 1093734,
+    "South Carolina": 5342388,
+    "South Dakota": 909824,
+    "Tennessee": 7051339,
+    "Texas": 30029572,
+    "Utah": 3380800,
+    "Vermont": 647064,
+    "Virginia": 8683619,
+    "Washington": 7785786,
+    "West Virginia": 1775156,
+    "Wisconsin": 5892539,
+    "Wyoming": 581381,
+    "District of Columbia": 671803
+}
+
+# How the raw metric_value of each metric type should be read.
+METRIC_KINDS = {
+    "RSV_Rate": "rate_per_100k",
+    "COVID_Cases": "count",
+    "COVID_Positivity": "percent"
+}
+
+ROLLING_WEEKS = 4
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def load_metric_frame(conn, metric_type):
+    """All rows of one metric type, with week_date parsed into a `week` timestamp (NaT if not a date)."""
+    frame = pd.read_sql(
+        "SELECT state, metric_value, year, week_date FROM state_metrics WHERE metric_type = ?",
+        conn, params=(metric_type,)
+    )
+    frame["week"] = pd.to_datetime(frame["week_date"], errors="coerce", format="ISO8601")
+    return frame
+
+
+def collapse_weeks(frame):
+    """
+    One row per (state, week), averaging metric_value. Re-downloads append a full
+    copy of a source and some sources have several strata rows per state-week,
+    so the raw rows can't be used as a weekly series. Rows without a week are kept.
+    """
+    dated = frame["week"].notna()
+    others = {column: "first" for column in frame.columns if column not in ("state", "week", "metric_value")}
+    weekly = frame[dated].groupby(["state", "week"], as_index=False).agg({"metric_value": "mean", **others})
+    return pd.concat([weekly, frame[~dated]], ignore_index=True)[frame.columns]
+
+
+def compute_derived_metrics(frame, metric_type):
+    """
+    Collapse to one row per state and week (see collapse_weeks), then add
+    population, per_100k, estimated_count, rolling_4wk (mean over the 28 days up
+    to each week) and wow_growth (against the same state's value 7 days
+    earlier). Rows are returned sorted by state and week; rolling/growth are NaN
+    for rows without a parseable week, and growth is NaN when the previous week
+    is missing.
+    """
+    kind = METRIC_KINDS.get(metric_type, "count")
+    frame = collapse_weeks(frame)
+    frame = frame.sort_values(["state", "week"], kind="stable").reset_index(drop=True)
+
+    values = frame["metric_value"].to_numpy(dtype=float)
+    population = frame["state"].map(STATE_POPULATIONS).to_numpy(dtype=float)
+    frame["population"] = population
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if kind == "rate_per_100k":
+            frame["per_100k"] = values
+            frame["estimated_count"] = values * population / 100000
+        elif kind == "count":
+            frame["per_100k"] = values / population * 100000
+            frame["estimated_count"] = values
+        else:
+            frame["per_100k"] = np.nan
+            frame["estimated_count"] = np.nan
+
+    dated = frame["week"].notna()
+    frame["rolling_4wk"] = np.nan
+    frame["wow_growth"] = np.nan
+    if dated.any():
+        series = frame.loc[dated, ["state", "week", "metric_value"]]
+        # Sorted by state then week, so the grouped results line up with `series`
+        rolling = (series.groupby("state", sort=True)
+                   .rolling(f"{ROLLING_WEEKS * 7}D", on="week", min_periods=1)["metric_value"].mean())
+        frame.loc[dated, "rolling_4wk"] = rolling.to_numpy()
+
+        previous = series.assign(week=series["week"] + pd.Timedelta(days=7))
+        previous = previous.rename(columns={"metric_value": "previous_value"})
+        before = series.merge(previous, on=["state", "week"], how="left")["previous_value"].to_numpy()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            growth = series["metric_value"].to_numpy() / before - 1
+        frame.loc[dated, "wow_growth"] = np.where(np.isfinite(growth), growth, np.nan)
+
+    return frame
+
+
+def _database_path(conn):
+    return conn.execute("PRAGMA database_list").fetchone()[2]
+
+
+def get_derived_metrics(metric_type, db_name="health_data.db", conn=None):
+    """
+    Derived metrics for one metric type, recomputed only when the data generation
+    changes. Pass `conn` to reuse an open (e.g. worker-thread) connection.
+    The returned frame is shared between callers; treat it as read-only.
+    """
+    own_conn = conn is None
+    if own_conn:
+        conn = sqlite3.connect(db_name)
+    try:
+        key = (_database_path(conn), metric_type)
+        generation = read_data_generation(conn)
+        with _cache_lock:
+            cached = _cache.get(key)
+        if cached is not None and cached[0] == generation:
+            return cached[1]
+
+        frame = compute_derived_metrics(load_metric_frame(conn, metric_type), metric_type)
+        with _cache_lock:
+            _cache[key] = (generation, frame)
+        return frame
+    finally:
+        if own_conn:
+            conn.close()
@@ -0,0 +1,48 @@
+import numpy as np
+
+
+def lttb_indices(x, y, threshold):
+    """
+    Largest-Triangle-Three-Buckets: pick `threshold` points of (x, y) that keep
+    the visual shape of the series. Returns the indices of the kept points, always
+    including the first and last. x must be sorted ascending and numeric.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # Bucket boundaries for the n - 2 interior points
+    edges = np.floor(np.linspace(1, n - 1, threshold - 1)).astype(int)
+    indices = np.empty(threshold, dtype=int)
+    indices[0] = 0
+    indices[-1] = n - 1
+
+    previous = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+
+        # Average of the next bucket (or the last point for the final bucket)
+        if i + 2 < len(edges):
+            next_start, next_end = edges[i + 1], edges[i + 2]
+        else:
+            next_start, next_end = n - 1, n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        # Twice the triangle area for every candidate in this bucket
+        px, py = x[previous], y[previous]
+        areas = np.abs(
+            (px - avg_x) * (y[start:end] - py) - (px - x[start:end]) * (avg_y - py)
+        )
+        previous = start + int(np.argmax(areas))
+        indices[i + 1] = previous
+
+    return indices
+
+
+def lttb(x, y, threshold):
+    """Downsampled (x, y) arrays; see lttb_indices."""
+    keep = lttb_indices(x, y, threshold)
+    return np.asarray(x)[keep], np.asarray(y)[keep]
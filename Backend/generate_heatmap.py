@@ -1,6 +1,34 @@
+import base64
+import os
 import sqlite3
+import numpy as np
 import folium
 from folium.plugins import HeatMap
+from folium.raster_layers import ImageOverlay
+from folium.utilities import write_png
+
+# "browser" keeps the leaflet-heat layer (kernel density computed client side on
+# every pan/zoom); "raster" precomputes the heat surface here and ships a PNG.
+HEATMAP_RENDER_MODE = os.environ.get("HEATMAP_RENDER_MODE", "browser")
+
+HEATMAP_GRADIENT = {
+    "0.2": "blue",
+    "0.4": "lime",
+    "0.6": "yellow",
+    "0.8": "orange",
+    "1.0": "red"
+}
+
+GRADIENT_RGB = {
+    "blue": (0, 0, 255),
+    "lime": (0, 255, 0),
+    "yellow": (255, 255, 0),
+    "orange": (255, 165, 0),
+    "red": (255, 0, 0)
+}
+
+# Lat/lon box covering the 50 states, DC and Puerto Rico.
+RASTER_BOUNDS = [[15.0, -170.0], [72.0, -60.0]]
 
 def get_distinct_years(metric_type, db_name="health_data.db"):
     try:
@@ -70,60 +98,148 @@ def fetch_heatmap_data(db_name="health_data.db", metric_type="COVID_Positivity",
     finally:
         conn.close()
 
-def generate_heatmap_html(metric_type, year_filter, output_file="heatmap.html", exact_match=False):
-    heatmap_data = fetch_heatmap_data(metric_type=metric_type, year_filter=year_filter, exact_match=exact_match)
+def _mercator_y(lat):
+    lat = np.radians(np.clip(lat, -85.0, 85.0))
+    return np.log(np.tan(np.pi / 4 + lat / 2))
+
+def compute_heat_surface(heatmap_data, bounds=RASTER_BOUNDS, width=880, sigma_deg=1.0):
+    """
+    Sum a Gaussian kernel for every [lat, lon, weight] point on a grid laid out in
+    Web Mercator (so the image lines up with Leaflet's tiles) and normalise to 0..1.
+    Row 0 is the northern edge.
+    """
+    points = np.asarray(heatmap_data, dtype=float)
+    (south, west), (north, east) = bounds
+
+    x_min, x_max = np.radians(west), np.radians(east)
+    y_min, y_max = _mercator_y(south), _mercator_y(north)
+    height = max(1, int(round(width * (y_max - y_min) / (x_max - x_min))))
+
+    xs = np.linspace(x_min, x_max, width)
+    ys = np.linspace(y_max, y_min, height)
+
+    # Many rows share a centroid (one per week), so collapse them first.
+    coords, inverse = np.unique(points[:, :2], axis=0, return_inverse=True)
+    weights = np.bincount(inverse.ravel(), weights=points[:, 2], minlength=len(coords))
+
+    sigma = np.radians(sigma_deg)
+    px = np.radians(coords[:, 1])
+    py = _mercator_y(coords[:, 0])
+    kx = np.exp(-((xs[None, :] - px[:, None]) ** 2) / (2 * sigma ** 2))
+    ky = np.exp(-((ys[None, :] - py[:, None]) ** 2) / (2 * sigma ** 2))
+
+    # The 2D Gaussian is separable: surface[h, w] = sum_i w_i * ky[i, h] * kx[i, w]
+    surface = (ky * weights[:, None]).T @ kx
+
+    peak = surface.max()
+    if peak > 0:
+        surface /= peak
+    return surface
+
+def colorize_heat_surface(surface, gradient=HEATMAP_GRADIENT, min_opacity=0.2, max_opacity=0.9, cutoff=0.02):
+    """Map a 0..1 surface onto the heatmap gradient and return an RGBA uint8 image."""
+    stops = sorted((float(pos), GRADIENT_RGB[color]) for pos, color in gradient.items())
+    positions = [pos for pos, _ in stops]
+
+    rgba = np.empty(surface.shape + (4,), dtype=np.uint8)
+    for channel in range(3):
+        values = [rgb[channel] for _, rgb in stops]
+        rgba[..., channel] = np.interp(surface, positions, values).astype(np.uint8)
+
+    alpha = np.clip(surface, min_opacity, max_opacity)
+    alpha[surface < cutoff] = 0.0
+    rgba[..., 3] = (alpha * 255).astype(np.uint8)
+    return rgba
+
+def render_heatmap_png(metric_type, year_filter, exact_match=False, db_name="health_data.db", width=880):
+    """PNG bytes of the heat surface for one period (covering RASTER_BOUNDS), or None if there is no data."""
+    heatmap_data = fetch_heatmap_data(db_name=db_name, metric_type=metric_type,
+                                      year_filter=year_filter, exact_match=exact_match)
     if not heatmap_data:
         print(f"No valid data found for '{metric_type}' with filter '{year_filter}'.")
-        return
+        return None
+
+    surface = compute_heat_surface(heatmap_data, width=width)
+    return write_png(colorize_heat_surface(surface))
+
+def generate_heatmap_html(metric_type, year_filter, output_file="heatmap.html", exact_match=False,
+                          db_name="health_data.db", mode=None):
+    mode = mode or HEATMAP_RENDER_MODE
+
+    if mode == "raster":
+        # Embedded in the page as a data URL (folium would base64 a file anyway), so
+        # each heatmap is one self-contained .html and no PNG is left beside it
+        png = render_heatmap_png(metric_type, year_filter, exact_match=exact_match, db_name=db_name)
+        if png is None:
+            return
+        image_url = "data:image/png;base64," + base64.b64encode(png).decode("ascii")
+        heatmap_data = None
+    else:
+        heatmap_data = fetch_heatmap_data(db_name=db_name, metric_type=metric_type,
+                                          year_filter=year_filter, exact_match=exact_match)
+        if not heatmap_data:
+            print(f"No valid data found for '{metric_type}' with filter '{year_filter}'.")
+            return
 
     try:
         m = folium.Map(location=[39.8283, -98.5795],
                        zoom_start=5,
                        tiles="cartodbpositron")
 
-        HeatMap(
-            data=heatmap_data,
-            min_opacity=0.2,
-            max_opacity=0.9,
-            radius=25,
-            blur=15,
-            gradient={
-                "0.2": "blue",
-                "0.4": "lime",
-               "0.6": "yellow",
-                "0.8": "orange",
-                "1.0": "red"
-            }
-        ).add_to(m)
+        if mode == "raster":
+            ImageOverlay(
+                image=image_url,
+                bounds=RASTER_BOUNDS,
+                pixelated=False
+            ).add_to(m)
+        else:
+            HeatMap(
+                data=heatmap_data,
+                min_opacity=0.2,
+                max_opacity=0.9,
+                radius=25,
+                blur=15,
+                gradient=HEATMAP_GRADIENT
+            ).add_to(m)
 
         m.save(output_file)
+        return output_file
 
     except Exception as e:
         print(f"Error generating heatmap for '{metric_type}', '{year_filter}': {e}")
 
-def start_gen():
-    disease_configs = {
-        "COVID-19": {
-            "metric_type": "COVID_Positivity",
-            "years": ["Past 4 Weeks"],
-            "exact_match": True
-        },
-        "RSV": {
-            "metric_type": "RSV_Rate",
-            "years": get_distinct_years("RSV_Rate"),  
-            "exact_match": False
-        }
+DISEASE_CONFIGS = {
+    "COVID-19": {
+        "metric_type": "COVID_Positivity",
+        "exact_match": True
+    },
+    "RSV": {
+        "metric_type": "RSV_Rate",
+        "exact_match": False
     }
+}
+
+def get_disease_periods(disease, db_name="health_data.db"):
+    """Periods a heatmap can be generated for, oldest first."""
+    if disease == "COVID-19":
+        return ["Past 4 Weeks"]
+    return get_distinct_years(DISEASE_CONFIGS[disease]["metric_type"], db_name=db_name)
+
+def heatmap_filename(disease, period):
+    safe_disease = disease.replace(" ", "_")
+    safe_year = period.replace(" ", "_")
+    if safe_year == "Past_4_Weeks":
+        safe_year = "Past-4-Weeks"
+    return f"heatmap_{safe_disease}_{safe_year}.html"
 
-    for disease, config in disease_configs.items():
+def start_gen(mode=None, db_name="health_data.db", output_dir="."):
+    """Eagerly render every disease/period. The app itself renders on demand via HeatmapCache."""
+    for disease, config in DISEASE_CONFIGS.items():
         metric_type = config["metric_type"]
         exact = config["exact_match"]
-        
-        for year_val in config["years"]:
-            safe_disease = disease.replace(" ", "_")
-            safe_year = year_val.replace(" ", "_")
-            if safe_year == "Past_4_Weeks":
-                safe_year = "Past-4-Weeks"
-            output_file = f"heatmap_{safe_disease}_{safe_year}.html"
-
-            generate_heatmap_html(metric_type, year_val, output_file, exact_match=exact)
+
+        for year_val in get_disease_periods(disease, db_name=db_name):
+            output_file = os.path.join(output_dir, heatmap_filename(disease, year_val))
+
+            generate_heatmap_html(metric_type, year_val, output_file, exact_match=exact,
+                                  db_name=db_name, mode=mode)
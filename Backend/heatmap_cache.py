@@ -0,0 +1,113 @@
+import os
+import threading
+
+from Backend.db import get_data_generation
+from Backend.generate_heatmap import (
+    DISEASE_CONFIGS, HEATMAP_RENDER_MODE, generate_heatmap_html, heatmap_filename
+)
+
+HEATMAP_CACHE_DIR = os.environ.get("HEATMAP_CACHE_DIR", "heatmap_cache")
+HEATMAP_CACHE_MAX_BYTES = int(os.environ.get("HEATMAP_CACHE_MAX_MB", "200")) * 1024 * 1024
+
+
+class HeatmapCache:
+    """
+    Directory of rendered heatmaps, generated on first request.
+
+    Entries are named after the disease, period, render mode and data generation,
+    so anything rendered before the last ingestion is simply a miss. Once the
+    directory grows past `max_bytes` the least recently used entries are removed,
+    oldest generations first.
+    """
+
+    def __init__(self, cache_dir=HEATMAP_CACHE_DIR, max_bytes=HEATMAP_CACHE_MAX_BYTES,
+                 db_name="health_data.db", mode=None):
+        self.cache_dir = str(cache_dir)
+        self.max_bytes = max_bytes
+        self.db_name = str(db_name)
+        self.mode = mode or HEATMAP_RENDER_MODE
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def path_for(self, disease, period, generation=None):
+        if generation is None:
+            generation = get_data_generation(self.db_name)
+        stem = os.path.splitext(heatmap_filename(disease, period))[0]
+        return os.path.join(self.cache_dir, f"{stem}_{self.mode}_g{generation}.html")
+
+    def lookup(self, disease, period):
+        """Return the cached file for the current data generation, or None on a miss."""
+        path = self.path_for(disease, period)
+        if not os.path.exists(path):
+            return None
+        self._touch(path)
+        return path
+
+    def generate(self, disease, period):
+        """Render into the cache (blocking) and return the path, or None if there is no data."""
+        config = DISEASE_CONFIGS[disease]
+        path = self.path_for(disease, period)
+        stem = os.path.splitext(path)[0]
+        partial = f"{stem}.partial.html"
+
+        with self._lock:
+            if os.path.exists(path):
+                self._touch(path)
+                return path
+
+            result = generate_heatmap_html(config["metric_type"], period, partial,
+                                           exact_match=config["exact_match"],
+                                           db_name=self.db_name, mode=self.mode)
+            if result is None:
+                return None
+
+            # Publish atomically so a reader never loads a half-written page.
+            os.replace(partial, path)
+            self._evict(keep=path)
+        return path
+
+    def get(self, disease, period):
+        return self.lookup(disease, period) or self.generate(disease, period)
+
+    def _touch(self, path):
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _entries(self):
+        """Group cache files by entry (the .html, plus a .png from older raster pages) -> (stem, last_used, size)."""
+        entries = {}
+        for name in os.listdir(self.cache_dir):
+            if ".partial." in name:
+                continue
+            full = os.path.join(self.cache_dir, name)
+            stem = os.path.splitext(full)[0]
+            try:
+                stat = os.stat(full)
+            except OSError:
+                continue
+            last_used, size = entries.get(stem, (0, 0))
+            entries[stem] = (max(last_used, stat.st_mtime), size + stat.st_size)
+        return entries
+
+    def _evict(self, keep=None):
+        current = f"_g{get_data_generation(self.db_name)}"
+        keep_stem = os.path.splitext(keep)[0] if keep else None
+        entries = self._entries()
+        total = sum(size for _, size in entries.values())
+
+        # Stale generations can never be hit again, so they go before any LRU order.
+        order = sorted(entries.items(),
+                       key=lambda item: (item[0].endswith(current), item[1][0]))
+        for stem, (_, size) in order:
+            if total <= self.max_bytes:
+                break
+            if stem == keep_stem:
+                continue
+            for ext in (".html", ".png"):
+                try:
+                    os.unlink(stem + ext)
+                except FileNotFoundError:
+                    pass
+            total -= size
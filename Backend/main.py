@@ -3,14 +3,21 @@ import csv
 import sqlite3
 import sys
 os.environ["PYPPETEER_CHROMIUM_REVISION"] = "1045629"  
-import requests
-from requests_html import HTMLSession
-from Backend.generate_heatmap import start_gen
-from bs4 import BeautifulSoup
+from Backend.db import (
+    create_meta_table, create_snapshot_table, bump_data_generation, ensure_week_date_column, parse_week_date,
+    refresh_metric_snapshot
+)
 import hashlib
 import os
 import subprocess
 
+# The app imports this module at start-up for create_tables(); the scraping
+# libraries (requests, requests_html/pyppeteer, bs4) and the AI digest (numpy,
+# pandas) are imported inside the functions that use them.
+
+# Seconds before an HTTP request of the refresh gives up
+REQUEST_TIMEOUT = float(os.environ.get("REFRESH_REQUEST_TIMEOUT", "30"))
+
 
 def check_and_download_model():
     """
@@ -102,6 +109,8 @@ def extract_covid_data_from_html(html_content):
     Given the inner HTML content of the table, parse it and extract a list of
     tuples containing (state, test positivity, "Past 4 Weeks").
     """
+    from bs4 import BeautifulSoup
+
     soup = BeautifulSoup(html_content, 'html.parser')
     tbody = soup.find('tbody')
     data = []
@@ -122,11 +131,13 @@ def extract_covid_data_from_html(html_content):
     return data
 
 def scrape_cdc_covid_data():
+    import requests
+
     covid_url = "https://covid.cdc.gov/covid-data-tracker/#maps_positivity-4-week"
 
     current_etag = None
     try:
-        head_response = requests.head(covid_url)
+        head_response = requests.head(covid_url, timeout=REQUEST_TIMEOUT)
         current_etag = head_response.headers.get('ETag')
         cached_etag = get_cached_etag(covid_url)
         if current_etag and cached_etag == current_etag:
@@ -178,8 +189,10 @@ def scrape_cdc_covid_data():
             update_cached_etag(covid_url, current_etag)
         return covid_data
     else:
+        from requests_html import HTMLSession
+
         session = HTMLSession()
-        r = session.get(covid_url)
+        r = session.get(covid_url, timeout=REQUEST_TIMEOUT)
         r.html.render(sleep=3, timeout=20)
         table = r.html.find("table", first=True)
         if not table:
@@ -201,10 +214,14 @@ def add_cases_to_db(db_name="health_data.db"):
     as separate metrics under state "United States".
     Returns a list of (state, cases) that were processed (for the state-level cases).
     """
+    import requests
+    from bs4 import BeautifulSoup
+    from requests_html import HTMLSession
+
     worldometers_url = "https://www.worldometers.info/coronavirus/country/us/"
 
     session = HTMLSession()
-    r = session.get(worldometers_url)
+    r = session.get(worldometers_url, timeout=REQUEST_TIMEOUT)
     r.html.render(sleep=3, timeout=20)
 
     table = r.html.find("table#usa_table_countries_today", first=True)
@@ -255,13 +272,16 @@ def add_cases_to_db(db_name="health_data.db"):
                 """, (state, cases))
             state_processed.append((state, cases))
 
+        if state_processed:
+            bump_data_generation(conn)
+            refresh_metric_snapshot(conn)
         conn.commit()
         conn.close()
         update_cached_etag(worldometers_url, current_hash)
 
     global_key = worldometers_url + "_global"
     try:
-        response = requests.get(worldometers_url)
+        response = requests.get(worldometers_url, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
     except Exception as e:
         print("Error fetching global Worldometers stats:", e)
@@ -319,6 +339,8 @@ def add_cases_to_db(db_name="health_data.db"):
                                 (state, metric_type, metric_value, year)
                             VALUES ('United States', 'COVID_Recovered', ?, 'Current')
                         """, (recovered_val,))
+                bump_data_generation(conn)
+                refresh_metric_snapshot(conn)
                 conn.commit()
                 conn.close()
                 update_cached_etag(global_key, global_hash)
@@ -332,12 +354,14 @@ def add_cases_to_db(db_name="health_data.db"):
 
 
 def download_rsv_data():
+    import requests
+
     csv_url = "https://data.cdc.gov/api/views/29hc-w46k/rows.csv?accessType=DOWNLOAD"
     local_filename = "rsv_data.csv"
     
     current_etag = None
     try:
-        head_response = requests.head(csv_url)
+        head_response = requests.head(csv_url, timeout=REQUEST_TIMEOUT)
         current_etag = head_response.headers.get('ETag')
         cached_etag = get_cached_etag(csv_url)
         if current_etag and cached_etag == current_etag:
@@ -347,7 +371,7 @@ def download_rsv_data():
     except Exception as e:
         print("Error checking ETag for RSV data:", e)
     
-    response = requests.get(csv_url)
+    response = requests.get(csv_url, timeout=REQUEST_TIMEOUT)
     if response.status_code == 200:
         with open(local_filename, "wb") as f:
             f.write(response.content)
@@ -384,7 +408,8 @@ def create_tables(db_name="health_data.db"):
             state TEXT,
             metric_type TEXT,   -- e.g., "COVID_Positivity", "RSV_Rate", "COVID_Cases"
             metric_value REAL,
-            year TEXT
+            year TEXT,
+            week_date TEXT      -- ISO date parsed from year, NULL for labels like "Current"
         )
     """)
     
@@ -397,9 +422,12 @@ def create_tables(db_name="health_data.db"):
         )
     """)
     
+    ensure_week_date_column(conn)
     conn.commit()
     conn.close()
     create_cache_table(db_name)
+    create_meta_table(db_name)
+    create_snapshot_table(db_name)
 
 def insert_state_metrics(data, metric_type, db_name="health_data.db"):
     conn = sqlite3.connect(db_name)
@@ -407,10 +435,13 @@ def insert_state_metrics(data, metric_type, db_name="health_data.db"):
     
     for (state, metric_value, year) in data:
         cursor.execute("""
-            INSERT INTO state_metrics (state, metric_type, metric_value, year)
-            VALUES (?, ?, ?, ?)
-        """, (state, metric_type, metric_value, year))
+            INSERT INTO state_metrics (state, metric_type, metric_value, year, week_date)
+            VALUES (?, ?, ?, ?, ?)
+        """, (state, metric_type, metric_value, year, parse_week_date(year)))
     
+    if data:
+        bump_data_generation(conn)
+        refresh_metric_snapshot(conn)
     conn.commit()
     conn.close()
 
@@ -420,10 +451,16 @@ def insert_state_centroids(centroid_dict, db_name="health_data.db"):
     
     for state, (lat, lon) in centroid_dict.items():
         cursor.execute("""
-            INSERT OR REPLACE INTO state_centroids (state, latitude, longitude)
+            INSERT INTO state_centroids (state, latitude, longitude)
             VALUES (?, ?, ?)
+            ON CONFLICT(state) DO UPDATE SET latitude = excluded.latitude, longitude = excluded.longitude
+            WHERE latitude IS NOT excluded.latitude OR longitude IS NOT excluded.longitude
         """, (state, lat, lon))
     
+    # Centroids are re-sent on every run; only a real change is a new generation.
+    if conn.total_changes:
+        bump_data_generation(conn)
+        refresh_metric_snapshot(conn)
     conn.commit()
     conn.close()
 
@@ -435,30 +472,51 @@ def cleanup():
     except FileNotFoundError:
         print(f"Error: File '{file_path}' not found.")
 
-def back_main():
-    check_and_download_model()
-    
-    create_tables()
-    
-    covid_data = scrape_cdc_covid_data()
-    if not covid_data:
-        print("No new CDC COVID data to update (ETag unchanged).")
-    else:
-        insert_state_metrics(covid_data, metric_type="COVID_Positivity")
-    
-    updates = add_cases_to_db()
-    if not updates:
-        print("No new Worldometers COVID data to update.")
-    else:
-        print(f"Updated COVID_Cases for {len(updates)} locations.")
+def back_main(progress=None, check_model=True):
+    """
+    Refresh every data source. `progress`, if given, is called with the name of
+    each stage as it starts (the CLI prints it; the GUI runs the CLI in a
+    subprocess and shows the stage). `check_model=False` skips the Ollama model
+    check, for hosts without Ollama. A failing stage is reported and the rest
+    still run; returns the names of the stages that failed.
+    """
+    report = progress or (lambda stage: None)
+    failed = []
+
+    def run_stage(stage, func):
+        report(stage)
+        try:
+            func()
+        except Exception as e:
+            print(f"Error in stage '{stage}':", e)
+            failed.append(stage)
+
+    def update_covid():
+        covid_data = scrape_cdc_covid_data()
+        if not covid_data:
+            print("No new CDC COVID data to update (ETag unchanged).")
+        else:
+            insert_state_metrics(covid_data, metric_type="COVID_Positivity")
+
+    def update_cases():
+        updates = add_cases_to_db()
+        if not updates:
+            print("No new Worldometers COVID data to update.")
+        else:
+            print(f"Updated COVID_Cases for {len(updates)} locations.")
+
+    def update_rsv():
+        rsv_csv = download_rsv_data()
+        if rsv_csv is None:
+            print("No new RSV data to update (ETag unchanged).")
+        else:
+            rsv_data = parse_rsv_data(rsv_csv)
+            insert_state_metrics(rsv_data, metric_type="RSV_Rate")
+
+    def refresh_ai_digest():
+        from Backend.ai_digest import refresh_digest
+        refresh_digest()
 
-    rsv_csv = download_rsv_data()
-    if rsv_csv is None:
-        print("No new RSV data to update (ETag unchanged).")
-    else:
-        rsv_data = parse_rsv_data(rsv_csv)
-        insert_state_metrics(rsv_data, metric_type="RSV_Rate")
-    
     STATE_CENTROIDS = {
         "Alabama": (33.5207, -86.8025),         
         "Alaska": (61.2181, -149.9003),          
@@ -514,8 +572,13 @@ def back_main():
         "Puerto Rico": (18.4655, -66.1057)      
     }
     
-    insert_state_centroids(STATE_CENTROIDS)
-
-    cleanup()
-
-    start_gen()
+    if check_model:
+        run_stage("Checking AI model", check_and_download_model)
+    run_stage("Preparing database", create_tables)
+    run_stage("Scraping CDC COVID data", update_covid)
+    run_stage("Updating Worldometers cases", update_cases)
+    run_stage("Downloading RSV data", update_rsv)
+    run_stage("Updating state centroids", lambda: insert_state_centroids(STATE_CENTROIDS))
+    run_stage("Building AI data digest", refresh_ai_digest)
+    run_stage("Cleaning up", cleanup)
+    return failed
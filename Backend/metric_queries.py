@@ -0,0 +1,52 @@
+"""
+Parameterized date-range queries over state_metrics.week_date. With the
+(metric_type, week_date, state, metric_value) index these are covering index
+range scans and never touch the table rows.
+"""
+GRANULARITIES = ("weekly", "monthly")
+
+
+def get_date_bounds(conn, metric_type):
+    """(first, last) ISO week_date for a metric type, or (None, None) if it has no dated rows."""
+    row = conn.execute("""
+        SELECT MIN(week_date), MAX(week_date)
+        FROM state_metrics
+        WHERE metric_type = ? AND week_date IS NOT NULL
+    """, (metric_type,)).fetchone()
+    return (row[0], row[1]) if row else (None, None)
+
+
+def query_metric_range(conn, metric_type, start_date, end_date, granularity="weekly", states=None):
+    """
+    Rows of (state, period, metric_value) between two ISO dates (inclusive),
+    one per state and period. Weekly periods are the week_date itself, averaging
+    the rows stored for that week (repeated downloads, strata); monthly periods
+    are 'YYYY-MM-01' with the weeks of that month averaged. Optionally limited to
+    `states`. Ordered by period, then state.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity: {granularity}")
+
+    params = [metric_type, start_date, end_date]
+    state_filter = ""
+    if states:
+        state_filter = f"AND state IN ({', '.join('?' for _ in states)})"
+        params.extend(states)
+
+    if granularity == "weekly":
+        query = f"""
+            SELECT state, week_date AS period, AVG(metric_value)
+            FROM state_metrics
+            WHERE metric_type = ? AND week_date BETWEEN ? AND ? {state_filter}
+            GROUP BY period, state
+            ORDER BY period, state
+        """
+    else:
+        query = f"""
+            SELECT state, substr(week_date, 1, 7) || '-01' AS period, AVG(metric_value)
+            FROM state_metrics
+            WHERE metric_type = ? AND week_date BETWEEN ? AND ? {state_filter}
+            GROUP BY period, state
+            ORDER BY period, state
+        """
+    return conn.execute(query, params).fetchall()
@@ -0,0 +1,131 @@
+"""
+One shared Ollama client for the app, with model warm-up and per-request
+timing (time to first token, tokens per second, total latency).
+
+    OLLAMA_HOST         server URL (default: the ollama library default, or its own OLLAMA_HOST)
+    OLLAMA_KEEP_ALIVE   how long the server keeps the model loaded after a request (default 30m)
+    OLLAMA_TIMEOUT      seconds to wait for the server (connect, or between streamed chunks) before giving up (default 300)
+"""
+import os
+import queue
+import threading
+import time
+
+MODEL_NAME = 'gemma3:1b-it-q4_K_M'
+OLLAMA_HOST = os.environ.get("OLLAMA_HOST") or None
+OLLAMA_KEEP_ALIVE = os.environ.get("OLLAMA_KEEP_ALIVE", "30m")
+OLLAMA_TIMEOUT = float(os.environ.get("OLLAMA_TIMEOUT", "300"))
+
+# How often a stream waiting on the server checks whether it was cancelled
+CANCEL_POLL_SECONDS = 0.1
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """The shared client, so every request reuses one HTTP connection pool"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            # ollama (httpx, pydantic) is imported on first use, normally on the warm-up thread
+            import ollama
+            _client = ollama.Client(host=OLLAMA_HOST, timeout=OLLAMA_TIMEOUT)
+        return _client
+
+
+def warm_up(model=MODEL_NAME, keep_alive=OLLAMA_KEEP_ALIVE):
+    """
+    Load the model into memory with an empty generate request, so the first
+    question doesn't pay the load time. Returns the seconds it took.
+    """
+    start = time.perf_counter()
+    get_client().generate(model=model, prompt="", keep_alive=keep_alive)
+    elapsed = time.perf_counter() - start
+    print(f"Warmed up {model} in {elapsed:.2f}s (keep_alive {keep_alive})")
+    return elapsed
+
+
+def _read_chunks(chunks, out, stop):
+    """Reader thread: pass stream chunks to `out` (then None) until the stream ends or `stop` is set"""
+    try:
+        for chunk in chunks:
+            if stop.is_set():
+                break
+            out.put(chunk)
+    except Exception as e:
+        out.put(e)
+    finally:
+        # Dropping the HTTP stream makes the server stop generating
+        chunks.close()
+        out.put(None)
+
+
+def stream_chat(messages, metrics, model=MODEL_NAME, keep_alive=OLLAMA_KEEP_ALIVE, cancelled=None):
+    """
+    Yield response text chunks for a chat request. `metrics` (a dict) is filled
+    in once the answer is complete: time_to_first_token, total_seconds, tokens and
+    tokens_per_second (from the server's eval counters when it reports them).
+
+    The HTTP stream is read on a separate thread, so setting `cancelled` (a
+    threading.Event) or closing the generator returns within
+    CANCEL_POLL_SECONDS, even while the server is still loading the model; the
+    request itself is closed as soon as the server sends anything.
+    """
+    start = time.perf_counter()
+    first_token = None
+    tokens = 0
+    eval_count = eval_duration = None
+
+    out = queue.Queue()
+    stop = threading.Event()
+    chunks = get_client().chat(model=model, messages=messages, stream=True, keep_alive=keep_alive)
+    threading.Thread(target=_read_chunks, args=(chunks, out, stop), name="ollama-stream", daemon=True).start()
+    stopped = True
+    try:
+        while True:
+            try:
+                chunk = out.get(timeout=CANCEL_POLL_SECONDS)
+            except queue.Empty:
+                if cancelled is not None and cancelled.is_set():
+                    return
+                continue
+            if chunk is None:
+                stopped = False
+                break
+            if isinstance(chunk, Exception):
+                stopped = False
+                raise chunk
+            content = chunk['message']['content'] if 'message' in chunk else None
+            if content:
+                if first_token is None:
+                    first_token = time.perf_counter()
+                tokens += 1
+                yield content
+            if chunk.get('done'):
+                eval_count = chunk.get('eval_count')
+                eval_duration = chunk.get('eval_duration')
+    finally:
+        stop.set()
+        if stopped:
+            print(f"AI request stopped after {time.perf_counter() - start:.2f}s, {tokens} tokens")
+
+    end = time.perf_counter()
+    metrics['time_to_first_token'] = (first_token or end) - start
+    metrics['total_seconds'] = end - start
+    if eval_count and eval_duration:
+        metrics['tokens'] = eval_count
+        metrics['tokens_per_second'] = eval_count / (eval_duration / 1e9)
+    else:
+        # Fall back to streamed chunks (about one token each) over the generation time
+        generating = end - (first_token or end)
+        metrics['tokens'] = tokens
+        metrics['tokens_per_second'] = tokens / generating if generating > 0 else 0.0
+    print(f"AI request: first token {metrics['time_to_first_token']:.2f}s, "
+          f"{metrics['tokens_per_second']:.1f} tokens/s, {metrics['tokens']} tokens, "
+          f"total {metrics['total_seconds']:.2f}s")
+
+
+def format_metrics(metrics):
+    return (f"First token {metrics['time_to_first_token']:.2f}s · "
+            f"{metrics['tokens_per_second']:.1f} tokens/s · total {metrics['total_seconds']:.1f}s")
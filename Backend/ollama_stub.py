@@ -0,0 +1,163 @@
+"""
+Minimal local stand-in for the Ollama HTTP API, for trying the AI page (and
+its timing numbers) without a model. It streams a canned Markdown answer.
+
+    python -m Backend.ollama_stub --port 11435 --load-seconds 2 --tokens-per-second 30
+    OLLAMA_HOST=http://127.0.0.1:11435 python main.py
+
+The first request after start-up (or after keep_alive runs out) waits
+--load-seconds, like a real model load.
+"""
+import argparse
+import json
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CANNED_ANSWER = (
+    "**RSV** (respiratory syncytial virus) is a common respiratory virus.\n\n"
+    "- Most people recover in a week or two\n"
+    "- Infants and older adults are at higher risk\n\n"
+    "Please consult a healthcare professional for medical advice."
+)
+
+
+def parse_keep_alive(value, default=300.0):
+    """Seconds from an Ollama keep_alive value ("30m", "1h", "45s", a number, or -1 for forever)"""
+    if value is None:
+        return default
+    if isinstance(value, (int, float)):
+        return float("inf") if value < 0 else float(value)
+    units = {"s": 1, "m": 60, "h": 3600}
+    if value[-1:] in units:
+        return float(value[:-1]) * units[value[-1]]
+    return float(value)
+
+
+class StubState:
+    def __init__(self, load_seconds, tokens_per_second, answer):
+        self.load_seconds = load_seconds
+        self.tokens_per_second = tokens_per_second
+        self.answer = answer
+        self.loaded_until = 0.0
+        self.lock = threading.Lock()
+
+    def ensure_loaded(self, keep_alive):
+        with self.lock:
+            if time.monotonic() > self.loaded_until:
+                time.sleep(self.load_seconds)
+            self.loaded_until = time.monotonic() + parse_keep_alive(keep_alive)
+
+
+def make_handler(state):
+    class OllamaStubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _read_json(self):
+            length = int(self.headers.get("Content-Length", 0))
+            return json.loads(self.rfile.read(length) or b"{}")
+
+        def _send_json(self, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _stream(self, lines):
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            try:
+                for line in lines:
+                    data = (json.dumps(line) + "\n").encode("utf-8")
+                    self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+                    self.wfile.flush()
+                self.wfile.write(b"0\r\n\r\n")
+            except (BrokenPipeError, ConnectionResetError):
+                # The client stopped reading (a cancelled answer); stop generating, as Ollama does
+                self.close_connection = True
+
+        def do_GET(self):
+            if self.path == "/api/version":
+                self._send_json({"version": "0.0.0-stub"})
+            elif self.path == "/api/tags":
+                self._send_json({"models": [{"name": "gemma3:1b-it-q4_K_M", "model": "gemma3:1b-it-q4_K_M"}]})
+            else:
+                self.send_error(404)
+
+        def do_HEAD(self):
+            self.send_response(200)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def do_POST(self):
+            request = self._read_json()
+            model = request.get("model", "")
+            start = time.perf_counter()
+            state.ensure_loaded(request.get("keep_alive"))
+            load_duration = int((time.perf_counter() - start) * 1e9)
+            created_at = datetime.now(timezone.utc).isoformat()
+
+            if self.path == "/api/generate":
+                self._send_json({"model": model, "created_at": created_at, "response": "",
+                                 "done": True, "load_duration": load_duration})
+            elif self.path == "/api/chat":
+                words = state.answer.split(" ")
+                tokens = [word + (" " if i < len(words) - 1 else "") for i, word in enumerate(words)]
+
+                def lines():
+                    eval_start = time.perf_counter()
+                    for token in tokens:
+                        time.sleep(1 / state.tokens_per_second)
+                        yield {"model": model, "created_at": created_at,
+                               "message": {"role": "assistant", "content": token}, "done": False}
+                    yield {"model": model, "created_at": created_at,
+                           "message": {"role": "assistant", "content": ""}, "done": True,
+                           "done_reason": "stop", "load_duration": load_duration,
+                           "eval_count": len(tokens),
+                           "eval_duration": int((time.perf_counter() - eval_start) * 1e9)}
+
+                if request.get("stream", True):
+                    self._stream(lines())
+                else:
+                    final = list(lines())[-1]
+                    final["message"]["content"] = state.answer
+                    self._send_json(final)
+            else:
+                self.send_error(404)
+
+    return OllamaStubHandler
+
+
+def serve(host="127.0.0.1", port=11435, load_seconds=2.0, tokens_per_second=30.0, answer=CANNED_ANSWER):
+    """Start the stub in a background thread and return the server (call shutdown() to stop)"""
+    server = ThreadingHTTPServer((host, port), make_handler(StubState(load_seconds, tokens_per_second, answer)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--load-seconds", type=float, default=2.0)
+    parser.add_argument("--tokens-per-second", type=float, default=30.0)
+    args = parser.parse_args()
+
+    server = serve(args.host, args.port, args.load_seconds, args.tokens_per_second)
+    print(f"Ollama stub listening on http://{args.host}:{args.port}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Time and memory-profile every heatmap-generation stage against synthetic
+databases and write the results as JSON.
+
+    python -m benchmarks.bench_heatmap --years 1,4,7 --regions states,counties
+
+Each combination of the comma separated scale options is one scenario, so a
+sweep over years or regions gives a scaling curve.
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import shutil
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+from Backend.generate_heatmap import (
+    fetch_heatmap_data, generate_heatmap_html, get_distinct_years, start_gen
+)
+from benchmarks.synthetic_data import DEFAULT_METRICS, build_synthetic_db
+
+
+def measure(func, repeat):
+    """Run `func` `repeat` times for timing, then once more under tracemalloc for peak memory."""
+    times = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return result, {
+        "times_s": times,
+        "median_s": statistics.median(times),
+        "min_s": min(times),
+        "peak_kib": peak / 1024
+    }
+
+
+def run_scenario(scenario, work_dir, repeat):
+    db_name = os.path.join(work_dir, "health_data.db")
+    start = time.perf_counter()
+    rows = build_synthetic_db(db_name, scenario["regions"], scenario["states"],
+                              scenario["counties_per_state"], scenario["start_year"],
+                              scenario["years"], scenario["weeks"], scenario["metrics"])
+    build_s = time.perf_counter() - start
+
+    results = []
+
+    def record(stage, func, **params):
+        output, stats = measure(func, repeat)
+        entry = {"stage": stage, "params": params, **stats}
+        if isinstance(output, list):
+            entry["points"] = len(output)
+        results.append(entry)
+
+    for metric_type in scenario["metrics"]:
+        if metric_type == "COVID_Positivity":
+            periods = [("Past 4 Weeks", True)]
+        else:
+            years = get_distinct_years(metric_type, db_name=db_name)
+            periods = [(years[-1], False)] if years else []
+
+        for period, exact in periods:
+            record("fetch_heatmap_data",
+                   lambda: fetch_heatmap_data(db_name, metric_type, period, exact),
+                   metric_type=metric_type, period=period)
+            for mode in ("browser", "raster"):
+                output_file = os.path.join(work_dir, f"bench_{metric_type}_{mode}.html")
+                record("generate_heatmap_html",
+                       lambda: generate_heatmap_html(metric_type, period, output_file, exact,
+                                                     db_name=db_name, mode=mode),
+                       metric_type=metric_type, period=period, mode=mode)
+
+    for mode in ("browser", "raster"):
+        output_dir = os.path.join(work_dir, f"start_gen_{mode}")
+        os.makedirs(output_dir, exist_ok=True)
+        record("start_gen",
+               lambda: start_gen(mode=mode, db_name=db_name, output_dir=output_dir),
+               mode=mode)
+
+    return {"scenario": scenario, "metric_rows": rows, "build_db_s": build_s, "stages": results}
+
+
+def parse_list(value, cast=str):
+    return [cast(item) for item in value.split(",") if item]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark heatmap generation")
+    parser.add_argument("--regions", default="states", help="Comma separated: states,counties")
+    parser.add_argument("--states", type=int, default=52)
+    parser.add_argument("--counties-per-state", type=int, default=60)
+    parser.add_argument("--start-year", type=int, default=2017)
+    parser.add_argument("--years", default="7", help="Comma separated list, e.g. 1,4,7")
+    parser.add_argument("--weeks", default="52", help="Comma separated list")
+    parser.add_argument("--metrics", default=",".join(DEFAULT_METRICS),
+                        help="Comma separated metric types")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default="bench_heatmap.json")
+    args = parser.parse_args()
+
+    scenarios = [
+        {
+            "regions": regions,
+            "states": args.states,
+            "counties_per_state": args.counties_per_state,
+            "start_year": args.start_year,
+            "years": years,
+            "weeks": weeks,
+            "metrics": parse_list(args.metrics)
+        }
+        for regions, years, weeks in itertools.product(
+            parse_list(args.regions), parse_list(args.years, int), parse_list(args.weeks, int)
+        )
+    ]
+
+    report = {
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")
+        },
+        "repeat": args.repeat,
+        "scenarios": []
+    }
+
+    for scenario in scenarios:
+        work_dir = tempfile.mkdtemp(prefix="bench_heatmap_")
+        try:
+            print(f"Running {scenario['regions']}, {scenario['years']} years x {scenario['weeks']} weeks...")
+            result = run_scenario(scenario, work_dir, args.repeat)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+        report["scenarios"].append(result)
+        for stage in result["stages"]:
+            print(f"  {stage['stage']:<22} {stage['params']} "
+                  f"median {stage['median_s'] * 1000:.1f} ms, peak {stage['peak_kib']:.0f} KiB")
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
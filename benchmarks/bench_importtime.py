@@ -0,0 +1,169 @@
+"""
+Measure import time with `python -X importtime` in fresh interpreters and check
+it against a budget. Exits non-zero when a target is over budget or imports a
+module it must not (the headless CLI must never load Qt; the GUI must not load
+WebEngine, pandas, folium or the scrapers before its first window).
+
+    python -m benchmarks.bench_importtime --targets cli,gui,first-window --repeat 5 --output bench_importtime.json
+
+`first-window` times the app from the start of `import main` until the
+dashboard window has been shown and painted once (offscreen unless
+QT_QPA_PLATFORM is set). Each run is a new process, so nothing is cached in
+sys.modules; the median of `--repeat` runs is compared with the budget, and
+reported against the stored baseline (importtime_baseline.json: the same targets
+measured before heavy imports were deferred).
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "importtime_baseline.json")
+
+# Heavy modules the dashboard must not need before its first window
+DEFERRED_MODULES = ("PyQt6.QtWebEngineWidgets", "PyQt6.QtWebEngineCore", "pandas", "plotly", "folium",
+                    "requests", "requests_html", "bs4", "ollama", "markdown")
+
+FIRST_WINDOW_CODE = """
+import os, sys, time
+start = time.perf_counter()
+import main
+app = main.create_application(sys.argv)
+main.create_tables()
+window = main.ModernDashboard()
+window.show()
+app.processEvents()
+print(f"first_window_ms {(time.perf_counter() - start) * 1000:.1f}", flush=True)
+os._exit(0)
+"""
+
+# name -> (code to run, budget in ms, module prefixes that must not be imported)
+TARGETS = {
+    "cli": ("import Backend.cli", 100, ("PyQt6", "frontend", "pandas", "folium", "requests_html", "ollama")),
+    "gui": ("import main", 150, DEFERRED_MODULES),
+    "first-window": (FIRST_WINDOW_CODE, 600, ()),
+}
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def parse_importtime(stderr):
+    """[(module, self_us, cumulative_us, depth)] from -X importtime output"""
+    entries = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            entries.append((module, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return entries
+
+
+def run_first_window():
+    """Milliseconds from `import main` to the first shown dashboard, in a fresh process"""
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    result = subprocess.run([sys.executable, "-c", FIRST_WINDOW_CODE], capture_output=True, text=True,
+                            check=True, cwd=REPO_ROOT, env=env)
+    line = next(line for line in result.stdout.splitlines() if line.startswith("first_window_ms"))
+    return {"total_ms": float(line.split()[1]), "top_level": [], "modules": []}
+
+
+def run_once(code):
+    """Total import time (ms), top-level imports by cumulative time, and the loaded module names"""
+    if code == FIRST_WINDOW_CODE:
+        return run_first_window()
+    script = f"{code}\nimport sys\nprint('\\n'.join(sorted(sys.modules)))"
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", script],
+                            capture_output=True, text=True, check=True, cwd=REPO_ROOT)
+    entries = parse_importtime(result.stderr)
+    top_level = sorted(((module, cumulative) for module, _, cumulative, depth in entries if depth == 0),
+                       key=lambda item: item[1], reverse=True)
+    return {
+        "total_ms": sum(self_us for _, self_us, _, _ in entries) / 1000,
+        "top_level": [{"module": module, "cumulative_ms": cumulative / 1000} for module, cumulative in top_level],
+        "modules": result.stdout.split()
+    }
+
+
+def load_baseline(path=BASELINE_FILE):
+    """{target: baseline median ms} from a stored reference, or {} if there is none"""
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return {name: target["median_ms"] for name, target in json.load(f)["targets"].items()}
+
+
+def measure_target(name, repeat, budget_ms=None):
+    code, default_budget, forbidden = TARGETS[name]
+    budget_ms = budget_ms or default_budget
+    runs = [run_once(code) for _ in range(repeat)]
+    totals = [run["total_ms"] for run in runs]
+    median = statistics.median(totals)
+    loaded_forbidden = sorted({module for module in runs[0]["modules"]
+                               if any(module == prefix or module.startswith(prefix + ".") for prefix in forbidden)})
+    return {
+        "target": name,
+        "code": code.strip(),
+        "budget_ms": budget_ms,
+        "median_ms": median,
+        "min_ms": min(totals),
+        "max_ms": max(totals),
+        "slowest_imports": runs[0]["top_level"][:10],
+        "forbidden_imports": loaded_forbidden,
+        "ok": median <= budget_ms and not loaded_forbidden
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time budget check")
+    parser.add_argument("--targets", default=",".join(TARGETS), help=f"Comma separated: {','.join(TARGETS)}")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=None, help="Override every target's budget")
+    parser.add_argument("--output", default=None, help="Also write the results as JSON")
+    parser.add_argument("--baseline", default=BASELINE_FILE,
+                        help="Stored reference to compare with (default: benchmarks/importtime_baseline.json)")
+    args = parser.parse_args()
+
+    baseline = load_baseline(args.baseline)
+    results = []
+    for name in [target.strip() for target in args.targets.split(",") if target.strip()]:
+        if name not in TARGETS:
+            parser.error(f"unknown target {name!r}")
+        result = measure_target(name, args.repeat, args.budget_ms)
+        result["baseline_ms"] = baseline.get(name)
+        results.append(result)
+
+        status = "ok" if result["ok"] else "OVER BUDGET" if not result["forbidden_imports"] else "FORBIDDEN IMPORTS"
+        print(f"{name}: median {result['median_ms']:.1f} ms (budget {result['budget_ms']:.0f} ms, "
+              f"min {result['min_ms']:.1f}, max {result['max_ms']:.1f}) {status}")
+        if result["baseline_ms"]:
+            print(f"    baseline {result['baseline_ms']:.1f} ms, now "
+                  f"{result['baseline_ms'] / result['median_ms']:.1f}x faster")
+        for item in result["slowest_imports"][:5]:
+            print(f"    {item['cumulative_ms']:8.1f} ms  {item['module']}")
+        if result["forbidden_imports"]:
+            print(f"    imports {', '.join(result['forbidden_imports'][:10])}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "environment": {
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")
+                },
+                "repeat": args.repeat,
+                "targets": results
+            }, f, indent=2)
+
+    return 0 if all(result["ok"] for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
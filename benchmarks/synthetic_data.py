@@ -0,0 +1,111 @@
+"""
+Build a synthetic health_data.db with the same schema the app uses, at a
+configurable scale, so heatmap generation can be benchmarked without scraping.
+"""
+import argparse
+import datetime
+import math
+import os
+import random
+import sqlite3
+
+from Backend.db import bump_data_generation, refresh_metric_snapshot
+from Backend.main import create_tables
+
+# Roughly the continental US plus Alaska/Hawaii/Puerto Rico, used to scatter
+# synthetic centroids when more regions than real states are requested.
+LAT_RANGE = (18.0, 64.0)
+LON_RANGE = (-160.0, -66.0)
+
+DEFAULT_METRICS = ["COVID_Positivity", "RSV_Rate"]
+
+
+def region_names(regions="states", states=52, counties_per_state=60):
+    names = [f"State {i:02d}" for i in range(states)]
+    if regions == "counties":
+        return [f"County {j:03d}, {state}" for state in names for j in range(counties_per_state)]
+    return names
+
+
+def week_endings(start_year, years, weeks):
+    """ISO week-ending dates (Saturdays) for `weeks` weeks of each year."""
+    dates = []
+    for year in range(start_year, start_year + years):
+        first = datetime.date(year, 1, 1)
+        first += datetime.timedelta(days=(5 - first.weekday()) % 7)
+        dates.extend((first + datetime.timedelta(weeks=w)).isoformat() for w in range(weeks))
+    return dates
+
+
+def build_synthetic_db(db_name, regions="states", states=52, counties_per_state=60,
+                       start_year=2017, years=7, weeks=52, metrics=None, seed=0):
+    """
+    Create `db_name` from scratch and fill it with centroids and weekly metrics.
+    COVID_Positivity gets a single "Past 4 Weeks" row per region, like the CDC
+    scrape; every other metric gets one row per region per week.
+    Returns the number of state_metrics rows written.
+    """
+    metrics = metrics or DEFAULT_METRICS
+    rng = random.Random(seed)
+
+    if os.path.exists(db_name):
+        os.unlink(db_name)
+    create_tables(db_name)
+
+    names = region_names(regions, states, counties_per_state)
+    centroids = [(name, rng.uniform(*LAT_RANGE), rng.uniform(*LON_RANGE)) for name in names]
+    dates = week_endings(start_year, years, weeks)
+
+    conn = sqlite3.connect(db_name)
+    cursor = conn.cursor()
+    cursor.executemany(
+        "INSERT INTO state_centroids (state, latitude, longitude) VALUES (?, ?, ?)",
+        centroids
+    )
+
+    total = 0
+    for metric_type in metrics:
+        if metric_type == "COVID_Positivity":
+            rows = [(name, metric_type, rng.uniform(0, 25), "Past 4 Weeks", None) for name in names]
+        else:
+            rows = []
+            for name in names:
+                base = rng.uniform(0.5, 5.0)
+                for i, date in enumerate(dates):
+                    seasonal = 1 + math.sin(2 * math.pi * (i % weeks) / max(weeks, 1))
+                    rows.append((name, metric_type, base * seasonal * rng.uniform(0.8, 1.2), date, date))
+        cursor.executemany(
+            "INSERT INTO state_metrics (state, metric_type, metric_value, year, week_date) VALUES (?, ?, ?, ?, ?)",
+            rows
+        )
+        total += len(rows)
+
+    bump_data_generation(conn)
+    refresh_metric_snapshot(conn)
+    conn.commit()
+    conn.close()
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic health_data.db")
+    parser.add_argument("--db", default="synthetic_health_data.db")
+    parser.add_argument("--regions", choices=["states", "counties"], default="states")
+    parser.add_argument("--states", type=int, default=52)
+    parser.add_argument("--counties-per-state", type=int, default=60)
+    parser.add_argument("--start-year", type=int, default=2017)
+    parser.add_argument("--years", type=int, default=7)
+    parser.add_argument("--weeks", type=int, default=52)
+    parser.add_argument("--metrics", default=",".join(DEFAULT_METRICS),
+                        help="Comma separated metric types")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rows = build_synthetic_db(args.db, args.regions, args.states, args.counties_per_state,
+                              args.start_year, args.years, args.weeks,
+                              args.metrics.split(","), args.seed)
+    print(f"Wrote {rows} metric rows to {args.db}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Two-tier cache of built chart payloads (figure JSON + title): an in-memory LRU
+in front of a directory of JSON files. Keys combine the chart request with the
+data generation, so anything cached before the last ingestion is never served.
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+
+class ChartCache:
+    def __init__(self, cache_dir, max_memory_entries=64, max_disk_entries=512):
+        self.cache_dir = str(cache_dir)
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_generation = None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(request, generation):
+        digest = hashlib.sha1(json.dumps(request, sort_keys=True).encode("utf-8")).hexdigest()
+        return f"g{generation}_{digest}"
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, request, generation):
+        """Cached payload for (request, generation), or None"""
+        key = self.make_key(request, generation)
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return self._memory[key]
+
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                payload = json.load(f)
+            os.utime(self._path(key))
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.disk_hits += 1
+            self._remember(key, payload)
+        return payload
+
+    def put(self, request, generation, payload):
+        key = self.make_key(request, generation)
+        with self._lock:
+            self._remember(key, payload)
+            if self._disk_generation != generation:
+                self._disk_generation = generation
+                self._drop_other_generations(generation)
+
+        partial = self._path(key) + ".partial"
+        try:
+            with open(partial, "w", encoding="utf-8") as f:
+                json.dump(payload, f)
+            os.replace(partial, self._path(key))
+        except OSError as e:
+            print(f"Could not write chart cache entry: {e}")
+            return
+        self._trim_disk()
+
+    def get_or_build(self, request, generation, build):
+        """Cached payload, or build() it and cache the result"""
+        payload = self.get(request, generation)
+        if payload is None:
+            payload = build()
+            self.put(request, generation, payload)
+        return payload
+
+    def stats(self):
+        with self._lock:
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "memory_entries": len(self._memory)
+            }
+
+    def _remember(self, key, payload):
+        self._memory[key] = payload
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _drop_other_generations(self, generation):
+        """Ingestion wrote new rows: everything from older generations is dead"""
+        prefix = f"g{generation}_"
+        for key in [key for key in self._memory if not key.startswith(prefix)]:
+            del self._memory[key]
+        for name in os.listdir(self.cache_dir):
+            if not name.startswith(prefix):
+                try:
+                    os.unlink(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
+
+    def _trim_disk(self):
+        try:
+            names = [name for name in os.listdir(self.cache_dir) if name.endswith(".json")]
+        except OSError:
+            return
+        if len(names) <= self.max_disk_entries:
+            return
+        paths = [os.path.join(self.cache_dir, name) for name in names]
+        paths.sort(key=lambda path: os.path.getmtime(path) if os.path.exists(path) else 0)
+        for path in paths[:len(paths) - self.max_disk_entries]:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
@@ -0,0 +1,411 @@
+"""
+Model/view chat transcript for the AI assistant page.
+
+Messages live in a QAbstractListModel and are painted by a delegate, so only
+the visible bubbles are drawn and no widget exists per message. Rendered HTML
+is kept on each message; laid-out documents and row heights are cached per
+message version and width, and the view lays rows out in batches. Finished
+messages are appended to a JSONL history file; the latest page is shown at
+start and older pages are read in when the view is scrolled to the top.
+"""
+import html
+import json
+import os
+from collections import OrderedDict
+
+import markdown
+from PyQt6.QtCore import (QAbstractListModel, QEvent, QModelIndex, QPersistentModelIndex, QPoint, QPointF, QRectF,
+                          QSize, Qt, QTimer, QUrl)
+from PyQt6.QtGui import (QColor, QDesktopServices, QGuiApplication, QKeySequence, QPainter,
+                         QPainterPath, QPalette, QTextDocument, QAbstractTextDocumentLayout)
+from PyQt6.QtWidgets import QAbstractItemView, QListView, QStyle, QStyledItemDelegate
+
+from frontend.markdown_stream import IncrementalMarkdown
+
+CHAT_HISTORY_FILE = os.environ.get("AI_CHAT_HISTORY_FILE", "chat_history.jsonl")
+TRANSCRIPT_PAGE_SIZE = 50
+DOCUMENT_CACHE_SIZE = 200
+# Row heights are tiny, so far more are kept than documents
+SIZE_HINT_CACHE_SIZE = 5000
+# Rows laid out per pass of the view; a page of history fits in one
+TRANSCRIPT_BATCH_SIZE = TRANSCRIPT_PAGE_SIZE
+
+# How close (in pixels) to the bottom still counts as following the conversation
+SCROLL_BOTTOM_TOLERANCE = 20
+
+# Streamed text is re-rendered at most once per frame (~30 fps)
+RENDER_INTERVAL_MS = 33
+
+MESSAGE_ROLE = Qt.ItemDataRole.UserRole
+HTML_ROLE = Qt.ItemDataRole.UserRole + 1
+
+USER_BUBBLE = QColor("#444561")
+AI_BUBBLE = QColor("#2F3044")
+SELECTED_BORDER = QColor("#6c63ff")
+TEXT_COLOR = QColor("#FFFFFF")
+DOCUMENT_STYLE = "a { color: #8ab4f8; } pre, code { background-color: #1E1E2F; }"
+
+SIDE_MARGIN = 50
+PADDING_X = 12
+PADDING_Y = 10
+ITEM_SPACING = 15
+RADIUS = 15
+TAIL_RADIUS = 5
+
+
+class ChatHistoryStore:
+    """Append-only JSONL file of finished messages, readable by line range"""
+
+    def __init__(self, path=CHAT_HISTORY_FILE):
+        self.path = path
+        self.offsets = []
+        try:
+            with open(self.path, "rb") as f:
+                position = 0
+                for line in f:
+                    if line.strip():
+                        self.offsets.append(position)
+                    position += len(line)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"Error reading chat history: {e}")
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def read(self, start, stop):
+        """Messages start..stop-1 (skipping lines that fail to parse)"""
+        messages = []
+        try:
+            with open(self.path, "rb") as f:
+                for offset in self.offsets[start:stop]:
+                    f.seek(offset)
+                    try:
+                        record = json.loads(f.readline())
+                        messages.append({"role": record["role"], "text": record["text"]})
+                    except (ValueError, KeyError) as e:
+                        print(f"Skipping unreadable chat history line: {e}")
+        except OSError as e:
+            print(f"Error reading chat history: {e}")
+        return messages
+
+    def append(self, message):
+        line = (json.dumps({"role": message["role"], "text": message["text"]}) + "\n").encode("utf-8")
+        try:
+            with open(self.path, "ab") as f:
+                position = f.tell()
+                f.write(line)
+            self.offsets.append(position)
+        except OSError as e:
+            print(f"Error saving chat history: {e}")
+
+
+class TranscriptModel(QAbstractListModel):
+    """
+    Chat messages as dicts ({'role', 'text', 'html', 'version'}). At most one
+    message streams at a time; its HTML is re-rendered on a frame timer.
+    """
+
+    def __init__(self, store=None, page_size=TRANSCRIPT_PAGE_SIZE, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.page_size = page_size
+        self.messages = []
+        self.next_key = 0
+        # Messages store[:history_start] have not been read in yet
+        self.history_start = len(store) if store is not None else 0
+
+        self.streaming = None
+        self.renderer = IncrementalMarkdown()
+        self.render_timer = QTimer(self)
+        self.render_timer.setSingleShot(True)
+        self.render_timer.setInterval(RENDER_INTERVAL_MS)
+        self.render_timer.timeout.connect(self.render_pending)
+
+        self.load_older()
+
+    def _message(self, role, text):
+        self.next_key += 1
+        return {"key": self.next_key, "role": role, "text": text, "html": None, "version": 0}
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.messages)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        message = self.messages[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return message["text"]
+        if role == MESSAGE_ROLE:
+            return message
+        if role == HTML_ROLE:
+            if message["html"] is None:
+                message["html"] = render_html(message)
+            return message["html"]
+        return None
+
+    def has_older(self):
+        return self.history_start > 0
+
+    def load_older(self):
+        """Read the previous page of history in above the loaded messages; returns how many"""
+        if not self.has_older():
+            return 0
+        start = max(0, self.history_start - self.page_size)
+        older = [self._message(record["role"], record["text"])
+                 for record in self.store.read(start, self.history_start)]
+        self.history_start = start
+        if older:
+            self.beginInsertRows(QModelIndex(), 0, len(older) - 1)
+            self.messages[:0] = older
+            self.endInsertRows()
+        return len(older)
+
+    def add_message(self, text, is_user, persist=True):
+        """Append a finished message (saved to the history unless persist is False)"""
+        message = self._message("user" if is_user else "assistant", text)
+        self._append(message)
+        if persist:
+            self.save(message)
+        return message
+
+    def save(self, message):
+        """Append a message to the history file (for ones added with persist=False)"""
+        if self.store is not None and message["text"].strip():
+            self.store.append(message)
+
+    def start_streaming(self):
+        """Append an empty assistant message that update_streaming() fills in"""
+        self.streaming = self._message("assistant", "")
+        self.streaming["html"] = ""
+        self.renderer.reset()
+        self._append(self.streaming)
+
+    def update_streaming(self, text):
+        """
+        Set the streaming text. Markdown is rendered on the next frame tick, so a
+        burst of tokens costs one render, and only the still-open last block is re-rendered.
+        """
+        if self.streaming is None:
+            return
+        self.streaming["text"] = text
+        if not self.render_timer.isActive():
+            self.render_timer.start()
+
+    def render_pending(self):
+        if self.streaming is not None:
+            self._set_html(self.streaming, self.renderer.feed(self.streaming["text"]))
+
+    def finish_streaming(self, text=None, persist=True):
+        """Streaming is over: render the complete text once, as a whole, and save it"""
+        message = self.streaming
+        if message is None:
+            return
+        self.render_timer.stop()
+        self.streaming = None
+        if text is not None:
+            message["text"] = text
+        self._set_html(message, render_html(message))
+        if persist:
+            self.save(message)
+
+    def _append(self, message):
+        row = len(self.messages)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.messages.append(message)
+        self.endInsertRows()
+
+    def _set_html(self, message, rendered):
+        message["html"] = rendered
+        message["version"] += 1
+        # The streaming message is almost always the last one
+        for row in range(len(self.messages) - 1, -1, -1):
+            if self.messages[row] is message:
+                index = self.index(row)
+                self.dataChanged.emit(index, index)
+                break
+
+
+def render_html(message):
+    if message["role"] == "user":
+        return html.escape(message["text"]).replace("\n", "<br>")
+    return markdown.markdown(message["text"])
+
+
+class MessageDelegate(QStyledItemDelegate):
+    """Paints messages as chat bubbles from cached, laid-out HTML documents"""
+
+    def __init__(self, view):
+        super().__init__(view)
+        self.view = view
+        self.documents = OrderedDict()
+        self.size_hints = OrderedDict()
+
+    def text_width(self):
+        return max(50, self.view.viewport().width() - SIDE_MARGIN - 2 * PADDING_X)
+
+    def cache_key(self, index):
+        message = index.data(MESSAGE_ROLE)
+        return message["key"], message["version"], self.text_width()
+
+    def document(self, index):
+        key = self.cache_key(index)
+        width = key[2]
+        document = self.documents.get(key)
+        if document is not None:
+            self.documents.move_to_end(key)
+            return document
+
+        document = QTextDocument()
+        document.setDefaultFont(self.view.font())
+        document.setDefaultStyleSheet(DOCUMENT_STYLE)
+        document.setDocumentMargin(0)
+        document.setHtml(index.data(HTML_ROLE))
+        document.setTextWidth(width)
+        self.documents[key] = document
+        while len(self.documents) > DOCUMENT_CACHE_SIZE:
+            self.documents.popitem(last=False)
+        return document
+
+    def bubble_rect(self, rect, index):
+        """Bubble area inside an item rect (user messages sit on the right)"""
+        is_user = index.data(MESSAGE_ROLE)["role"] == "user"
+        left = rect.left() + (SIDE_MARGIN if is_user else 0)
+        width = rect.width() - SIDE_MARGIN
+        return QRectF(left, rect.top(), width, rect.height() - ITEM_SPACING)
+
+    def sizeHint(self, option, index):
+        # Layout asks for every row's height; only rows being painted need their document
+        key = self.cache_key(index)
+        size = self.size_hints.get(key)
+        if size is not None:
+            self.size_hints.move_to_end(key)
+            return size
+
+        height = self.document(index).size().height()
+        size = QSize(self.view.viewport().width(), int(height) + 2 * PADDING_Y + ITEM_SPACING)
+        self.size_hints[key] = size
+        while len(self.size_hints) > SIZE_HINT_CACHE_SIZE:
+            self.size_hints.popitem(last=False)
+        return size
+
+    def paint(self, painter, option, index):
+        is_user = index.data(MESSAGE_ROLE)["role"] == "user"
+        bubble = self.bubble_rect(option.rect, index)
+
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        path = QPainterPath()
+        path.addRoundedRect(bubble, RADIUS, RADIUS)
+        # The corner next to the speaker is sharper, like a speech bubble tail
+        tail = QPainterPath()
+        corner = bubble.topRight() if is_user else bubble.topLeft()
+        tail_x = corner.x() - 2 * RADIUS if is_user else corner.x()
+        tail.addRoundedRect(QRectF(tail_x, corner.y(), 2 * RADIUS, 2 * RADIUS), TAIL_RADIUS, TAIL_RADIUS)
+        path = path.united(tail)
+        painter.fillPath(path, USER_BUBBLE if is_user else AI_BUBBLE)
+        if option.state & QStyle.StateFlag.State_Selected:
+            painter.setPen(SELECTED_BORDER)
+            painter.drawPath(path)
+
+        painter.translate(bubble.left() + PADDING_X, bubble.top() + PADDING_Y)
+        context = QAbstractTextDocumentLayout.PaintContext()
+        context.palette.setColor(QPalette.ColorRole.Text, TEXT_COLOR)
+        self.document(index).documentLayout().draw(painter, context)
+        painter.restore()
+
+    def anchor_at(self, index, rect, position):
+        bubble = self.bubble_rect(rect, index)
+        point = position - bubble.topLeft() - QPointF(PADDING_X, PADDING_Y)
+        return self.document(index).documentLayout().anchorAt(point)
+
+    def editorEvent(self, event, model, option, index):
+        # Links in answers open in the browser, as they did in the old QLabel bubbles
+        if event.type() == QEvent.Type.MouseButtonRelease and event.button() == Qt.MouseButton.LeftButton:
+            anchor = self.anchor_at(index, option.rect, event.position())
+            if anchor:
+                QDesktopServices.openUrl(QUrl(anchor))
+                return True
+        return super().editorEvent(event, model, option, index)
+
+
+class TranscriptView(QListView):
+    """
+    List view for a TranscriptModel. Follows new output while scrolled to the
+    bottom; scrolling to the top reads in older history, keeping the visible
+    messages in place. Ctrl+C copies the selected message.
+    """
+
+    def __init__(self, model, parent=None):
+        super().__init__(parent)
+        self.setModel(model)
+        self.delegate = MessageDelegate(self)
+        self.setItemDelegate(self.delegate)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.setResizeMode(QListView.ResizeMode.Adjust)
+        self.setLayoutMode(QListView.LayoutMode.Batched)
+        self.setBatchSize(TRANSCRIPT_BATCH_SIZE)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.setMouseTracking(True)
+
+        # Re-rendered messages change height, so their rows need laying out again
+        model.dataChanged.connect(self.handle_data_changed)
+
+        # New output is followed only while the user is at the bottom; scrolling
+        # up to read earlier messages keeps them in place instead
+        self.follow_output = True
+        # (message at the top, its y), updated whenever the user scrolls
+        self.anchor = None
+        self.verticalScrollBar().valueChanged.connect(self.handle_scroll)
+        self.verticalScrollBar().rangeChanged.connect(self.handle_scroll_range)
+
+    def handle_data_changed(self, top_left, bottom_right):
+        for row in range(top_left.row(), bottom_right.row() + 1):
+            self.delegate.sizeHintChanged.emit(self.model().index(row))
+
+    def handle_scroll(self, value):
+        # While a batched layout is in progress the range is too short and the
+        # value is clamped to it; that is not the user scrolling
+        if not self.layout_done():
+            return
+        scroll_bar = self.verticalScrollBar()
+        self.follow_output = value >= scroll_bar.maximum() - SCROLL_BOTTOM_TOLERANCE
+        self.anchor = self.top_anchor()
+        if value == scroll_bar.minimum() and scroll_bar.maximum() > 0 and self.model().has_older():
+            self.model().load_older()
+
+    def top_anchor(self):
+        """The message at the top of the viewport and its y, or None"""
+        top = self.indexAt(QPoint(0, 0))
+        return (QPersistentModelIndex(top), self.visualRect(top).top()) if top.isValid() else None
+
+    def layout_done(self):
+        rows = self.model().rowCount()
+        return rows == 0 or self.visualRect(self.model().index(rows - 1)).isValid()
+
+    def handle_scroll_range(self, minimum, maximum):
+        if not self.layout_done():
+            return
+        scroll_bar = self.verticalScrollBar()
+        if self.follow_output:
+            scroll_bar.setValue(maximum)
+        elif self.anchor is not None and self.anchor[0].isValid():
+            # Rows laid out again (older history read in, a resize, a re-rendered
+            # message) keep the top message in place
+            index, top = self.anchor
+            scroll_bar.setValue(scroll_bar.value() + self.visualRect(QModelIndex(index)).top() - top)
+
+    def mouseMoveEvent(self, event):
+        index = self.indexAt(event.position().toPoint())
+        over_link = index.isValid() and self.delegate.anchor_at(index, self.visualRect(index), event.position())
+        self.viewport().setCursor(Qt.CursorShape.PointingHandCursor if over_link else Qt.CursorShape.ArrowCursor)
+        super().mouseMoveEvent(event)
+
+    def keyPressEvent(self, event):
+        if event.matches(QKeySequence.StandardKey.Copy) and self.currentIndex().isValid():
+            QGuiApplication.clipboard().setText(self.currentIndex().data())
+            return
+        super().keyPressEvent(event)
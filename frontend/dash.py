@@ -1,4 +1,6 @@
-from PyQt6.QtCore import Qt, QEasingCurve, QPropertyAnimation, QRect, QAbstractAnimation
+import os
+
+from PyQt6.QtCore import Qt, QEasingCurve, QPropertyAnimation, QRect, QAbstractAnimation, QTimer
 from PyQt6.QtGui import QIcon, QPainter
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QFrame, QStackedWidget,
@@ -7,12 +9,15 @@ from PyQt6.QtWidgets import (
 )
 
 from frontend.pages.dashboard import create_dashboard_page
-from frontend.pages.heatmap import create_heatmap_page
-from frontend.pages.stats import create_stats_page
-from frontend.pages.ai_assistant import create_ai_assistant_page
 
 from frontend.widgets import ResizeHandle
 
+# Pages other than the dashboard are built on first navigation. With prefetch on,
+# the rest are built one per idle tick once the window is up. Their modules (and
+# WebEngine, folium, pandas, plotly, ollama) are only imported when they are built.
+PREFETCH_PAGES = os.environ.get("DASHBOARD_PREFETCH_PAGES", "1") != "0"
+PREFETCH_DELAY_MS = 1500
+
 class ModernDashboard(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -44,16 +49,20 @@ class ModernDashboard(QMainWindow):
         main_layout.addWidget(content_frame)
 
         self.dashboard_page = create_dashboard_page(self.navigate_to_heatmap, self.navigate_to_stats)
-        
-        self.heatmap_page, self.filter_sidebar_inpage = create_heatmap_page(
-            self.toggle_inpage_sidebar
-        )
-
-        self.stats_page = create_stats_page()
-
+        self.heatmap_page = None
+        self.filter_sidebar_inpage = None
+        self.stats_page = None
+        self.ai_assistant_page = None
+
+        # Stack index -> factory; each placeholder is swapped for the real page when built
+        self.page_factories = {
+            1: self.build_heatmap_page,
+            2: self.build_stats_page,
+            3: self.build_ai_assistant_page
+        }
         self.stacked_widget.addWidget(self.dashboard_page)
-        self.stacked_widget.addWidget(self.heatmap_page)
-        self.stacked_widget.addWidget(self.stats_page)
+        for index in sorted(self.page_factories):
+            self.stacked_widget.addWidget(self.create_page_placeholder())
 
         self.overlay = self.create_overlay()
         self.overlay.setParent(self)
@@ -70,17 +79,84 @@ class ModernDashboard(QMainWindow):
 
         self.sidebar_animation = None
 
+        if PREFETCH_PAGES:
+            QTimer.singleShot(PREFETCH_DELAY_MS, self.prefetch_next_page)
+
+    def create_page_placeholder(self):
+        placeholder = QLabel("Loading...")
+        placeholder.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        placeholder.setStyleSheet("color: #FFFFFF; font-size: 16px;")
+        return placeholder
+
+    def build_heatmap_page(self):
+        from frontend.pages.heatmap import create_heatmap_page
+        self.heatmap_page, self.filter_sidebar_inpage = create_heatmap_page(
+            self.toggle_inpage_sidebar
+        )
+        return self.heatmap_page
+
+    def build_stats_page(self):
+        from frontend.pages.stats import create_stats_page
+        self.stats_page = create_stats_page()
+        return self.stats_page
+
+    def build_ai_assistant_page(self):
+        from frontend.pages.ai_assistant import create_ai_assistant_page
         self.ai_assistant_page = create_ai_assistant_page()
-        self.stacked_widget.addWidget(self.ai_assistant_page)
+        return self.ai_assistant_page
+
+    def replace_page(self, index, page):
+        old_page = self.stacked_widget.widget(index)
+        was_current = self.stacked_widget.currentIndex() == index
+        self.stacked_widget.insertWidget(index, page)
+        self.stacked_widget.removeWidget(old_page)
+        old_page.deleteLater()
+        if was_current:
+            self.stacked_widget.setCurrentIndex(index)
+
+    def ensure_page(self, index):
+        """Build the page at `index` if it is still a placeholder"""
+        factory = self.page_factories.pop(index, None)
+        if factory is not None:
+            self.replace_page(index, factory())
+
+    def show_page(self, index):
+        self.ensure_page(index)
+        self.stacked_widget.setCurrentIndex(index)
+
+    def prefetch_next_page(self):
+        """Build one remaining page, then yield to the event loop before the next"""
+        if not self.page_factories:
+            return
+        self.ensure_page(min(self.page_factories))
+        if self.page_factories:
+            QTimer.singleShot(0, self.prefetch_next_page)
 
     def navigate_to_heatmap(self):
-        self.stacked_widget.setCurrentIndex(1)  
+        self.show_page(1)
 
     def navigate_to_stats(self):
-        self.stacked_widget.setCurrentIndex(2) 
+        self.show_page(2)
     
     def navigate_to_ai_assistant(self):
-        self.stacked_widget.setCurrentIndex(3)
+        self.show_page(3)
+
+    def show_refresh_status(self, stage):
+        self.title_label.setText(f"Health Dashboard - {stage}...")
+
+    def finish_refresh_status(self, error=""):
+        if error:
+            self.title_label.setText("Health Dashboard - Data refresh failed")
+        else:
+            self.title_label.setText("Health Dashboard")
+
+    def reload_data(self):
+        """New data was committed: update the stat cards and refresh pages already built"""
+        self.dashboard_page.refresh_stats()
+        if self.heatmap_page is not None:
+            self.heatmap_page.reload_data()
+        if self.stats_page is not None:
+            self.stats_page.reload_data()
 
     def create_title_bar(self):
         title_bar_frame = QFrame()
@@ -157,28 +233,28 @@ class ModernDashboard(QMainWindow):
         btn_dashboard.setIcon(QIcon("./frontend/icons/house.svg"))
         btn_dashboard.setObjectName("NavButton")
         btn_dashboard.setFixedSize(40, 40)
-        btn_dashboard.clicked.connect(lambda: self.stacked_widget.setCurrentIndex(0))
+        btn_dashboard.clicked.connect(lambda: self.show_page(0))
         nav_layout.addWidget(btn_dashboard, 0, Qt.AlignmentFlag.AlignHCenter)
 
         btn_heatmap = QPushButton()
         btn_heatmap.setIcon(QIcon("./frontend/icons/gradient.svg"))
         btn_heatmap.setObjectName("NavButton")
         btn_heatmap.setFixedSize(40, 40)
-        btn_heatmap.clicked.connect(lambda: self.stacked_widget.setCurrentIndex(1))
+        btn_heatmap.clicked.connect(lambda: self.show_page(1))
         nav_layout.addWidget(btn_heatmap, 0, Qt.AlignmentFlag.AlignHCenter)
 
         btn_stats = QPushButton()
         btn_stats.setIcon(QIcon("./frontend/icons/chart-line.svg"))
         btn_stats.setObjectName("NavButton")
         btn_stats.setFixedSize(40, 40)
-        btn_stats.clicked.connect(lambda: self.stacked_widget.setCurrentIndex(2))
+        btn_stats.clicked.connect(lambda: self.show_page(2))
         nav_layout.addWidget(btn_stats, 0, Qt.AlignmentFlag.AlignHCenter)
 
         btn_ai_assistant = QPushButton()
         btn_ai_assistant.setIcon(QIcon("./frontend/icons/brain.svg"))
         btn_ai_assistant.setObjectName("NavButton")
         btn_ai_assistant.setFixedSize(40, 40)
-        btn_ai_assistant.clicked.connect(lambda: self.stacked_widget.setCurrentIndex(3))
+        btn_ai_assistant.clicked.connect(lambda: self.show_page(3))
         nav_layout.addWidget(btn_ai_assistant, 0, Qt.AlignmentFlag.AlignHCenter)
 
         nav_layout.addStretch()
@@ -272,6 +348,8 @@ class ModernDashboard(QMainWindow):
         if hasattr(self, "sidebar_animation") and self.sidebar_animation is not None:
             if self.sidebar_animation.state() == QAbstractAnimation.State.Running:
                 return
+        if self.filter_sidebar_inpage is None:
+            return
 
         current_width = self.filter_sidebar_inpage.maximumWidth()
         target_width = 300 if current_width == 0 else 0
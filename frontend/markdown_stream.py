@@ -0,0 +1,80 @@
+"""
+Incremental Markdown rendering for streamed responses. The text only ever grows,
+so blocks that can no longer change are rendered once and cached, and each
+update re-renders just the trailing open block.
+"""
+import re
+
+import markdown
+
+LIST_ITEM = re.compile(r"^\s*([-*+]|\d+[.)])\s")
+FENCE = re.compile(r"^\s*(```|~~~)")
+
+
+def _continues_block(line, block_is_list):
+    """Whether a line after a blank line still belongs to the current block"""
+    if line[:1] in (" ", "\t"):
+        return True
+    return block_is_list and LIST_ITEM.match(line) is not None
+
+
+def split_blocks(text):
+    """
+    Split Markdown into top-level blocks, each keeping its trailing blank lines.
+    Every block but the last is closed: the line that starts the next block has
+    already arrived complete, so more text can no longer change how it renders.
+    Fenced code and list items separated by blank lines stay in one block.
+    """
+    blocks = []
+    start = 0
+    position = 0
+    in_fence = False
+    after_blank = False
+    block_is_list = False
+
+    for line in text.splitlines(keepends=True):
+        stripped = line.strip()
+        if not line.endswith("\n"):
+            # A partial last line ("1" of "1. item", "`" of a fence) can't start a block yet
+            break
+        if in_fence:
+            if FENCE.match(line):
+                in_fence = False
+        elif not stripped:
+            after_blank = True
+        else:
+            if after_blank and not _continues_block(line, block_is_list):
+                blocks.append(text[start:position])
+                start = position
+                block_is_list = False
+            if LIST_ITEM.match(line):
+                block_is_list = True
+            if FENCE.match(line):
+                in_fence = True
+            after_blank = False
+        position += len(line)
+
+    blocks.append(text[start:])
+    return blocks
+
+
+class IncrementalMarkdown:
+    def __init__(self, render=markdown.markdown):
+        self.render = render
+        self.reset()
+
+    def reset(self):
+        self._closed_source = ""
+        self._closed_html = []
+
+    def feed(self, text):
+        """HTML for the full text, rendering only what is not cached yet"""
+        if not text.startswith(self._closed_source):
+            self.reset()
+
+        blocks = split_blocks(text[len(self._closed_source):])
+        for block in blocks[:-1]:
+            self._closed_html.append(self.render(block))
+            self._closed_source += block
+
+        return "\n".join(self._closed_html + [self.render(blocks[-1])])
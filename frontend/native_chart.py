@@ -0,0 +1,326 @@
+"""
+In-process chart renderer for the stats page. Draws the same Plotly figure JSON
+the web view receives (bar and line traces) with QPainter, with hover tooltips,
+the dark theme and drag-to-zoom on date axes, without a Chromium renderer.
+"""
+import base64
+import datetime
+import json
+import math
+import re
+
+import numpy as np
+from PyQt6.QtCore import Qt, QPointF, QRectF, pyqtSignal
+from PyQt6.QtGui import QColor, QFont, QPainter, QPainterPath, QPen
+from PyQt6.QtWidgets import QSizePolicy, QToolTip, QWidget
+
+BACKGROUND = QColor("#27293D")
+GRID = QColor("#3A3C55")
+TEXT = QColor("#FFFFFF")
+COLORWAY = ['#636efa', '#EF553B', '#00cc96', '#ab63fa', '#FFA15A',
+            '#19d3f3', '#FF6692', '#B6E880', '#FF97FF', '#FECB52']
+
+HOVER_RADIUS = 12
+PLACEHOLDER = re.compile(r"%\{(\w+)(?:\|([^}]*)|:([^}]*))?\}")
+
+
+def decode_array(value):
+    """Plotly JSON arrays are either plain lists or {'dtype', 'bdata'} typed arrays"""
+    if isinstance(value, dict) and "bdata" in value:
+        array = np.frombuffer(base64.b64decode(value["bdata"]), dtype=np.dtype(value["dtype"]))
+        if "shape" in value:
+            array = array.reshape([int(n) for n in str(value["shape"]).split(",")])
+        return array
+    return np.asarray(value if value is not None else [])
+
+
+def parse_dates(values):
+    """ISO strings -> float days since the epoch"""
+    return (np.asarray(values, dtype="datetime64[ms]").astype("int64") / 86400000.0)
+
+
+def format_day(days, fmt="%Y-%m-%d"):
+    epoch = datetime.datetime(1970, 1, 1)
+    return (epoch + datetime.timedelta(days=float(days))).strftime(fmt)
+
+
+def format_hover(template, x, y, customdata, name, x_is_date):
+    """Tiny subset of Plotly's hovertemplate: %{x}, %{y:<fmt>}, %{x|<date fmt>}, %{customdata}"""
+    if not template:
+        template = "<b>%{x}</b><br>%{y}"
+    template = re.sub(r"<extra>.*?</extra>", "", template)
+    values = {"x": x, "y": y, "customdata": customdata}
+
+    def substitute(match):
+        field, date_format, number_format = match.groups()
+        value = values.get(field, "")
+        if field == "x" and x_is_date:
+            return format_day(value, date_format or "%Y-%m-%d")
+        if number_format:
+            try:
+                return format(float(value), number_format)
+            except (TypeError, ValueError):
+                return str(value)
+        if isinstance(value, float):
+            return f"{value:,.2f}"
+        return str(value)
+
+    text = PLACEHOLDER.sub(substitute, template)
+    return text if name is None or name in text else f"{text}<br>{name}"
+
+
+def nice_ticks(low, high, count=5):
+    if high <= low:
+        high = low + 1
+    step = (high - low) / count
+    magnitude = 10 ** math.floor(math.log10(step))
+    step = min((m * magnitude for m in (1, 2, 2.5, 5, 10) if m * magnitude >= step), default=step)
+    start = math.floor(low / step) * step
+    ticks = []
+    value = start
+    while value <= high + step * 1e-9:
+        if value >= low - step * 1e-9:
+            ticks.append(value)
+        value += step
+    return ticks
+
+
+def format_tick(value):
+    magnitude = abs(value)
+    if magnitude >= 1e6:
+        return f"{value / 1e6:g}M"
+    if magnitude >= 1e3:
+        return f"{value / 1e3:g}k"
+    return f"{value:g}"
+
+
+class NativeChartView(QWidget):
+    """Drop-in replacement for PlotlyChartView: same render_figure() and zoom signals"""
+    x_range_changed = pyqtSignal(str, str)
+    x_range_reset = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+        self.setMouseTracking(True)
+        self.setMinimumHeight(200)
+        self.figure = None
+        self.traces = []
+        self.kind = None
+        self._hit_points = []
+        self._drag_start = None
+        self._drag_end = None
+
+    def render_figure(self, fig):
+        """Show a plotly Figure (or an already serialized figure JSON string)"""
+        self.figure = json.loads(fig if isinstance(fig, str) else fig.to_json())
+        self.traces = []
+        self.kind = None
+        for index, trace in enumerate(self.figure.get("data", [])):
+            trace_type = trace.get("type", "scatter")
+            self.kind = self.kind or trace_type
+            x = decode_array(trace.get("x"))
+            x_is_date = trace_type != "bar" and x.dtype.kind in "UO" and len(x) > 0
+            marker = trace.get("marker", {}).get("color")
+            line = trace.get("line", {}).get("color")
+            self.traces.append({
+                "type": trace_type,
+                "name": trace.get("name"),
+                "x": parse_dates(x) if x_is_date else x,
+                "x_is_date": x_is_date,
+                "y": decode_array(trace.get("y")).astype(float),
+                "customdata": decode_array(trace.get("customdata")),
+                "color": QColor(marker if isinstance(marker, str) else line or COLORWAY[index % len(COLORWAY)]),
+                "hovertemplate": trace.get("hovertemplate")
+            })
+        self.update()
+
+    # Layout helpers
+
+    def _title(self):
+        title = self.figure.get("layout", {}).get("title", {}) if self.figure else {}
+        return title.get("text", "") if isinstance(title, dict) else str(title or "")
+
+    def _plot_rect(self):
+        right = 160 if self.kind == "scatter" and len(self.traces) > 1 else 20
+        bottom = 110 if self.kind == "bar" else 40
+        return QRectF(70, 50, max(10, self.width() - 70 - right), max(10, self.height() - 50 - bottom))
+
+    def _y_range(self):
+        values = np.concatenate([t["y"] for t in self.traces]) if self.traces else np.array([])
+        values = values[np.isfinite(values)]
+        if values.size == 0:
+            return 0.0, 1.0
+        low, high = float(values.min()), float(values.max())
+        if self.kind == "bar" or low >= 0:
+            low = min(0.0, low)
+        return low, high if high > low else low + 1
+
+    def _x_range(self):
+        values = np.concatenate([t["x"] for t in self.traces if len(t["x"])]).astype(float)
+        return float(values.min()), float(values.max()) if values.max() > values.min() else float(values.min()) + 1
+
+    # Painting
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing, True)
+        painter.fillRect(self.rect(), BACKGROUND)
+        self._hit_points = []
+        if not self.traces:
+            return
+
+        painter.setPen(TEXT)
+        painter.setFont(QFont("Arial", 14, QFont.Weight.Bold))
+        painter.drawText(QRectF(0, 8, self.width(), 30), Qt.AlignmentFlag.AlignHCenter, self._title())
+
+        plot = self._plot_rect()
+        y_low, y_high = self._y_range()
+        self._draw_y_axis(painter, plot, y_low, y_high)
+
+        if self.kind == "bar":
+            self._draw_bars(painter, plot, y_low, y_high)
+        else:
+            self._draw_lines(painter, plot, y_low, y_high)
+
+        if self._drag_start is not None and self._drag_end is not None:
+            left, right = sorted((self._drag_start, self._drag_end))
+            painter.fillRect(QRectF(left, plot.top(), right - left, plot.height()), QColor(255, 255, 255, 40))
+
+    def _to_y(self, plot, value, y_low, y_high):
+        return plot.bottom() - (value - y_low) / (y_high - y_low) * plot.height()
+
+    def _draw_y_axis(self, painter, plot, y_low, y_high):
+        painter.setFont(QFont("Arial", 9))
+        for tick in nice_ticks(y_low, y_high):
+            y = self._to_y(plot, tick, y_low, y_high)
+            painter.setPen(QPen(GRID, 1))
+            painter.drawLine(QPointF(plot.left(), y), QPointF(plot.right(), y))
+            painter.setPen(TEXT)
+            painter.drawText(QRectF(0, y - 8, plot.left() - 6, 16),
+                             Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter, format_tick(tick))
+
+    def _draw_bars(self, painter, plot, y_low, y_high):
+        trace = self.traces[0]
+        count = len(trace["y"])
+        if count == 0:
+            return
+        slot = plot.width() / count
+        baseline = self._to_y(plot, max(0.0, y_low), y_low, y_high)
+        painter.setFont(QFont("Arial", 8))
+        for i, (label, value) in enumerate(zip(trace["x"], trace["y"])):
+            top = self._to_y(plot, value, y_low, y_high)
+            bar = QRectF(plot.left() + i * slot + slot * 0.1, min(top, baseline), slot * 0.8, abs(baseline - top))
+            painter.fillRect(bar, trace["color"])
+            customdata = trace["customdata"][i] if i < len(trace["customdata"]) else ""
+            self._hit_points.append((bar.center(), bar, format_hover(
+                trace["hovertemplate"], label, value, customdata, None, False)))
+
+            painter.save()
+            painter.setPen(TEXT)
+            painter.translate(plot.left() + (i + 0.5) * slot, plot.bottom() + 6)
+            painter.rotate(-60)
+            painter.drawText(QRectF(-130, -6, 130, 12),
+                             Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter, str(label))
+            painter.restore()
+
+    def _draw_lines(self, painter, plot, y_low, y_high):
+        x_low, x_high = self._x_range()
+        self._x_span = (x_low, x_high)
+        x_is_date = self.traces[0]["x_is_date"]
+
+        painter.setFont(QFont("Arial", 9))
+        for tick in nice_ticks(x_low, x_high, 6):
+            x = plot.left() + (tick - x_low) / (x_high - x_low) * plot.width()
+            painter.setPen(QPen(GRID, 1))
+            painter.drawLine(QPointF(x, plot.top()), QPointF(x, plot.bottom()))
+            painter.setPen(TEXT)
+            label = format_day(tick) if x_is_date else format_tick(tick)
+            painter.drawText(QRectF(x - 50, plot.bottom() + 4, 100, 16), Qt.AlignmentFlag.AlignHCenter, label)
+
+        legend_y = plot.top()
+        for trace in self.traces:
+            xs = plot.left() + (trace["x"].astype(float) - x_low) / (x_high - x_low) * plot.width()
+            ys = plot.bottom() - (trace["y"] - y_low) / (y_high - y_low) * plot.height()
+            finite = np.isfinite(ys)
+            path = QPainterPath()
+            started = False
+            for x, y, ok in zip(xs, ys, finite):
+                if not ok:
+                    started = False
+                    continue
+                if started:
+                    path.lineTo(x, y)
+                else:
+                    path.moveTo(x, y)
+                    started = True
+            painter.setPen(QPen(trace["color"], 1.5))
+            painter.drawPath(path)
+            trace["screen"] = (xs, ys)
+
+            if len(self.traces) > 1 and legend_y < self.height() - 14:
+                painter.fillRect(QRectF(plot.right() + 12, legend_y + 5, 14, 3), trace["color"])
+                painter.setPen(TEXT)
+                painter.drawText(QRectF(plot.right() + 30, legend_y, 130, 14),
+                                 Qt.AlignmentFlag.AlignVCenter, str(trace["name"]))
+                legend_y += 15
+
+    # Interaction
+
+    def _hover_text(self, pos):
+        if self.kind == "bar":
+            for _, rect, text in self._hit_points:
+                if rect.left() <= pos.x() <= rect.right():
+                    return text
+            return None
+
+        best = None
+        for trace in self.traces:
+            if "screen" not in trace or len(trace["y"]) == 0:
+                continue
+            xs, ys = trace["screen"]
+            distance = np.hypot(xs - pos.x(), ys - pos.y())
+            distance[~np.isfinite(distance)] = np.inf
+            i = int(np.argmin(distance))
+            if distance[i] <= HOVER_RADIUS and (best is None or distance[i] < best[0]):
+                customdata = trace["customdata"][i] if i < len(trace["customdata"]) else ""
+                best = (distance[i], format_hover(trace["hovertemplate"], trace["x"][i], trace["y"][i],
+                                                  customdata, trace["name"], trace["x_is_date"]))
+        return best[1] if best else None
+
+    def mouseMoveEvent(self, event):
+        pos = event.position()
+        if self._drag_start is not None:
+            self._drag_end = pos.x()
+            self.update()
+            return
+        text = self._hover_text(pos)
+        if text:
+            QToolTip.showText(event.globalPosition().toPoint(), text, self)
+        else:
+            QToolTip.hideText()
+
+    def mousePressEvent(self, event):
+        if (event.button() == Qt.MouseButton.LeftButton and self.kind == "scatter"
+                and self.traces and self.traces[0]["x_is_date"]):
+            self._drag_start = event.position().x()
+            self._drag_end = None
+
+    def mouseReleaseEvent(self, event):
+        start, end = self._drag_start, self._drag_end
+        self._drag_start = self._drag_end = None
+        self.update()
+        if start is None or end is None or abs(end - start) < 5:
+            return
+        plot = self._plot_rect()
+        x_low, x_high = self._x_span
+        to_day = lambda px: x_low + (min(max(px, plot.left()), plot.right()) - plot.left()) / plot.width() * (x_high - x_low)
+        left, right = sorted((to_day(start), to_day(end)))
+        self.x_range_changed.emit(format_day(left), format_day(right))
+
+    def mouseDoubleClickEvent(self, event):
+        if self.kind == "scatter":
+            self.x_range_reset.emit()
+
+    def leaveEvent(self, event):
+        QToolTip.hideText()
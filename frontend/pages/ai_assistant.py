@@ -1,107 +1,174 @@
-from PyQt6.QtWidgets import (QFrame, QVBoxLayout, QHBoxLayout, QLabel,
-                             QPushButton, QLineEdit, QScrollArea,
-                             QWidget, QApplication)
+from PyQt6.QtWidgets import (QApplication, QFrame, QVBoxLayout, QHBoxLayout, QLabel,
+                             QPushButton, QLineEdit)
 from PyQt6.QtCore import Qt, pyqtSignal, QThread
 from PyQt6.QtGui import QFont, QIcon
-import ollama
-import markdown
+import itertools
+import json
+import queue
+import threading
+import time
+
+from Backend.ai_digest import build_prompt_context
+from Backend.ai_response_cache import ResponseCache
+from Backend.conversation_memory import ConversationMemory
+from Backend.db import get_data_generation
+from Backend.ollama_client import MODEL_NAME, format_metrics, stream_chat
+from frontend.chat_transcript import ChatHistoryStore, TranscriptModel, TranscriptView
+
+# The worker sends tokens in batches: whichever limit is reached first
+TOKEN_BATCH_SECONDS = 0.05
+TOKEN_BATCH_CHARS = 256
+
+SYSTEM_PROMPT = 'You are a helpful health and medical assistant. Focus on providing accurate information about diseases, treatments, and general health advice. When appropriate, suggest search terms for further research and recommend reliable sources like .gov, .edu, or respected medical journals. Never provide definitive medical diagnosis or treatment plans, always encourage consulting with healthcare professionals. Format your responses using Markdown.'
 
 class AIAssistantWorker(QThread):
-    """Worker thread for AI operations with streaming to prevent UI freezing"""
+    """
+    Long-lived worker thread for AI operations with streaming to prevent UI
+    freezing. Questions are queued with submit(), which returns a job id, and
+    answered one at a time; job_started announces each one with its id.
+    cancel(job_id) stops that answer (closing the Ollama stream) and is ignored
+    once another job has started; stop() ends the thread.
+    
+    Tokens are buffered and emitted through token_ready in batches, every
+    TOKEN_BATCH_SECONDS or TOKEN_BATCH_CHARS, so the GUI handles a few signals
+    per second instead of one per token.
+    
+    Each question is sent with the earlier conversation from `memory` (a
+    ConversationMemory, updated here after every complete answer so a queued
+    follow-up sees the answer before it). With a ResponseCache, an answer cached
+    for the same question, system prompt, history and data generation is replayed
+    through token_ready instead of generated. Generated answers end with
+    metrics_ready (see Backend.ollama_client.stream_chat).
+    """
+    job_started = pyqtSignal(int, str)
     token_ready = pyqtSignal(str)
     response_complete = pyqtSignal()
+    response_stopped = pyqtSignal()
     error_occurred = pyqtSignal(str)
+    cache_checked = pyqtSignal(bool)
+    metrics_ready = pyqtSignal(object)
     
-    def __init__(self, prompt):
+    def __init__(self, response_cache=None, memory=None):
         super().__init__()
-        self.prompt = prompt
-        
+        self.response_cache = response_cache
+        self.memory = memory
+        self.jobs = queue.Queue()
+        self.job_ids = itertools.count(1)
+        # The job being answered; the lock keeps a late cancel() from landing on the next one
+        self.current_job = None
+        self.job_lock = threading.Lock()
+        self.cancelled = threading.Event()
+    
+    def submit(self, prompt):
+        job_id = next(self.job_ids)
+        self.jobs.put((job_id, prompt))
+        return job_id
+    
+    def cancel(self, job_id):
+        """Stop job_id if it is still being answered; queued questions still run"""
+        with self.job_lock:
+            if job_id == self.current_job:
+                self.cancelled.set()
+    
+    def stop(self):
+        """Drop queued questions, stop the current answer and end the thread"""
+        while not self.jobs.empty():
+            try:
+                self.jobs.get_nowait()
+            except queue.Empty:
+                break
+        # stream_chat returns within a poll interval of the cancel, even mid model load
+        with self.job_lock:
+            self.cancelled.set()
+        self.jobs.put(None)
+        self.wait()
+    
     def run(self):
-        try:
-            stream = ollama.chat(
-                model='gemma3:1b-it-q4_K_M', 
-                messages=[
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+            job_id, prompt = job
+            with self.job_lock:
+                self.current_job = job_id
+                self.cancelled.clear()
+            self.job_started.emit(job_id, prompt)
+            try:
+                self.answer(prompt)
+            except Exception as e:
+                self.error_occurred.emit(f"Error: {str(e)}")
+    
+    def emit_batches(self, tokens):
+        """Emit tokens in batches; returns the full text, or None if cancelled"""
+        response = []
+        batch = []
+        batch_chars = 0
+        last_emit = time.monotonic()
+        for token in tokens:
+            if self.cancelled.is_set():
+                tokens.close()
+                break
+            response.append(token)
+            batch.append(token)
+            batch_chars += len(token)
+            
+            now = time.monotonic()
+            if batch_chars >= TOKEN_BATCH_CHARS or now - last_emit >= TOKEN_BATCH_SECONDS:
+                self.token_ready.emit("".join(batch))
+                batch = []
+                batch_chars = 0
+                last_emit = now
+        
+        if batch:
+            self.token_ready.emit("".join(batch))
+        return None if self.cancelled.is_set() else "".join(response)
+    
+    def answer(self, prompt):
+        history = self.memory.messages() if self.memory is not None else []
+        # Relevant slices of the precomputed data digest, if the question touches our metrics
+        data_context = build_prompt_context(prompt)
+        system_prompt = SYSTEM_PROMPT + ('\n\n' + data_context if data_context else '')
+        # A follow-up means something else in another conversation, so the history is part of the key
+        cache_context = system_prompt + json.dumps(history)
+        
+        cached = None
+        if self.response_cache is not None:
+            generation = get_data_generation()
+            cached = self.response_cache.get(prompt, MODEL_NAME, cache_context, generation)
+            self.cache_checked.emit(cached is not None)
+        
+        metrics = {}
+        if cached is not None:
+            response = self.emit_batches(
+                cached[start:start + TOKEN_BATCH_CHARS] for start in range(0, len(cached), TOKEN_BATCH_CHARS)
+            )
+        else:
+            response = self.emit_batches(stream_chat(
+                [
                     {
                         'role': 'system',
-                        'content': 'You are a helpful health and medical assistant. Focus on providing accurate information about diseases, treatments, and general health advice. When appropriate, suggest search terms for further research and recommend reliable sources like .gov, .edu, or respected medical journals. Never provide definitive medical diagnosis or treatment plans, always encourage consulting with healthcare professionals. Format your responses using Markdown.'
+                        'content': system_prompt
                     },
+                    *history,
                     {
                         'role': 'user',
-                        'content': self.prompt
+                        'content': prompt
                     }
                 ],
-                stream=True  
-            )
-            
-            for chunk in stream:
-                if 'message' in chunk and 'content' in chunk['message']:
-                    token = chunk['message']['content']
-                    if token:
-                        self.token_ready.emit(token)
-            
-            self.response_complete.emit()
-        except Exception as e:
-            self.error_occurred.emit(f"Error: {str(e)}")
-
-
-class MessageBubble(QFrame):
-    """Custom widget for chat message bubbles with Markdown support"""
-    def __init__(self, text, is_user=False, parent=None):
-        super().__init__(parent)
-        self.is_user = is_user
-        self.full_text = text
-        
-        self.setFrameShape(QFrame.Shape.StyledPanel)
-        self.setFrameShadow(QFrame.Shadow.Raised)
-        
-        layout = QVBoxLayout(self)
-        layout.setContentsMargins(12, 10, 12, 10)
-        
-        self.message_label = QLabel()
-        self.message_label.setWordWrap(True)
-        self.message_label.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
-        self.message_label.setOpenExternalLinks(True)
-        self.message_label.setTextFormat(Qt.TextFormat.RichText)
+                metrics,
+                cancelled=self.cancelled
+            ))
         
-        if is_user:
-            self.setStyleSheet("""
-                MessageBubble {
-                    background-color: #444561;
-                    border-radius: 15px;
-                    border-top-right-radius: 5px;
-                    margin-left: 50px;
-                }
-                QLabel {
-                    color: #FFFFFF;
-                }
-            """)
-            self.message_label.setText(text)
-        else:
-            self.setStyleSheet("""
-                MessageBubble {
-                    background-color: #2F3044;
-                    border-radius: 15px;
-                    border-top-left-radius: 5px;
-                    margin-right: 50px;
-                }
-                QLabel {
-                    color: #FFFFFF;
-                }
-            """)
-            html_content = markdown.markdown(text)
-            self.message_label.setText(html_content)
-        
-        layout.addWidget(self.message_label)
-        self.setLayout(layout)
-    
-    def update_text(self, text):
-        """Update the text and reformat with Markdown if needed"""
-        self.full_text = text
-        if not self.is_user:
-            html_content = markdown.markdown(text)
-            self.message_label.setText(html_content)
-        else:
-            self.message_label.setText(text)
+        if response is None:
+            self.response_stopped.emit()
+            return
+        if self.response_cache is not None and cached is None:
+            self.response_cache.put(prompt, MODEL_NAME, cache_context, generation, response)
+        if self.memory is not None:
+            self.memory.add_exchange(prompt, response)
+        if metrics:
+            self.metrics_ready.emit(metrics)
+        self.response_complete.emit()
 
 
 def create_ai_assistant_page():
@@ -143,9 +210,10 @@ def create_ai_assistant_page():
         QPushButton:pressed {
             background-color: #6c63ff;
         }
-        QScrollArea {
+        QListView {
             border: none;
             background-color: #1E1E2F;
+            outline: none;
         }
     """)
     
@@ -163,20 +231,15 @@ def create_ai_assistant_page():
     
     main_layout.addLayout(header_layout)
     
-    chat_scroll = QScrollArea()
-    chat_scroll.setWidgetResizable(True)
-    chat_scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-    
-    chat_container = QWidget()
-    chat_layout = QVBoxLayout(chat_container)
-    chat_layout.setAlignment(Qt.AlignmentFlag.AlignTop)
-    chat_layout.setSpacing(15)
+    # Earlier sessions are read back from the history file a page at a time
+    transcript = TranscriptModel(ChatHistoryStore(), parent=page_frame)
+    chat_view = TranscriptView(transcript)
+    # The view follows new output only while the user is at the bottom
+    main_layout.addWidget(chat_view, 1)
     
-    chat_scroll.setWidget(chat_container)
-    main_layout.addWidget(chat_scroll, 1)
-    
-    greeting_message = MessageBubble("**Hello!**. *How can I help you with health or medical information today?*", is_user=False)
-    chat_layout.addWidget(greeting_message)
+    if transcript.rowCount() == 0:
+        transcript.add_message("**Hello!**. *How can I help you with health or medical information today?*",
+                               is_user=False, persist=False)
     
     input_layout = QHBoxLayout()
     
@@ -189,8 +252,15 @@ def create_ai_assistant_page():
     send_button.setMinimumHeight(50)
     send_button.setMinimumWidth(80)
     
+    stop_button = QPushButton("Stop")
+    stop_button.setIcon(QIcon("./frontend/icons/x.svg") if QIcon("./frontend/icons/x.svg").availableSizes() else QIcon())
+    stop_button.setMinimumHeight(50)
+    stop_button.setMinimumWidth(80)
+    stop_button.setEnabled(False)
+    
     input_layout.addWidget(message_input, 1)
     input_layout.addWidget(send_button)
+    input_layout.addWidget(stop_button)
     
     main_layout.addLayout(input_layout)
     
@@ -198,86 +268,113 @@ def create_ai_assistant_page():
     status_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
     main_layout.addWidget(status_label)
     
-    worker = None
-    current_ai_message = None
     accumulated_text = ""
+    response_cache = ResponseCache()
+    answered_from_cache = False
+    last_metrics = None
+    # Questions sent but not started yet, oldest first; saved to the history when
+    # their answer starts, so the file keeps question/answer order
+    queued_messages = []
+    # Id of the job being answered, or None; Stop cancels this job only
+    answering = None
+    
+    # One worker for the page's lifetime; questions typed while it answers wait in its queue
+    worker = AIAssistantWorker(response_cache, ConversationMemory())
+    
+    def show_progress():
+        waiting = f" ({len(queued_messages)} queued)" if queued_messages else ""
+        status_label.setText(f"AI is thinking...{waiting}")
     
     def send_message():
         text = message_input.text().strip()
         if not text:
             return
-            
-        user_message = MessageBubble(text, is_user=True)
-        chat_layout.addWidget(user_message)
         
-        message_input.clear()
-        status_label.setText("AI is thinking...")
+        # Sending a message always brings the conversation back into view
+        chat_view.follow_output = True
         
-        message_input.setEnabled(False)
-        send_button.setEnabled(False)
-        
-        nonlocal current_ai_message, accumulated_text
+        queued_messages.append(transcript.add_message(text, is_user=True, persist=False))
+        message_input.clear()
+        worker.submit(text)
+        show_progress()
+    
+    def handle_job_started(job_id, prompt):
+        nonlocal accumulated_text, answered_from_cache, last_metrics, answering
+        transcript.save(queued_messages.pop(0))
         accumulated_text = ""
-        current_ai_message = MessageBubble("", is_user=False)
-        chat_layout.addWidget(current_ai_message)
-        
-        nonlocal worker
-        worker = AIAssistantWorker(text)
-        worker.token_ready.connect(handle_token)
-        worker.response_complete.connect(handle_response_complete)
-        worker.error_occurred.connect(handle_error)
-        worker.start()
-        
-        QApplication.processEvents()
-        chat_scroll.verticalScrollBar().setValue(
-            chat_scroll.verticalScrollBar().maximum()
-        )
+        answered_from_cache = False
+        last_metrics = None
+        answering = job_id
+        transcript.start_streaming()
+        stop_button.setEnabled(True)
+        show_progress()
+    
+    def handle_cache_checked(hit):
+        nonlocal answered_from_cache
+        answered_from_cache = hit
+    
+    def handle_metrics(metrics):
+        nonlocal last_metrics
+        last_metrics = metrics
     
     def handle_token(token):
-        """Handle each token as it comes in from the streaming response"""
+        """Handle each batch of tokens as it comes in from the streaming response"""
         nonlocal accumulated_text
         accumulated_text += token
-        
-        if current_ai_message:
-            current_ai_message.update_text(accumulated_text)
-            
-        QApplication.processEvents()
-        chat_scroll.verticalScrollBar().setValue(
-            chat_scroll.verticalScrollBar().maximum()
-        )
+        transcript.update_streaming(accumulated_text)
+    
+    def finish_answer(status):
+        nonlocal answering
+        answering = None
+        stop_button.setEnabled(False)
+        if queued_messages:
+            show_progress()
+        else:
+            status_label.setText(status)
     
     def handle_response_complete():
         """Handle completion of the AI response"""
-        status_label.setText("")
-        message_input.setEnabled(True)
-        send_button.setEnabled(True)
-        message_input.setFocus()
-        
-        QApplication.processEvents()
-        chat_scroll.verticalScrollBar().setValue(
-            chat_scroll.verticalScrollBar().maximum()
+        transcript.finish_streaming()
+        stats = response_cache.stats()
+        lookups = stats['hits'] + stats['misses']
+        finish_answer(
+            f"{'Answered from cache. ' if answered_from_cache else ''}"
+            f"{format_metrics(last_metrics) + ' · ' if last_metrics else ''}"
+            f"Response cache hit rate: {stats['hit_rate']:.0%} ({stats['hits']} of {lookups})"
         )
     
+    def handle_response_stopped():
+        # The partial answer stays (and is saved) so the transcript reads in order
+        transcript.finish_streaming(accumulated_text + "\n\n*(Stopped)*")
+        finish_answer("Answer stopped.")
+    
     def handle_error(error_text):
-        nonlocal current_ai_message
-        
-        if current_ai_message:
-            current_ai_message.setParent(None)
-            current_ai_message = None
-        
-        error_message = MessageBubble(f"**Error:** {error_text}\n\n*Please check if Ollama is running and gemma3:1b model is installed.*", is_user=False)
-        chat_layout.addWidget(error_message)
-        
-        status_label.setText("")
-        message_input.setEnabled(True)
-        send_button.setEnabled(True)
-        
-        QApplication.processEvents()
-        chat_scroll.verticalScrollBar().setValue(
-            chat_scroll.verticalScrollBar().maximum()
+        # Errors replace the partial answer on screen but are not saved to the history
+        transcript.finish_streaming(
+            f"**Error:** {error_text}\n\n*Please check if Ollama is running and gemma3:1b model is installed.*",
+            persist=False
         )
+        finish_answer("")
+    
+    def stop_answer():
+        if answering is not None:
+            stop_button.setEnabled(False)
+            status_label.setText("Stopping...")
+            worker.cancel(answering)
+    
+    worker.job_started.connect(handle_job_started)
+    worker.cache_checked.connect(handle_cache_checked)
+    worker.metrics_ready.connect(handle_metrics)
+    worker.token_ready.connect(handle_token)
+    worker.response_complete.connect(handle_response_complete)
+    worker.response_stopped.connect(handle_response_stopped)
+    worker.error_occurred.connect(handle_error)
+    worker.start()
+    # Stop the thread before the application tears the page down
+    QApplication.instance().aboutToQuit.connect(worker.stop)
     
     message_input.returnPressed.connect(send_message)
     send_button.clicked.connect(send_message)
+    stop_button.clicked.connect(stop_answer)
     
     return page_frame
\ No newline at end of file
@@ -1,13 +1,23 @@
 from PyQt6.QtWidgets import (
     QFrame, QVBoxLayout, QHBoxLayout, QLabel, QPushButton
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtGui import QPixmap
-import sqlite3
+import os
 import math
+from pathlib import Path
 from PyQt6.QtGui import QPainter, QPainterPath
 from PyQt6.QtCore import QRectF
 
+from Backend.db import get_data_generation, get_metric_snapshot
+from frontend.thumbnails import ThumbnailWorker, latest_thumbnail, render_chart_thumbnail, thumbnail_path
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+DB_PATH = BASE_DIR / "health_data.db"
+
+# How often the stat cards check the data generation for new data
+STAT_REFRESH_INTERVAL_MS = int(os.environ.get("DASHBOARD_REFRESH_MS", "5000"))
+
 class RoundedImageLabel(QLabel):
     def __init__(self, corner_radius=20, parent=None):
         super().__init__(parent)
@@ -56,19 +66,32 @@ def create_stat_card(icon_path: str, number_text: str, label_text: str) -> QFram
     descriptor_label.setStyleSheet("color: #FFFFFF; font-size: 14px;")
     card_layout.addWidget(descriptor_label)
 
+    card_frame.number_label = number_label
     return card_frame
 
-def get_metric_average(metric_type: str, db_name="health_data.db") -> float:
-    """Return the average metric_value for the given metric_type."""
-    conn = sqlite3.connect(db_name)
-    cursor = conn.cursor()
-    cursor.execute(
-        "SELECT AVG(metric_value) FROM state_metrics WHERE metric_type = ?",
-        (metric_type,)
+def format_stat_numbers(snapshot):
+    """Card texts (active cases, recovered, deaths) from a metric snapshot"""
+    active_cases = (snapshot["COVID_Positivity"] / 100) * 340000000
+    return (
+        f"{math.ceil(active_cases):,}",
+        f"{math.ceil(snapshot['COVID_Recovered']):,}",
+        f"{math.ceil(snapshot['COVID_Deaths']):,}"
     )
-    result = cursor.fetchone()[0]
-    conn.close()
-    return result if result is not None else 0.0
+
+def preview_image_path(kind, sample_path):
+    """Cached thumbnail (newest generation first), else the bundled sample image"""
+    return latest_thumbnail(kind) or sample_path
+
+def set_preview_image(label, image_path, width, height):
+    pixmap = QPixmap(image_path)
+    if pixmap.isNull():
+        return False
+    label.setPixmap(pixmap.scaled(
+        width, height,
+        Qt.AspectRatioMode.IgnoreAspectRatio,
+        Qt.TransformationMode.SmoothTransformation
+    ))
+    return True
 
 def create_dashboard_page(go_to_heatmap, go_to_stats):
     page = QFrame()
@@ -84,21 +107,17 @@ def create_dashboard_page(go_to_heatmap, go_to_stats):
     stat_layout.setSpacing(20)
     stat_layout.setContentsMargins(0, 0, 0, 0)
 
-    positivity = get_metric_average("COVID_Positivity")
-    active_cases = (positivity / 100) * 340000000
-
-
-    recovered = get_metric_average("COVID_Recovered")
-    deaths = get_metric_average("COVID_Deaths")
-
-    active_cases_formatted = f"{math.ceil(active_cases):,}"
-    deaths_formatted = f"{math.ceil(deaths):,}"
-    recovered_formatted = f"{math.ceil(recovered):,}"
+    snapshot, generation = get_metric_snapshot(DB_PATH)
+    active_cases_formatted, recovered_formatted, deaths_formatted = format_stat_numbers(snapshot)
+    
+    cards = [
+        create_stat_card("./frontend/icons/virus-bold.svg", active_cases_formatted, "Active Cases"),
+        create_stat_card("./frontend/icons/face-mask-bold.svg", recovered_formatted, "Recovered"),
+        create_stat_card("./frontend/icons/skull-bold.svg", deaths_formatted, "Deaths")
+    ]
+    for card in cards:
+        stat_layout.addWidget(card)
     
-    stat_layout.addWidget(create_stat_card("./frontend/icons/virus-bold.svg", active_cases_formatted, "Active Cases"))
-    stat_layout.addWidget(create_stat_card("./frontend/icons/face-mask-bold.svg", recovered_formatted, "Recovered"))
-    stat_layout.addWidget(create_stat_card("./frontend/icons/skull-bold.svg", deaths_formatted, "Deaths"))
-
     main_layout.addWidget(additional_frame)
 
     content_layout = QHBoxLayout()
@@ -123,15 +142,7 @@ def create_dashboard_page(go_to_heatmap, go_to_stats):
 
     map_label = RoundedImageLabel(20)
     map_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-    pixmap = QPixmap("./frontend/pages/samp_heatmap.png")
-    if not pixmap.isNull():
-        scaled_pixmap = pixmap.scaled(
-            600, 400,
-            Qt.AspectRatioMode.IgnoreAspectRatio,
-            Qt.TransformationMode.SmoothTransformation
-        )
-        map_label.setPixmap(scaled_pixmap)
-    else:
+    if not set_preview_image(map_label, preview_image_path("heatmap", "./frontend/pages/samp_heatmap.png"), 600, 400):
         map_label.setText("Map Preview Placeholder")
         map_label.setStyleSheet("color: #FFFFFF;")  
 
@@ -158,15 +169,7 @@ def create_dashboard_page(go_to_heatmap, go_to_stats):
 
     data_label = QLabel()
     data_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-    pixmap = QPixmap("./frontend/pages/samp_datavis.png")
-    if not pixmap.isNull():
-        scaled_pixmap = pixmap.scaled(
-            320, 420,
-            Qt.AspectRatioMode.IgnoreAspectRatio,
-            Qt.TransformationMode.SmoothTransformation
-        )
-        data_label.setPixmap(scaled_pixmap)
-    else:
+    if not set_preview_image(data_label, preview_image_path("chart", "./frontend/pages/samp_datavis.png"), 320, 420):
         data_label.setText("Data Preview Placeholder")
         data_label.setStyleSheet("color: #FFFFFF; font-size: 16px;")
     data_layout.addWidget(data_label)
@@ -175,4 +178,46 @@ def create_dashboard_page(go_to_heatmap, go_to_stats):
 
     main_layout.addLayout(content_layout)
 
+    shown_generation = [generation]
+    workers = []
+    
+    def refresh_previews():
+        """Render any thumbnail missing for the current generation on a worker"""
+        if workers:
+            return
+        worker = ThumbnailWorker(DB_PATH)
+        worker.thumbnails_ready.connect(handle_thumbnails_ready)
+        worker.finished.connect(release_worker)
+        workers.append(worker)
+        worker.start()
+    
+    def release_worker():
+        worker = workers.pop()
+        worker.wait()
+    
+    def handle_thumbnails_ready(generation, heatmap_file, chart_payload):
+        if heatmap_file:
+            set_preview_image(map_label, heatmap_file, 600, 400)
+        chart_file = thumbnail_path("chart", generation)
+        if chart_payload is not None and chart_payload['figure'] is not None:
+            render_chart_thumbnail(chart_payload, chart_file)
+        set_preview_image(data_label, chart_file, 320, 420)
+    
+    def refresh_stats():
+        """Update the card numbers and previews in place if the data generation changed"""
+        if get_data_generation(DB_PATH) == shown_generation[0]:
+            return
+        snapshot, shown_generation[0] = get_metric_snapshot(DB_PATH)
+        for card, text in zip(cards, format_stat_numbers(snapshot)):
+            card.number_label.setText(text)
+        refresh_previews()
+    
+    refresh_timer = QTimer(page)
+    refresh_timer.timeout.connect(refresh_stats)
+    refresh_timer.start(STAT_REFRESH_INTERVAL_MS)
+    page.refresh_stats = refresh_stats
+    
+    # Previews come from the cache; fill in anything missing once the window is idle
+    QTimer.singleShot(0, refresh_previews)
+
     return page
@@ -1,14 +1,51 @@
 from PyQt6.QtWidgets import QFrame, QHBoxLayout, QVBoxLayout, QLabel, QWidget, QPushButton, QComboBox, QSizePolicy
-from PyQt6.QtCore import Qt, QUrl
+from PyQt6.QtCore import Qt, QUrl, QThread, pyqtSignal
 from PyQt6.QtGui import QIcon
 from PyQt6.QtWebEngineWidgets import QWebEngineView
 from PyQt6.QtWebEngineCore import QWebEngineSettings
 from pathlib import Path
 
+from Backend.generate_heatmap import get_disease_periods
+from Backend.heatmap_cache import HeatmapCache
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+LOADING_HTML = """
+<html><body style="background-color: #1E1E2F; color: #FFFFFF; font-family: Arial;
+display: flex; align-items: center; justify-content: center; height: 100vh; margin: 0;">
+<p>{message}</p>
+</body></html>
+"""
+
+
+class HeatmapGenerationWorker(QThread):
+    """Renders one heatmap into the cache off the GUI thread"""
+    heatmap_ready = pyqtSignal(str, str, str)
+    generation_failed = pyqtSignal(str, str)
+
+    def __init__(self, cache, disease, period):
+        super().__init__()
+        self.cache = cache
+        self.disease = disease
+        self.period = period
+
+    def run(self):
+        try:
+            path = self.cache.generate(self.disease, self.period)
+        except Exception as e:
+            print(f"Error generating heatmap for '{self.disease}', '{self.period}': {e}")
+            path = None
+        if path:
+            self.heatmap_ready.emit(self.disease, self.period, path)
+        else:
+            self.generation_failed.emit(self.disease, self.period)
+
+
 def create_heatmap_page(toggle_inpage_sidebar_callback):
     """
     Create the heatmap page with an embedded QWebEngineView to display the heatmap HTML file.
-    The displayed file is updated automatically based on filter selections.
+    Heatmaps are rendered on demand through a HeatmapCache; a missing or stale one is
+    generated on a worker thread and shown once it is ready.
     """
     page = QFrame()
     layout = QHBoxLayout(page)
@@ -32,17 +69,13 @@ def create_heatmap_page(toggle_inpage_sidebar_callback):
     
     heatmap_display = QWebEngineView()
     heatmap_display.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
-    
-    default_disease = "COVID-19"
-    default_year = "Past-4-Weeks"  
-    safe_disease = default_disease.replace(" ", "_")
-    safe_year = default_year.replace(" ", "")
-    base_dir = Path(__file__).resolve().parent.parent.parent
-    default_filepath = base_dir / f"heatmap_{safe_disease}_{safe_year}.html"
     heatmap_display.settings().setAttribute(QWebEngineSettings.WebAttribute.LocalContentCanAccessFileUrls, True)
     heatmap_display.settings().setAttribute(QWebEngineSettings.WebAttribute.LocalContentCanAccessRemoteUrls, True)
-    heatmap_display.setUrl(QUrl.fromLocalFile(str(default_filepath)))
     content_layout.addWidget(heatmap_display)
+
+    db_name = BASE_DIR / "health_data.db"
+    cache = HeatmapCache(cache_dir=BASE_DIR / "heatmap_cache", db_name=db_name)
+    workers = {}
     
     sidebar = QFrame()
     sidebar.setObjectName("InpageSidebar")
@@ -93,7 +126,6 @@ def create_heatmap_page(toggle_inpage_sidebar_callback):
     sidebar_layout.addWidget(year_label)
     
     year_combo = QComboBox()
-    year_combo.addItems(["Past-4-Weeks" ])
     year_combo.setStyleSheet("""
         QComboBox {
             background-color: #2F3044;
@@ -121,27 +153,66 @@ def create_heatmap_page(toggle_inpage_sidebar_callback):
         selected_disease = disease_combo.currentText()
         year_combo.blockSignals(True)
         year_combo.clear()
-        if selected_disease == "COVID-19":
-            year_combo.addItem("Past-4-Weeks")
-        elif selected_disease == "RSV":
-            year_combo.addItems(["2023", "2022", "2021", "2020", "2019", "2018", "2017"])
+        year_combo.addItems(list(reversed(get_disease_periods(selected_disease, db_name=str(db_name)))))
         year_combo.blockSignals(False)
         update_heatmap()  
 
+    def show_message(message):
+        heatmap_display.setHtml(LOADING_HTML.format(message=message))
+
     def update_heatmap():
         selected_disease = disease_combo.currentText()
         selected_year = year_combo.currentText()  
-        safe_disease = selected_disease.replace(" ", "_")
-        safe_year = selected_year.replace(" ", "")
-        base_dir = Path(__file__).resolve().parent.parent.parent
-        filepath = base_dir / f"heatmap_{safe_disease}_{safe_year}.html"
-        heatmap_display.settings().setAttribute(QWebEngineSettings.WebAttribute.LocalContentCanAccessFileUrls, True)
-        heatmap_display.settings().setAttribute(QWebEngineSettings.WebAttribute.LocalContentCanAccessRemoteUrls, True)
-        file_url = QUrl.fromLocalFile(str(filepath))
-        heatmap_display.setUrl(file_url)
+        if not selected_year:
+            show_message(f"No {selected_disease} data available yet.")
+            return
+
+        filepath = cache.lookup(selected_disease, selected_year)
+        if filepath:
+            heatmap_display.setUrl(QUrl.fromLocalFile(filepath))
+            return
+
+        show_message(f"Generating {selected_disease} heatmap for {selected_year}...")
+        key = (selected_disease, selected_year)
+        if key in workers:
+            return
+        worker = HeatmapGenerationWorker(cache, selected_disease, selected_year)
+        worker.heatmap_ready.connect(handle_heatmap_ready)
+        worker.generation_failed.connect(handle_generation_failed)
+        worker.finished.connect(lambda: release_worker(key))
+        workers[key] = worker
+        worker.start()
+
+    def release_worker(key):
+        worker = workers.pop(key, None)
+        if worker:
+            worker.wait()
+
+    def is_current(disease, period):
+        return disease_combo.currentText() == disease and year_combo.currentText() == period
+
+    def handle_heatmap_ready(disease, period, filepath):
+        if is_current(disease, period):
+            heatmap_display.setUrl(QUrl.fromLocalFile(filepath))
+
+    def handle_generation_failed(disease, period):
+        if is_current(disease, period):
+            show_message(f"No {disease} data available for {period}.")
+
+    def reload_data():
+        """New data: refresh the periods, keeping the selected one if it still exists"""
+        selected_year = year_combo.currentText()
+        year_combo.blockSignals(True)
+        year_combo.clear()
+        year_combo.addItems(list(reversed(get_disease_periods(disease_combo.currentText(), db_name=str(db_name)))))
+        if year_combo.findText(selected_year) >= 0:
+            year_combo.setCurrentText(selected_year)
+        year_combo.blockSignals(False)
+        update_heatmap()
 
     disease_combo.currentIndexChanged.connect(update_year_options)
     year_combo.currentIndexChanged.connect(update_heatmap)
+    page.reload_data = reload_data
 
     update_year_options()
 
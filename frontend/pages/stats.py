@@ -1,73 +1,68 @@
 import os
-import sys
 import sqlite3
-import pandas as pd
-from PyQt6.QtCore import Qt, QSize
+from PyQt6.QtCore import Qt, QThread, pyqtSignal, QDate
 from PyQt6.QtWidgets import (QFrame, QVBoxLayout, QHBoxLayout, 
                             QComboBox, QPushButton, QLabel, QGroupBox,
-                            QSizePolicy, QWidget, QMessageBox)
-from PyQt6 import QtWebEngineWidgets
-from PyQt6.QtWebEngineWidgets import QWebEngineView
-import plotly.graph_objects as go
-import plotly.express as px
-from plotly.offline import plot
+                            QSizePolicy, QMessageBox, QStackedWidget,
+                            QDateEdit)
+
+from Backend.db import read_data_generation
+from frontend.chart_cache import ChartCache
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_PATH = os.path.join(os.path.dirname(os.path.dirname(SCRIPT_DIR)), 'health_data.db')
+CHART_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(SCRIPT_DIR)), 'chart_cache')
+
+# "web" renders charts with Plotly in a QWebEngineView; "native" draws them in-process
+# with QPainter, so the stats page needs no Chromium renderer on low-memory machines.
+STATS_CHART_BACKEND = os.environ.get("STATS_CHART_BACKEND", "web")
 
-STATE_POPULATIONS = {
-    "Alabama": 5118425,
-    "Alaska": 733583,
-    "Arizona": 7359197,
-    "Arkansas": 3045637,
-    "California": 39029342,
-    "Colorado": 5877610,
-    "Connecticut": 3626205,
-    "Delaware": 1018396,
-    "Florida": 22484482,
-    "Georgia": 11029227,
-    "Hawaii": 1440196,
-    "Idaho": 1965509,
-    "Illinois": 12582032,
-    "Indiana": 6833037,
-    "Iowa": 3200517,
-    "Kansas": 2942939,
-    "Kentucky": 4512310,
-    "Louisiana": 4590241,
-    "Maine": 1385340,
-    "Maryland": 6164660,
-    "Massachusetts": 6981974,
-    "Michigan": 10037261,
-    "Minnesota": 5717184,
-    "Mississippi": 2940057,
-    "Missouri": 6177957,
-    "Montana": 1122867,
-    "Nebraska": 1967923,
-    "Nevada": 3177772,
-    "New Hampshire": 1395231,
-    "New Jersey": 9261699,
-    "New Mexico": 2113344,
-    "New York": 19571216,
-    "North Carolina": 10698973,
-    "North Dakota": 779261,
-    "Ohio": 11756058,
-    "Oklahoma": 4019800,
-    "Oregon": 4240137,
-    "Pennsylvania": 12961683,
-    "Rhode Island": 1093734,
-    "South Carolina": 5342388,
-    "South Dakota": 909824,
-    "Tennessee": 7051339,
-    "Texas": 30029572,
-    "Utah": 3380800,
-    "Vermont": 647064,
-    "Virginia": 8683619,
-    "Washington": 7785786,
-    "West Virginia": 1775156,
-    "Wisconsin": 5892539,
-    "Wyoming": 581381,
-    "District of Columbia": 671803
-}
+
+def load_bounds_job(conn):
+    # Backend.charts (pandas, plotly) is imported here, on the worker, not while the page is built
+    from Backend.charts import load_date_bounds
+    return load_date_bounds(conn)
+
+
+class StatsQueryWorker(QThread):
+    """
+    Runs one stats-page job (query + figure building) on its own sqlite connection.
+    `job` is called as job(conn) and its return value is delivered with the request id,
+    so the widget can drop results for selections the user has already moved past.
+    """
+    result_ready = pyqtSignal(int, object)
+    error_occurred = pyqtSignal(int, str)
+    
+    def __init__(self, request_id, job, db_path=DB_PATH):
+        super().__init__()
+        self.request_id = request_id
+        self.job = job
+        self.db_path = db_path
+        self.conn = None
+        self._cancelled = False
+    
+    def cancel(self):
+        """Drop the result and abort a query that is still running"""
+        self._cancelled = True
+        try:
+            if self.conn is not None:
+                self.conn.interrupt()
+        except sqlite3.ProgrammingError:
+            pass
+    
+    def run(self):
+        try:
+            self.conn = sqlite3.connect(self.db_path)
+            result = self.job(self.conn)
+        except Exception as e:
+            if not self._cancelled:
+                self.error_occurred.emit(self.request_id, str(e))
+            return
+        finally:
+            if self.conn is not None:
+                self.conn.close()
+        if not self._cancelled:
+            self.result_ready.emit(self.request_id, result)
 
 
 class HealthStatsWidget(QFrame):
@@ -76,34 +71,68 @@ class HealthStatsWidget(QFrame):
         self.setObjectName("ContentFrame")
         self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
         
-        try:
-            self.conn = sqlite3.connect(DB_PATH)
-        except sqlite3.Error as e:
-            QMessageBox.critical(self, "Database Error", f"Could not connect to database: {e}")
-            return
+        self.metric_types = ['COVID_Cases', 'RSV_Rate']
+        self.granularities = ['weekly', 'monthly']
+        self.chart_types = {'By State': 'by_state', 'Trend': 'trend'}
+        self.rsv_date_bounds = (None, None)
+        
+        self._workers = set()
+        self._chart_worker = None
+        self._chart_request = None
+        self._request_id = 0
+        self.chart_cache = ChartCache(CHART_CACHE_DIR)
         
-        self.load_filter_data()
         self.init_ui()
+        self.load_filter_data()
+    
+    def start_worker(self, job, on_result, on_error):
+        """Run `job(conn)` on a StatsQueryWorker and return the worker"""
+        self._request_id += 1
+        worker = StatsQueryWorker(self._request_id, job)
+        worker.result_ready.connect(on_result)
+        worker.error_occurred.connect(on_error)
+        worker.finished.connect(self._release_worker)
+        self._workers.add(worker)
+        worker.start()
+        return worker
+    
+    def _release_worker(self):
+        worker = self.sender()
+        worker.wait()
+        self._workers.discard(worker)
     
     def load_filter_data(self):
-        """Load data needed for filters from the database"""
-        try:
-            self.metric_types = ['COVID_Cases', 'RSV_Rate']
-            
-            self.covid_years = ['Current']
-            
-            rsv_years_query = """
-            SELECT DISTINCT substr(year, 1, 4) as year_value 
-            FROM state_metrics 
-            WHERE metric_type = 'RSV_Rate'
-            ORDER BY year_value DESC
-            """
-            self.rsv_years = pd.read_sql(rsv_years_query, self.conn)['year_value'].tolist()
-            
-            self.rsv_years = [year for year in self.rsv_years if '2017' <= year <= '2023']
-            
-        except sqlite3.Error as e:
-            QMessageBox.critical(self, "Database Error", f"Error loading filter data: {e}")
+        """Load the RSV date range for the filters in the background"""
+        self.start_worker(load_bounds_job, self.handle_filter_data, self.handle_filter_error)
+    
+    def handle_filter_data(self, request_id, bounds):
+        self.rsv_date_bounds = bounds
+        first, last = bounds
+        if first is None:
+            return
+        first = QDate.fromString(first, Qt.DateFormat.ISODate)
+        last = QDate.fromString(last, Qt.DateFormat.ISODate)
+        for date_edit in (self.start_date_edit, self.end_date_edit):
+            date_edit.setDateRange(first, last)
+        # Default to the most recent year of data
+        self.start_date_edit.setDate(max(first, QDate(last.year(), 1, 1)))
+        self.end_date_edit.setDate(last)
+    
+    def reload_data(self):
+        """New data was committed: widen the date ranges and rebuild the current chart"""
+        self.start_worker(load_bounds_job, self.handle_reloaded_bounds, self.handle_filter_error)
+    
+    def handle_reloaded_bounds(self, request_id, bounds):
+        self.rsv_date_bounds = bounds
+        first, last = bounds
+        if first is not None:
+            for date_edit in (self.start_date_edit, self.end_date_edit):
+                date_edit.setDateRange(QDate.fromString(first, Qt.DateFormat.ISODate),
+                                       QDate.fromString(last, Qt.DateFormat.ISODate))
+        self.update_graphs()
+    
+    def handle_filter_error(self, request_id, error_text):
+        QMessageBox.critical(self, "Database Error", f"Error loading filter data: {error_text}")
     
     def init_ui(self):
         """Initialize the user interface"""
@@ -132,7 +161,7 @@ class HealthStatsWidget(QFrame):
                 color: #FFFFFF;
                 font-size: 14px;
             }
-            QComboBox {
+            QComboBox, QDateEdit {
                 background-color: #27293D;
                 color: #FFFFFF;
                 padding: 5px;
@@ -170,18 +199,44 @@ class HealthStatsWidget(QFrame):
         metric_label = QLabel("Disease Type:")
         self.metric_combo = QComboBox()
         self.metric_combo.addItems(self.metric_types)
-        self.metric_combo.currentTextChanged.connect(self.update_year_options)
+        self.metric_combo.currentTextChanged.connect(self.update_date_options)
         self.metric_combo.setMinimumWidth(150)
         metric_layout.addWidget(metric_label)
         metric_layout.addWidget(self.metric_combo)
         
-        year_layout = QVBoxLayout()
-        year_label = QLabel("Time Period:")
-        self.year_combo = QComboBox()
-        self.year_combo.addItems(self.covid_years)
-        self.year_combo.setMinimumWidth(150)
-        year_layout.addWidget(year_label)
-        year_layout.addWidget(self.year_combo)
+        start_layout = QVBoxLayout()
+        start_label = QLabel("From:")
+        self.start_date_edit = QDateEdit()
+        self.start_date_edit.setCalendarPopup(True)
+        self.start_date_edit.setDisplayFormat("yyyy-MM-dd")
+        self.start_date_edit.setMinimumWidth(130)
+        start_layout.addWidget(start_label)
+        start_layout.addWidget(self.start_date_edit)
+        
+        end_layout = QVBoxLayout()
+        end_label = QLabel("To:")
+        self.end_date_edit = QDateEdit()
+        self.end_date_edit.setCalendarPopup(True)
+        self.end_date_edit.setDisplayFormat("yyyy-MM-dd")
+        self.end_date_edit.setMinimumWidth(130)
+        end_layout.addWidget(end_label)
+        end_layout.addWidget(self.end_date_edit)
+        
+        granularity_layout = QVBoxLayout()
+        granularity_label = QLabel("Granularity:")
+        self.granularity_combo = QComboBox()
+        self.granularity_combo.addItems(self.granularities)
+        self.granularity_combo.setMinimumWidth(120)
+        granularity_layout.addWidget(granularity_label)
+        granularity_layout.addWidget(self.granularity_combo)
+        
+        chart_type_layout = QVBoxLayout()
+        chart_type_label = QLabel("Chart:")
+        self.chart_type_combo = QComboBox()
+        self.chart_type_combo.addItems(list(self.chart_types))
+        self.chart_type_combo.setMinimumWidth(120)
+        chart_type_layout.addWidget(chart_type_label)
+        chart_type_layout.addWidget(self.chart_type_combo)
         
         button_layout = QVBoxLayout()
         button_layout.addStretch()
@@ -192,174 +247,113 @@ class HealthStatsWidget(QFrame):
         button_layout.addWidget(self.update_button)
         
         filter_layout.addLayout(metric_layout)
-        filter_layout.addLayout(year_layout)
+        filter_layout.addLayout(start_layout)
+        filter_layout.addLayout(end_layout)
+        filter_layout.addLayout(granularity_layout)
+        filter_layout.addLayout(chart_type_layout)
         filter_layout.addStretch(1)  
         filter_layout.addLayout(button_layout)
         filter_box.setLayout(filter_layout)
         
         main_layout.addWidget(filter_box, 0)
         
-        self.plot_container = QVBoxLayout()
-        self.plot_container.setSpacing(15)
-        
-        plots_widget = QWidget()
-        plots_widget.setLayout(self.plot_container)
-        plots_widget.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
-        main_layout.addWidget(plots_widget, 1)
+        main_layout.addWidget(self.create_plot_widget(), 1)
         
+        self.update_date_options()
         self.update_graphs()
     
-    def update_year_options(self):
-        """Update year options based on selected metric type"""
-        self.year_combo.clear()
-        
-        selected_metric = self.metric_combo.currentText()
-        if selected_metric == 'COVID_Cases':
-            self.year_combo.addItems(self.covid_years)
-        elif selected_metric == 'RSV_Rate':
-            self.year_combo.addItems(self.rsv_years)
+    def update_date_options(self):
+        """Date range and granularity only apply to metrics with weekly data"""
+        dated = self.metric_combo.currentText() == 'RSV_Rate'
+        for widget in (self.start_date_edit, self.end_date_edit, self.granularity_combo,
+                       self.chart_type_combo):
+            widget.setEnabled(dated)
     
     def update_graphs(self):
         """Update graphs based on selected filters"""
-        for i in reversed(range(self.plot_container.count())): 
-            widget = self.plot_container.itemAt(i).widget()
-            if widget:
-                widget.setParent(None)
+        self._chart_request = {
+            'metric': self.metric_combo.currentText(),
+            'start_date': self.start_date_edit.date().toString(Qt.DateFormat.ISODate),
+            'end_date': self.end_date_edit.date().toString(Qt.DateFormat.ISODate),
+            'granularity': self.granularity_combo.currentText(),
+            'chart_type': self.chart_types[self.chart_type_combo.currentText()],
+        }
+        self.show_loading_message()
+        self.request_chart(**self._chart_request)
+    
+    def request_chart(self, **request):
+        """Build the chart for `request` on a worker, replacing any chart still loading"""
+        # Only the latest selection matters; abort whatever is still loading.
+        if self._chart_worker is not None:
+            self._chart_worker.cancel()
         
-        selected_metric = self.metric_combo.currentText()
-        selected_year = self.year_combo.currentText()
+        # Downsample trend lines to roughly one point per horizontal pixel, in steps
+        # of 250 so small resizes still hit the chart cache
+        request = dict(request, max_points=max(250, -(-self.chart_view.width() // 250) * 250))
+        cache = self.chart_cache
         
-        try:
-            if selected_metric == 'COVID_Cases':
-                self.display_covid_data()
-            elif selected_metric == 'RSV_Rate':
-                self.display_rsv_data(selected_year)
-        except Exception as e:
-            QMessageBox.warning(self, "Data Error", f"Error processing data: {e}")
+        def job(conn):
+            from Backend.charts import build_chart_payload
+            return cache.get_or_build(request, read_data_generation(conn),
+                                      lambda: build_chart_payload(conn, **request))
+        
+        self._chart_worker = self.start_worker(job, self.handle_chart_payload, self.handle_chart_error)
     
-    def display_covid_data(self):
-        """Display COVID cases data"""
-        try:
-            query = "SELECT state, metric_value FROM state_metrics WHERE metric_type = 'COVID_Cases' AND year = 'Current'"
-            data = pd.read_sql(query, self.conn)
-            
-            data = data[data['metric_value'] > 0]
-            
-            if data.empty:
-                self.show_no_data_message()
-                return
-            
-            data = data.sort_values('metric_value', ascending=False)
-            
-            fig = go.Figure(data=[
-                go.Bar(
-                    x=data['state'], 
-                    y=data['metric_value'],
-                    marker_color='#1f77b4',  
-                    hovertemplate='<b>%{x}</b><br>Cases: %{y:,.0f}<extra></extra>'
-                )
-            ])
-            
-            fig.update_layout(
-                title={
-                    'text': 'COVID-19 Cases by State',
-                    'font': {'color': 'white', 'size': 20}
-                },
-                xaxis_title={'text': 'State', 'font': {'color': 'white', 'size': 14}},
-                yaxis_title={'text': 'Number of Cases', 'font': {'color': 'white', 'size': 14}},
-                xaxis={'tickfont': {'color': 'white'}},
-                yaxis={'tickfont': {'color': 'white'}},
-                plot_bgcolor='#27293D',  
-                paper_bgcolor='#27293D',
-                margin=dict(l=40, r=40, t=60, b=40),
-            )
-            
-            plot_widget = self.create_plot_widget(fig, "COVID-19 Cases")
-            self.plot_container.addWidget(plot_widget)
-            
-        except Exception as e:
-            QMessageBox.warning(self, "Data Error", f"Error processing COVID data: {e}")
+    def handle_x_range_changed(self, start, end):
+        """Zoomed into a trend chart: refetch just the visible window at full resolution"""
+        if self._chart_request is None or self._chart_request['chart_type'] != 'trend':
+            return
+        self.request_chart(**dict(self._chart_request, start_date=start[:10], end_date=end[:10]))
     
-    def display_rsv_data(self, year):
-        """Display RSV rate data for the specified year"""
-        try:
-            query = f"""
-            SELECT t1.state, t1.metric_value, t1.year
-            FROM state_metrics t1
-            JOIN (
-                SELECT state, MIN(year) as min_year
-                FROM state_metrics
-                WHERE metric_type = 'RSV_Rate' AND year LIKE '{year}%'
-                GROUP BY state
-            ) t2 ON t1.state = t2.state AND t1.year = t2.min_year
-            WHERE t1.metric_type = 'RSV_Rate'
-            """
-            
-            rsv_data = pd.read_sql(query, self.conn)
-            
-            if rsv_data.empty:
-                self.show_no_data_message()
-                return
-            
-            def calculate_rsv_cases(row):
-                state_name = row['state']
-                rate = row['metric_value']
-                
-                if state_name in STATE_POPULATIONS:
-                    population = STATE_POPULATIONS[state_name]
-                    return (rate / 100) * population / 1000
-                return 0
-            
-            rsv_data['calculated_cases'] = rsv_data.apply(calculate_rsv_cases, axis=1)
-            
-            rsv_data = rsv_data[rsv_data['calculated_cases'] > 0]
-            
-            if rsv_data.empty:
-                self.show_no_data_message()
-                return
-            
-            rsv_data = rsv_data.sort_values('calculated_cases', ascending=False)
-            
-            fig = go.Figure(data=[
-                go.Bar(
-                    x=rsv_data['state'], 
-                    y=rsv_data['calculated_cases'],
-                    marker_color='#ff7f0e',  
-                    hovertemplate='<b>%{x}</b><br>Cases (thousands): %{y:,.1f}<extra></extra>'
-                )
-            ])
-            
-            fig.update_layout(
-                title={
-                    'text': f'Estimated RSV Cases by State (in thousands) ({year})',
-                    'font': {'color': 'white', 'size': 20}
-                },
-                xaxis_title={'text': 'State', 'font': {'color': 'white', 'size': 14}},
-                yaxis_title={'text': 'Estimated Cases (thousands)', 'font': {'color': 'white', 'size': 14}},
-                xaxis={'tickfont': {'color': 'white'}},
-                yaxis={'tickfont': {'color': 'white'}},
-                plot_bgcolor='#27293D',
-                paper_bgcolor='#27293D',
-                margin=dict(l=40, r=40, t=60, b=40),
-                height=600
-            )
-            
-            plot_widget = self.create_plot_widget(fig, f"RSV Cases ({year})")
-            self.plot_container.addWidget(plot_widget)
-            
-        except Exception as e:
-            QMessageBox.warning(self, "Data Error", f"Error processing RSV data: {e}")
+    def handle_x_range_reset(self):
+        if self._chart_request is None or self._chart_request['chart_type'] != 'trend':
+            return
+        self.request_chart(**self._chart_request)
+    
+    def handle_chart_payload(self, request_id, payload):
+        if self._chart_worker is None or request_id != self._chart_worker.request_id:
+            return
+        self._chart_worker = None
+        self.update_cache_label()
+        if payload['figure'] is None:
+            self.show_no_data_message()
+        else:
+            self.show_figure(payload['figure'], payload['title'])
+    
+    def update_cache_label(self):
+        stats = self.chart_cache.stats()
+        hits = stats['memory_hits'] + stats['disk_hits']
+        self.cache_label.setText(
+            f"Chart cache: {hits} hits ({stats['memory_hits']} memory, {stats['disk_hits']} disk), "
+            f"{stats['misses']} misses"
+        )
+    
+    def handle_chart_error(self, request_id, error_text):
+        if self._chart_worker is None or request_id != self._chart_worker.request_id:
+            return
+        self._chart_worker = None
+        self.show_no_data_message()
+        QMessageBox.warning(self, "Data Error", f"Error processing data: {error_text}")
     
     def show_no_data_message(self):
         """Show message when no data is available"""
-        no_data_label = QLabel("No data available for the selected filters.")
-        no_data_label.setStyleSheet("color: #FFFFFF; font-size: 16px;")
-        no_data_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.plot_container.addWidget(no_data_label)
+        self.status_label.setText("No data available for the selected filters.")
+        self.plot_stack.setCurrentWidget(self.status_label)
+    
+    def show_loading_message(self):
+        """Show the loading state while a worker builds the chart"""
+        self.status_label.setText("Loading...")
+        self.plot_stack.setCurrentWidget(self.status_label)
     
-    def create_plot_widget(self, fig, title):
-        """Create a widget containing a Plotly plot"""
-        plot_box = QGroupBox(title)
+    def show_figure(self, fig, title):
+        """Push a figure into the persistent chart view"""
+        self.plot_box.setTitle(title)
+        self.chart_view.render_figure(fig)
+        self.plot_stack.setCurrentWidget(self.chart_view)
+    
+    def create_plot_widget(self):
+        """Create the box holding the persistent chart view and the no-data message"""
+        plot_box = QGroupBox()
         plot_box.setObjectName("FilterSidebar")  
         plot_box.setStyleSheet("""
             QGroupBox {
@@ -373,21 +367,41 @@ class HealthStatsWidget(QFrame):
         
         plot_layout = QVBoxLayout()
         
-        plot_html = plot(fig, output_type='div', include_plotlyjs='cdn')
+        if STATS_CHART_BACKEND == "native":
+            from frontend.native_chart import NativeChartView
+            self.chart_view = NativeChartView()
+        else:
+            from frontend.plotly_chart import PlotlyChartView
+            self.chart_view = PlotlyChartView()
+        self.chart_view.x_range_changed.connect(self.handle_x_range_changed)
+        self.chart_view.x_range_reset.connect(self.handle_x_range_reset)
+        
+        self.status_label = QLabel()
+        self.status_label.setStyleSheet("color: #FFFFFF; font-size: 16px;")
+        self.status_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        
+        self.plot_stack = QStackedWidget()
+        self.plot_stack.addWidget(self.chart_view)
+        self.plot_stack.addWidget(self.status_label)
+        self.plot_stack.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
         
-        web_view = QWebEngineView()
-        web_view.setHtml(plot_html)
-        web_view.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+        plot_layout.addWidget(self.plot_stack)
         
-        plot_layout.addWidget(web_view)
+        self.cache_label = QLabel()
+        self.cache_label.setStyleSheet("color: #8A8BA8; font-size: 11px;")
+        self.cache_label.setAlignment(Qt.AlignmentFlag.AlignRight)
+        plot_layout.addWidget(self.cache_label)
         plot_box.setLayout(plot_layout)
+        self.plot_box = plot_box
         
         return plot_box
 
     def cleanup(self):
-        """Close database connection"""
-        if hasattr(self, 'conn') and self.conn:
-            self.conn.close()
+        """Cancel and wait for any running workers"""
+        for worker in list(self._workers):
+            worker.cancel()
+            worker.wait()
+        self._workers.clear()
 
 
 def create_stats_page():
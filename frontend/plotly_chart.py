@@ -0,0 +1,94 @@
+from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot
+from PyQt6.QtWidgets import QSizePolicy
+from PyQt6.QtWebEngineWidgets import QWebEngineView
+from PyQt6.QtWebChannel import QWebChannel
+from plotly.offline import get_plotlyjs_version
+
+
+CHART_SHELL_HTML = """
+<html>
+<head>
+<meta charset="utf-8">
+<script src="https://cdn.plot.ly/plotly-{version}.min.js"></script>
+<script src="qrc:///qtwebchannel/qwebchannel.js"></script>
+<style>
+    html, body {{ margin: 0; height: 100%; background-color: #27293D; overflow: hidden; }}
+    #chart {{ width: 100%; height: 100%; }}
+</style>
+</head>
+<body>
+<div id="chart"></div>
+<script>
+    var bridge = null;
+    var listening = false;
+    new QWebChannel(qt.webChannelTransport, function(channel) {{
+        bridge = channel.objects.bridge;
+    }});
+
+    function renderChart(figure) {{
+        Plotly.react('chart', figure.data, figure.layout, {{responsive: true}});
+        if (!listening) {{
+            listening = true;
+            document.getElementById('chart').on('plotly_relayout', function(event) {{
+                if (!bridge) return;
+                if (event['xaxis.range[0]'] !== undefined) {{
+                    bridge.on_x_range(String(event['xaxis.range[0]']), String(event['xaxis.range[1]']));
+                }} else if (event['xaxis.autorange']) {{
+                    bridge.on_x_autorange();
+                }}
+            }});
+        }}
+    }}
+</script>
+</body>
+</html>
+"""
+
+
+class ChartBridge(QObject):
+    """Receives zoom events from the chart page over QWebChannel"""
+    x_range_changed = pyqtSignal(str, str)
+    x_range_reset = pyqtSignal()
+
+    @pyqtSlot(str, str)
+    def on_x_range(self, start, end):
+        self.x_range_changed.emit(start, end)
+
+    @pyqtSlot()
+    def on_x_autorange(self):
+        self.x_range_reset.emit()
+
+
+class PlotlyChartView(QWebEngineView):
+    """
+    Long-lived chart view. The Plotly shell page is loaded once; every later
+    figure is pushed into it with Plotly.react instead of reloading a new page.
+    Zooming the x axis is reported through x_range_changed / x_range_reset.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._ready = False
+        self._pending = None
+        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+        self.bridge = ChartBridge(self)
+        self.x_range_changed = self.bridge.x_range_changed
+        self.x_range_reset = self.bridge.x_range_reset
+        self.channel = QWebChannel(self)
+        self.channel.registerObject("bridge", self.bridge)
+        self.page().setWebChannel(self.channel)
+        self.loadFinished.connect(self._on_load_finished)
+        self.setHtml(CHART_SHELL_HTML.format(version=get_plotlyjs_version()))
+
+    def render_figure(self, fig):
+        """Show a plotly Figure (or an already serialized figure JSON string)"""
+        payload = fig if isinstance(fig, str) else fig.to_json()
+        if self._ready:
+            self.page().runJavaScript(f"renderChart({payload});")
+        else:
+            self._pending = payload
+
+    def _on_load_finished(self, ok):
+        self._ready = ok
+        if ok and self._pending is not None:
+            payload, self._pending = self._pending, None
+            self.render_figure(payload)
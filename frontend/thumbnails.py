@@ -0,0 +1,132 @@
+"""
+Dashboard preview thumbnails: the default heatmap and stats chart rendered
+offscreen to small PNGs, cached per data generation so the landing page can show
+current previews without a web view.
+
+The dashboard imports this at start-up for the cached paths only; the renderers
+(numpy, folium, pandas, plotly) are imported on the worker when they first run.
+"""
+import os
+import sqlite3
+from pathlib import Path
+
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from Backend.db import read_data_generation
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+THUMBNAIL_DIR = BASE_DIR / "thumbnail_cache"
+
+# Contiguous US; Alaska and Hawaii would leave most of a small preview empty
+THUMBNAIL_BOUNDS = [[24.0, -125.0], [50.0, -66.0]]
+THUMBNAIL_BACKGROUND = (0x1E, 0x1E, 0x2F)
+HEATMAP_THUMBNAIL_WIDTH = 600
+CHART_THUMBNAIL_SIZE = (480, 630)
+
+# The selection the stats page opens with
+DEFAULT_CHART_REQUEST = {'metric': 'COVID_Cases', 'chart_type': 'by_state'}
+
+
+def thumbnail_path(kind, generation, cache_dir=THUMBNAIL_DIR):
+    return os.path.join(str(cache_dir), f"{kind}_g{generation}.png")
+
+
+def latest_thumbnail(kind, cache_dir=THUMBNAIL_DIR):
+    """Newest cached thumbnail of `kind` from any generation, or None"""
+    try:
+        names = [name for name in os.listdir(cache_dir) if name.startswith(f"{kind}_g") and name.endswith(".png")]
+    except OSError:
+        return None
+    if not names:
+        return None
+    newest = max(names, key=lambda name: int(name[len(kind) + 2:-4]))
+    return os.path.join(str(cache_dir), newest)
+
+
+def remove_stale_thumbnails(generation, cache_dir=THUMBNAIL_DIR):
+    suffix = f"_g{generation}.png"
+    for name in os.listdir(cache_dir):
+        if not name.endswith(suffix):
+            try:
+                os.unlink(os.path.join(str(cache_dir), name))
+            except OSError:
+                pass
+
+
+def render_heatmap_thumbnail(db_name, output_file, width=HEATMAP_THUMBNAIL_WIDTH):
+    """Default heatmap (first disease, newest period) composited on the app background. False if no data."""
+    import numpy as np
+    from folium.utilities import write_png
+
+    from Backend.generate_heatmap import (
+        DISEASE_CONFIGS, colorize_heat_surface, compute_heat_surface, fetch_heatmap_data, get_disease_periods
+    )
+
+    disease = next(iter(DISEASE_CONFIGS))
+    config = DISEASE_CONFIGS[disease]
+    periods = get_disease_periods(disease, db_name=db_name)
+    if not periods:
+        return False
+    heatmap_data = fetch_heatmap_data(db_name=db_name, metric_type=config["metric_type"],
+                                      year_filter=periods[-1], exact_match=config["exact_match"])
+    if not heatmap_data:
+        return False
+
+    rgba = colorize_heat_surface(compute_heat_surface(heatmap_data, bounds=THUMBNAIL_BOUNDS, width=width,
+                                                      sigma_deg=1.5))
+    alpha = rgba[..., 3:4] / 255.0
+    image = rgba[..., :3] * alpha + np.array(THUMBNAIL_BACKGROUND) * (1 - alpha)
+    with open(output_file, "wb") as f:
+        f.write(write_png(image.astype(np.uint8)))
+    return True
+
+
+def render_chart_thumbnail(payload, output_file, size=CHART_THUMBNAIL_SIZE):
+    """Draw a chart payload with the native renderer into a PNG. GUI thread only."""
+    from frontend.native_chart import NativeChartView
+
+    view = NativeChartView()
+    view.resize(*size)
+    view.render_figure(payload['figure'])
+    saved = view.grab().save(output_file, "PNG")
+    view.deleteLater()
+    return saved
+
+
+class ThumbnailWorker(QThread):
+    """
+    Renders the heatmap thumbnail and builds the chart payload for the current
+    data generation, skipping whatever is already cached. The chart itself is
+    drawn by the receiver, since QWidget painting must happen on the GUI thread.
+    """
+    thumbnails_ready = pyqtSignal(int, str, object)
+
+    def __init__(self, db_name, cache_dir=THUMBNAIL_DIR):
+        super().__init__()
+        self.db_name = str(db_name)
+        self.cache_dir = str(cache_dir)
+
+    def run(self):
+        try:
+            from Backend.charts import build_chart_payload
+
+            os.makedirs(self.cache_dir, exist_ok=True)
+            conn = sqlite3.connect(self.db_name)
+            try:
+                generation = read_data_generation(conn)
+                chart_payload = None
+                if not os.path.exists(thumbnail_path("chart", generation, self.cache_dir)):
+                    chart_payload = build_chart_payload(conn, **DEFAULT_CHART_REQUEST)
+            finally:
+                conn.close()
+
+            heatmap_file = thumbnail_path("heatmap", generation, self.cache_dir)
+            if not os.path.exists(heatmap_file):
+                partial = heatmap_file + ".partial"
+                if render_heatmap_thumbnail(self.db_name, partial):
+                    os.replace(partial, heatmap_file)
+            remove_stale_thumbnails(generation, self.cache_dir)
+        except Exception as e:
+            print(f"Error rendering dashboard thumbnails: {e}")
+            return
+        self.thumbnails_ready.emit(generation, heatmap_file if os.path.exists(heatmap_file) else "", chart_payload)
@@ -1,22 +1,131 @@
+import os
+import subprocess
 import sys
+import threading
+from PyQt6.QtCore import Qt, QThread, pyqtSignal
 from PyQt6.QtWidgets import QApplication
 from frontend.dash import ModernDashboard
-from Backend.main import back_main
-import time
+from Backend.cli import FAILED_STAGES_PREFIX
+from Backend.db import get_data_generation
+from Backend.main import create_tables
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class BackendRefreshWorker(QThread):
+    """
+    Runs the refresh pipeline (`python -m Backend.cli refresh`) in a subprocess,
+    so the scrapers get a main thread and their own event loop, and stopping it
+    never leaves the GUI process half-way through anything. Reports each stage,
+    emits data_updated whenever a stage has committed new rows, and finally
+    refresh_done with the error text ("" on success).
+    """
+    stage_changed = pyqtSignal(str)
+    data_updated = pyqtSignal()
+    refresh_done = pyqtSignal(str)
+
+    def __init__(self, db_name="health_data.db"):
+        super().__init__()
+        self.db_name = db_name
+        self.generation = get_data_generation(db_name)
+        self.process = None
+        self.stopped = False
+
+    def check_for_new_data(self):
+        generation = get_data_generation(self.db_name)
+        if generation != self.generation:
+            self.generation = generation
+            self.data_updated.emit()
+
+    def run(self):
+        env = dict(os.environ, PYTHONUNBUFFERED="1")
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [SCRIPT_DIR, env.get("PYTHONPATH")]))
+        error = ""
+        try:
+            self.process = subprocess.Popen(
+                [sys.executable, "-m", "Backend.cli", "refresh"],
+                stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, env=env
+            )
+            if self.stopped:
+                self.process.terminate()
+            for line in self.process.stdout:
+                line = line.rstrip("\n")
+                if line.startswith("== "):
+                    self.check_for_new_data()
+                    self.stage_changed.emit(line[3:])
+                    continue
+                print(line)
+                if line.startswith(FAILED_STAGES_PREFIX):
+                    error = line
+            returncode = self.process.wait()
+            if returncode and not error and not self.stopped:
+                error = f"refresh exited with code {returncode}"
+        except Exception as e:
+            print("Error refreshing data:", e)
+            error = str(e) or type(e).__name__
+        self.check_for_new_data()
+        self.refresh_done.emit(error)
+
+    def stop(self, timeout=5):
+        """Stop the refresh process (SQLite rolls back a half-written transaction); the thread then ends by itself"""
+        self.stopped = True
+        process = self.process
+        if process is None or process.poll() is not None:
+            return
+        process.terminate()
+        try:
+            process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def warm_up_model():
+    """Load the AI model in the background so the first question doesn't wait for it"""
+    try:
+        from Backend.ollama_client import warm_up
+        warm_up()
+    except Exception as e:
+        # Not fatal: the first question will load the model (or report Ollama being down)
+        print("Error warming up the AI model:", e)
+
+
+def create_application(argv):
+    # WebEngine is imported after the QApplication exists (the heatmap and stats
+    # pages load lazily), which Qt only allows with shared OpenGL contexts.
+    QApplication.setAttribute(Qt.ApplicationAttribute.AA_ShareOpenGLContexts)
+    app = QApplication(argv)
 
-def main():
-    back_main()
-    app = QApplication(sys.argv)
-    
     try:
         with open("./frontend/styles.qss", "r") as f:
             app.setStyleSheet(f.read())
     except Exception as e:
         print("Error loading stylesheet:", e)
+    return app
+
+
+def main():
+    app = create_application(sys.argv)
+
+    # Start from whatever is already in health_data.db; the refresh runs behind the window.
+    create_tables()
     window = ModernDashboard()
     window.show()
-    sys.exit(app.exec())
+
+    worker = BackendRefreshWorker()
+    worker.stage_changed.connect(window.show_refresh_status)
+    worker.data_updated.connect(window.reload_data)
+    worker.refresh_done.connect(window.finish_refresh_status)
+    worker.start()
+
+    # A daemon thread: nothing to clean up if the app quits while the model loads
+    threading.Thread(target=warm_up_model, name="model-warmup", daemon=True).start()
+
+    exit_code = app.exec()
+    if worker.isRunning():
+        print("Stopping the data refresh...")
+        worker.stop()
+        worker.wait()
+    sys.exit(exit_code)
 
 if __name__ == "__main__":
     main()
-
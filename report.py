@@ -0,0 +1,224 @@
+"""
+Headless report: render every metric/period chart and heatmap to static files
+plus a summary table, without a display server.
+
+    python report.py --output-dir reports --formats html,svg,png --workers 4
+
+Charts are built with the same code as the stats page (Backend.charts) and
+heatmaps with the raster renderer, one task per chart across worker processes.
+HTML is always written; SVG/PNG chart export needs the optional `kaleido`
+package and is skipped with a note when it is missing.
+"""
+import argparse
+import html
+import importlib.util
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from Backend.generate_heatmap import (
+    DISEASE_CONFIGS, generate_heatmap_html, get_disease_periods, heatmap_filename
+)
+from Backend.main import create_tables
+from Backend.metric_queries import query_metric_range
+from Backend.charts import build_chart_payload, load_date_bounds
+
+CHART_FORMATS = ("html", "svg", "png")
+CHART_TYPES = ("by_state", "trend")
+
+
+def has_kaleido():
+    return importlib.util.find_spec("kaleido") is not None
+
+
+def plan_chart_tasks(db_name, granularity="weekly"):
+    """One task per (metric, period, chart type): COVID once, RSV per calendar year"""
+    tasks = [{'metric': 'COVID_Cases', 'period': 'Current', 'chart_type': 'by_state'}]
+
+    conn = sqlite3.connect(db_name)
+    try:
+        first, last = load_date_bounds(conn)
+    finally:
+        conn.close()
+    if first is None:
+        return tasks
+
+    for year in range(int(first[:4]), int(last[:4]) + 1):
+        for chart_type in CHART_TYPES:
+            tasks.append({
+                'metric': 'RSV_Rate',
+                'period': str(year),
+                'chart_type': chart_type,
+                'start_date': f"{year}-01-01",
+                'end_date': f"{year}-12-31",
+                'granularity': granularity
+            })
+    return tasks
+
+
+def chart_stem(task):
+    return f"chart_{task['metric']}_{task['period']}_{task['chart_type']}"
+
+
+def render_chart(db_name, task, output_dir, formats):
+    """Worker: build one chart and write it in every requested format"""
+    import plotly.io as pio
+
+    conn = sqlite3.connect(db_name)
+    try:
+        request = {key: value for key, value in task.items() if key != 'period'}
+        payload = build_chart_payload(conn, **request)
+    finally:
+        conn.close()
+
+    result = {'kind': 'chart', 'title': payload['title'], 'files': [], **task}
+    if payload['figure'] is None:
+        return result
+
+    fig = pio.from_json(payload['figure'])
+    stem = os.path.join(output_dir, chart_stem(task))
+    for fmt in formats:
+        path = f"{stem}.{fmt}"
+        if fmt == "html":
+            fig.write_html(path, include_plotlyjs="cdn")
+        else:
+            fig.write_image(path, format=fmt, width=1200, height=600)
+        result['files'].append(os.path.basename(path))
+    return result
+
+
+def render_heatmap(db_name, disease, period, output_dir):
+    """Worker: raster heatmap (a folium page with the PNG surface embedded)"""
+    config = DISEASE_CONFIGS[disease]
+    output_file = os.path.join(output_dir, heatmap_filename(disease, period))
+    written = generate_heatmap_html(config["metric_type"], period, output_file,
+                                    exact_match=config["exact_match"], db_name=db_name,
+                                    mode="raster")
+    files = [os.path.basename(output_file)] if written is not None else []
+    return {'kind': 'heatmap', 'title': f"{disease} Heatmap ({period})", 'metric': config["metric_type"],
+            'period': period, 'chart_type': 'heatmap', 'files': files}
+
+
+def summarize(db_name, tasks):
+    """Per metric/period statistics over the states reporting in that period"""
+    conn = sqlite3.connect(db_name)
+    rows = []
+    try:
+        covid = pd.read_sql("SELECT state, metric_value FROM state_metrics "
+                            "WHERE metric_type = 'COVID_Cases' AND year = 'Current'", conn)
+        periods = [('COVID_Cases', 'Current', covid)]
+        for task in tasks:
+            if task['metric'] == 'RSV_Rate' and task['chart_type'] == 'by_state':
+                frame = pd.DataFrame(query_metric_range(conn, 'RSV_Rate', task['start_date'], task['end_date']),
+                                     columns=['state', 'period', 'metric_value'])
+                periods.append(('RSV_Rate', task['period'], frame))
+    finally:
+        conn.close()
+
+    for metric, period, frame in periods:
+        frame = frame.dropna(subset=['metric_value'])
+        if frame.empty:
+            continue
+        by_state = frame.groupby('state')['metric_value'].mean()
+        rows.append({
+            'metric': metric,
+            'period': period,
+            'states': int(by_state.size),
+            'observations': int(len(frame)),
+            'mean': round(float(frame['metric_value'].mean()), 2),
+            'max': round(float(frame['metric_value'].max()), 2),
+            'top_state': by_state.idxmax()
+        })
+    return pd.DataFrame(rows, columns=['metric', 'period', 'states', 'observations', 'mean', 'max', 'top_state'])
+
+
+def write_index(output_dir, results, summary):
+    """index.html linking every rendered file, above the summary table"""
+    items = []
+    for result in sorted(results, key=lambda r: (r['kind'], r['metric'], r['period'], r['chart_type'])):
+        if result['files']:
+            links = ", ".join(f'<a href="{html.escape(name)}">{html.escape(name.rsplit(".", 1)[-1])}</a>'
+                              for name in result['files'])
+        else:
+            links = "no data"
+        items.append(f"<li>{html.escape(result['title'])}: {links}</li>")
+
+    with open(os.path.join(output_dir, "index.html"), "w", encoding="utf-8") as f:
+        f.write(f"""<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>Health Data Report</title></head>
+<body style="font-family: Arial, sans-serif; background: #1E1E2F; color: #FFFFFF;">
+<h1>Health Data Report</h1>
+<p>Generated {time.strftime('%Y-%m-%d %H:%M')}</p>
+<h2>Summary</h2>
+{summary.to_html(index=False, border=0)}
+<h2>Charts and Heatmaps</h2>
+<ul>
+{chr(10).join(items)}
+</ul>
+</body>
+</html>
+""")
+
+
+def generate_report(db_name="health_data.db", output_dir="reports", formats=CHART_FORMATS,
+                    granularity="weekly", workers=None, heatmaps=True):
+    """Render everything into output_dir and return the list of task results"""
+    os.makedirs(output_dir, exist_ok=True)
+    # Migrate older databases once here; the workers' queries only read
+    create_tables(db_name)
+    formats = list(formats)
+    if not has_kaleido() and any(fmt != "html" for fmt in formats):
+        print("kaleido is not installed; writing charts as HTML only (pip install kaleido for SVG/PNG).")
+        formats = ["html"]
+
+    tasks = plan_chart_tasks(db_name, granularity)
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(render_chart, db_name, task, output_dir, formats) for task in tasks]
+        if heatmaps:
+            for disease in DISEASE_CONFIGS:
+                for period in get_disease_periods(disease, db_name=db_name):
+                    futures.append(pool.submit(render_heatmap, db_name, disease, period, output_dir))
+
+        for future in as_completed(futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                print(f"Error rendering report item: {e}")
+
+    summary = summarize(db_name, tasks)
+    summary.to_csv(os.path.join(output_dir, "summary.csv"), index=False)
+    write_index(output_dir, results, summary)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default="health_data.db")
+    parser.add_argument("--output-dir", default="reports")
+    parser.add_argument("--formats", default="html,svg,png",
+                        help="comma separated chart formats (html, svg, png)")
+    parser.add_argument("--granularity", default="weekly", choices=["weekly", "monthly"])
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--no-heatmaps", action="store_true")
+    args = parser.parse_args()
+
+    formats = [fmt.strip() for fmt in args.formats.split(",") if fmt.strip()]
+    unknown = set(formats) - set(CHART_FORMATS)
+    if unknown:
+        parser.error(f"unknown format(s): {', '.join(sorted(unknown))}")
+
+    start = time.perf_counter()
+    results = generate_report(args.db, args.output_dir, formats, args.granularity,
+                              args.workers, heatmaps=not args.no_heatmaps)
+    written = sum(len(result['files']) for result in results)
+    print(f"Wrote {written} files for {len(results)} charts/heatmaps to {args.output_dir} "
+          f"in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
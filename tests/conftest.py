@@ -0,0 +1,29 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Backend.main import create_tables, insert_state_centroids, insert_state_metrics  # noqa: E402
+
+CENTROIDS = {
+    "Colorado": (39.7392, -104.9903),
+    "Texas": (29.7604, -95.3698),
+    "New York": (40.7128, -74.0060)
+}
+
+
+@pytest.fixture
+def health_db(tmp_path):
+    """A small health_data.db: two RSV seasons of weekly rates, COVID positivity and centroids"""
+    db_name = str(tmp_path / "health_data.db")
+    create_tables(db_name)
+    insert_state_centroids(CENTROIDS, db_name)
+    rsv = [(state, float(base + week), f"{year}-{month:02d}-{day:02d}")
+           for base, state in enumerate(CENTROIDS, start=1)
+           for week, (year, month, day) in enumerate([(2022, 1, 1), (2022, 1, 8), (2022, 2, 5),
+                                                      (2023, 1, 7), (2023, 1, 14)])]
+    insert_state_metrics(rsv, "RSV_Rate", db_name)
+    insert_state_metrics([(state, 5.0, "Past 4 Weeks") for state in CENTROIDS], "COVID_Positivity", db_name)
+    return db_name
@@ -0,0 +1,57 @@
+from Backend.ai_digest import build_prompt_context, estimate_tokens, get_digest, select_context
+
+ENTRIES = [
+    {"topic": "covid", "state": None, "text": "COVID-19 test positivity overview."},
+    {"topic": "rsv", "state": None, "text": "RSV rate overview."},
+    {"topic": "rsv", "state": None, "text": "RSV trend overview."},
+    {"topic": None, "state": "Virginia", "text": "Virginia: COVID positivity 4.0%."},
+    {"topic": None, "state": "West Virginia", "text": "West Virginia: COVID positivity 6.0%."},
+    {"topic": None, "state": "Texas", "text": "Texas: RSV rate 2.00 per 100k."}
+]
+
+
+def test_unrelated_question_gets_nothing():
+    assert select_context(ENTRIES, "How do I wash my hands properly?") == ""
+
+
+def test_topic_selects_its_overviews():
+    assert select_context(ENTRIES, "Tell me about RSV") == "RSV rate overview.\nRSV trend overview."
+
+
+def test_state_question_gets_only_that_state():
+    assert select_context(ENTRIES, "How is Texas doing?") == "Texas: RSV rate 2.00 per 100k."
+
+
+def test_longest_state_name_wins():
+    assert select_context(ENTRIES, "What about West Virginia?") == "West Virginia: COVID positivity 6.0%."
+
+
+def test_state_and_ranking_question_adds_overviews():
+    context = select_context(ENTRIES, "Is Texas among the highest for COVID?")
+    assert context.splitlines() == ["Texas: RSV rate 2.00 per 100k.", "COVID-19 test positivity overview."]
+
+
+def test_ranking_question_gets_every_overview():
+    context = select_context(ENTRIES, "Which state is the worst right now?")
+    assert context.splitlines() == [entry["text"] for entry in ENTRIES if entry["state"] is None]
+
+
+def test_token_budget():
+    budget = estimate_tokens(ENTRIES[1]["text"])
+    assert select_context(ENTRIES, "Tell me about RSV", token_budget=budget) == "RSV rate overview."
+    assert select_context(ENTRIES, "Tell me about RSV", token_budget=1) == ""
+
+
+def test_digest_from_database(health_db):
+    entries = get_digest(health_db)
+    states = {entry["state"] for entry in entries if entry["state"]}
+    assert states == {"Colorado", "Texas", "New York"}
+    assert "New York" in build_prompt_context("What is the RSV rate in New York?", db_name=health_db)
+
+
+def test_both_virginias_when_both_are_named():
+    context = select_context(ENTRIES, "How are Virginia and West Virginia doing?")
+    assert context.splitlines() == ["Virginia: COVID positivity 4.0%.", "West Virginia: COVID positivity 6.0%."]
+    # "Compare" also asks for the overviews, after the states
+    context = select_context(ENTRIES, "Compare Virginia and West Virginia")
+    assert context.splitlines()[:2] == ["Virginia: COVID positivity 4.0%.", "West Virginia: COVID positivity 6.0%."]
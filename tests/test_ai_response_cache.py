@@ -0,0 +1,61 @@
+import sqlite3
+
+from Backend.ai_response_cache import ResponseCache, make_cache_key
+
+MODEL = "gemma3:1b-it-q4_K_M"
+
+
+def test_key_normalizes_the_prompt():
+    assert make_cache_key("What is RSV?", MODEL, "system", 1) == make_cache_key("  what is   rsv ", MODEL, "system", 1)
+
+
+def test_key_depends_on_model_system_prompt_and_generation():
+    key = make_cache_key("What is RSV?", MODEL, "system", 1)
+    assert key != make_cache_key("What is RSV?", "other-model", "system", 1)
+    assert key != make_cache_key("What is RSV?", MODEL, "other system", 1)
+    assert key != make_cache_key("What is RSV?", MODEL, "system", 2)
+
+
+def test_put_get_and_stats(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.db")
+    assert cache.get("What is RSV?", MODEL, "system", 1) is None
+    cache.put("What is RSV?", MODEL, "system", 1, "A virus.")
+    assert cache.get("what is rsv", MODEL, "system", 1) == "A virus."
+    assert cache.get("What is RSV?", MODEL, "system", 2) is None
+    assert cache.stats() == {"hits": 1, "misses": 2, "hit_rate": 1 / 3, "entries": 1}
+
+
+def test_blank_answers_are_not_cached(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.db")
+    cache.put("What is RSV?", MODEL, "system", 1, "   ")
+    assert cache.stats()["entries"] == 0
+
+
+def test_expired_entries_are_not_served(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.db", ttl_seconds=3600)
+    cache.put("What is RSV?", MODEL, "system", 1, "A virus.")
+    conn = sqlite3.connect(cache.db_name)
+    conn.execute("UPDATE ai_response_cache SET created_at = created_at - 7200")
+    conn.commit()
+    conn.close()
+    assert cache.get("What is RSV?", MODEL, "system", 1) is None
+
+    # The next write sweeps expired rows
+    cache.put("What is COVID?", MODEL, "system", 1, "Another virus.")
+    assert cache.stats()["entries"] == 1
+
+
+def test_least_recently_used_entries_are_dropped(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.db", max_entries=2)
+    cache.put("first", MODEL, "system", 1, "1")
+    cache.put("second", MODEL, "system", 1, "2")
+    conn = sqlite3.connect(cache.db_name)
+    conn.execute("UPDATE ai_response_cache SET last_used = last_used - 100")
+    conn.commit()
+    conn.close()
+    assert cache.get("first", MODEL, "system", 1) == "1"
+
+    cache.put("third", MODEL, "system", 1, "3")
+    assert cache.get("second", MODEL, "system", 1) is None
+    assert cache.get("first", MODEL, "system", 1) == "1"
+    assert cache.get("third", MODEL, "system", 1) == "3"
@@ -0,0 +1,63 @@
+import os
+
+from frontend.chart_cache import ChartCache
+
+REQUEST = {"metric": "RSV_Rate", "chart_type": "trend", "start": "2022-01-01", "end": "2022-12-31"}
+PAYLOAD = {"figure": {"data": [], "layout": {}}, "title": "RSV"}
+
+
+def test_miss_then_memory_hit(tmp_path):
+    cache = ChartCache(tmp_path)
+    assert cache.get(REQUEST, 1) is None
+    cache.put(REQUEST, 1, PAYLOAD)
+    assert cache.get(REQUEST, 1) == PAYLOAD
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["memory_hits"] == 1
+
+
+def test_disk_hit_from_a_new_instance(tmp_path):
+    ChartCache(tmp_path).put(REQUEST, 1, PAYLOAD)
+    cache = ChartCache(tmp_path)
+    assert cache.get(REQUEST, 1) == PAYLOAD
+    assert cache.stats()["disk_hits"] == 1
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".partial")]
+
+
+def test_key_ignores_dict_order_but_not_generation():
+    reordered = dict(reversed(list(REQUEST.items())))
+    assert ChartCache.make_key(REQUEST, 1) == ChartCache.make_key(reordered, 1)
+    assert ChartCache.make_key(REQUEST, 1) != ChartCache.make_key(REQUEST, 2)
+
+
+def test_new_generation_drops_old_entries(tmp_path):
+    cache = ChartCache(tmp_path)
+    cache.put(REQUEST, 1, PAYLOAD)
+    cache.put({"metric": "COVID_Cases"}, 2, PAYLOAD)
+    assert cache.get(REQUEST, 1) is None
+    assert all(name.startswith("g2_") for name in os.listdir(tmp_path))
+
+
+def test_memory_lru_and_disk_trim(tmp_path):
+    cache = ChartCache(tmp_path, max_memory_entries=2, max_disk_entries=3)
+    for i in range(5):
+        cache.put({"metric": "RSV_Rate", "page": i}, 1, {"i": i})
+        os.utime(os.path.join(tmp_path, ChartCache.make_key({"metric": "RSV_Rate", "page": i}, 1) + ".json"),
+                 (i + 1, i + 1))
+    assert cache.stats()["memory_entries"] == 2
+    assert len(os.listdir(tmp_path)) == 3
+    # The oldest entries were trimmed from disk as well as memory
+    assert cache.get({"metric": "RSV_Rate", "page": 0}, 1) is None
+    assert cache.get({"metric": "RSV_Rate", "page": 4}, 1) == {"i": 4}
+
+
+def test_get_or_build_builds_once(tmp_path):
+    cache = ChartCache(tmp_path)
+    calls = []
+
+    def build():
+        calls.append(1)
+        return PAYLOAD
+
+    assert cache.get_or_build(REQUEST, 1, build) == PAYLOAD
+    assert cache.get_or_build(REQUEST, 1, build) == PAYLOAD
+    assert len(calls) == 1
@@ -0,0 +1,91 @@
+import json
+import os
+import time
+
+import pytest
+
+pytest.importorskip("PyQt6")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtCore import QPoint  # noqa: E402
+from PyQt6.QtWidgets import QApplication, QListView  # noqa: E402
+
+from frontend.chat_transcript import ChatHistoryStore, TranscriptModel, TranscriptView  # noqa: E402
+
+
+def settle():
+    """Let the view finish its (batched) layout"""
+    for _ in range(30):
+        QApplication.processEvents()
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def view(tmp_path):
+    """A TranscriptView over 300 saved messages of varying length"""
+    app = QApplication.instance() or QApplication([])
+    if not isinstance(app, QApplication):
+        pytest.skip("a QCoreApplication without widgets is already running")
+    path = tmp_path / "chat_history.jsonl"
+    with open(path, "w") as f:
+        for i in range(300):
+            role = "user" if i % 2 else "assistant"
+            f.write(json.dumps({"role": role, "text": f"Message {i} " + "word " * (i % 40)}) + "\n")
+    view = TranscriptView(TranscriptModel(ChatHistoryStore(str(path))))
+    view.resize(600, 500)
+    view.show()
+    settle()
+    yield view
+    view.close()
+    app.processEvents()
+
+
+def top_message(view):
+    return view.indexAt(QPoint(0, 0)).data().split(" ")[1]
+
+
+def test_batched_layout_and_cached_size_hints(view):
+    assert view.layoutMode() == QListView.LayoutMode.Batched
+    index = view.model().index(0)
+    first = view.delegate.sizeHint(None, index)
+    view.delegate.documents.clear()
+    assert view.delegate.sizeHint(None, index) is first
+
+
+def test_follows_streamed_output_at_the_bottom(view):
+    scroll_bar = view.verticalScrollBar()
+    model = view.model()
+    model.start_streaming()
+    for i in range(10):
+        model.update_streaming("streamed words " * (20 * i))
+        settle()
+        assert scroll_bar.value() == scroll_bar.maximum()
+    model.finish_streaming()
+
+
+def test_reading_earlier_messages_stays_put_while_an_answer_streams(view):
+    scroll_bar = view.verticalScrollBar()
+    scroll_bar.setValue(scroll_bar.maximum() - 1500)
+    settle()
+    index = view.indexAt(QPoint(0, 0))
+    top = view.visualRect(index).top()
+
+    model = view.model()
+    model.start_streaming()
+    for i in range(10):
+        model.update_streaming("streamed words " * (20 * i))
+        settle()
+    model.finish_streaming()
+    settle()
+    assert view.visualRect(index).top() == top
+
+
+def test_older_history_loads_above_the_visible_messages(view):
+    scroll_bar = view.verticalScrollBar()
+    scroll_bar.setValue(1)
+    settle()
+    shown = top_message(view)
+    scroll_bar.setValue(0)
+    settle()
+    assert view.model().rowCount() == 100
+    assert top_message(view) == shown
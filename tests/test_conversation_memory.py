@@ -0,0 +1,55 @@
+from Backend.ai_digest import estimate_tokens
+from Backend.conversation_memory import ConversationMemory, gist
+
+
+def test_gist_strips_markdown_and_keeps_the_first_sentence():
+    assert gist("**RSV** is a virus. It is common.") == "RSV is a virus."
+    assert gist(" ".join(["word"] * 40), max_words=5) == "word word word word word..."
+
+
+def test_short_conversation_is_kept_verbatim():
+    memory = ConversationMemory(token_budget=1000)
+    memory.add_exchange("What is RSV?", "A respiratory virus.")
+    assert memory.messages() == [
+        {"role": "user", "content": "What is RSV?"},
+        {"role": "assistant", "content": "A respiratory virus."}
+    ]
+
+
+def test_old_turns_are_folded_into_the_summary():
+    memory = ConversationMemory(token_budget=60, summary_budget=1000)
+    for i in range(5):
+        memory.add_exchange(f"Question {i}? " + "x" * 80, f"Answer {i}. " + "y" * 80)
+
+    # Each exchange is about 50 tokens, so only the latest one fits
+    assert len(memory.turns) == 2
+    assert memory.turns[0]["content"].startswith("Question 4?")
+    assert len(memory.summary_lines) == 4
+    summary = memory.messages()[0]
+    assert summary["role"] == "system"
+    assert "User asked: Question 0?" in summary["content"]
+    assert "Assistant answered: Answer 0." in summary["content"]
+
+
+def test_latest_exchange_survives_even_over_budget():
+    memory = ConversationMemory(token_budget=5)
+    memory.add_exchange("First question?", "First answer.")
+    memory.add_exchange("Second question? " + "z" * 200, "Second answer.")
+    assert [turn["content"] for turn in memory.turns] == ["Second question? " + "z" * 200, "Second answer."]
+
+
+def test_summary_drops_its_oldest_lines():
+    memory = ConversationMemory(token_budget=1, summary_budget=30)
+    for i in range(10):
+        memory.add_exchange(f"Question {i}?", f"Answer {i}.")
+    assert len(memory.summary_lines) >= 1
+    assert "Question 8?" in memory.summary_lines[-1]
+    assert len(memory.summary_lines) == 1 or estimate_tokens("\n".join(memory.summary_lines)) <= 30
+
+
+def test_clear():
+    memory = ConversationMemory(token_budget=1)
+    memory.add_exchange("a?", "b.")
+    memory.add_exchange("c?", "d.")
+    memory.clear()
+    assert memory.messages() == []
@@ -0,0 +1,61 @@
+import sqlite3
+
+import numpy as np
+import pytest
+
+from Backend.derived_metrics import STATE_POPULATIONS, get_derived_metrics
+from Backend.main import insert_state_metrics
+
+
+def test_rates_counts_rolling_and_growth(health_db):
+    frame = get_derived_metrics("RSV_Rate", db_name=health_db)
+    texas = frame[frame["state"] == "Texas"].reset_index(drop=True)
+
+    assert list(texas["metric_value"]) == [2.0, 3.0, 4.0, 5.0, 6.0]
+    assert texas["estimated_count"][0] == pytest.approx(2.0 * STATE_POPULATIONS["Texas"] / 100000)
+    # Weeks: 2022-01-01, 01-08, 02-05, 2023-01-07, 01-14; windows and growth follow the dates
+    assert list(texas["rolling_4wk"]) == [2.0, 2.5, 4.0, 5.0, 5.5]
+    assert texas["wow_growth"][1] == pytest.approx(0.5)
+    assert texas["wow_growth"][4] == pytest.approx(0.2)
+    assert np.isnan(texas["wow_growth"][[0, 2, 3]]).all()
+
+
+def test_duplicate_and_stratified_rows_collapse_per_week(health_db):
+    # A second download of the same weeks, plus two strata rows for one week
+    insert_state_metrics([("Texas", 2.0, "2022-01-01"), ("Texas", 3.0, "2022-01-08")], "RSV_Rate", health_db)
+    insert_state_metrics([("Texas", 4.0, "2022-01-15"), ("Texas", 6.0, "2022-01-15")], "RSV_Rate", health_db)
+    frame = get_derived_metrics("RSV_Rate", db_name=health_db)
+    texas = frame[frame["state"] == "Texas"].set_index("week_date")
+
+    assert texas.index.is_unique
+    assert texas.loc["2022-01-15", "metric_value"] == 5.0
+    assert texas.loc["2022-01-08", "wow_growth"] == pytest.approx(0.5)
+    assert texas.loc["2022-01-15", "wow_growth"] == pytest.approx(5.0 / 3.0 - 1)
+    assert texas.loc["2022-01-15", "rolling_4wk"] == pytest.approx((2.0 + 3.0 + 5.0) / 3)
+
+
+def test_cached_per_generation(health_db):
+    first = get_derived_metrics("RSV_Rate", db_name=health_db)
+    assert get_derived_metrics("RSV_Rate", db_name=health_db) is first
+
+    insert_state_metrics([("Texas", 7.0, "2023-01-21")], "RSV_Rate", health_db)
+    assert get_derived_metrics("RSV_Rate", db_name=health_db) is not first
+
+
+def test_rsv_chart_reads_the_cache(health_db):
+    pytest.importorskip("plotly")
+    from Backend.charts import build_rsv_figure
+
+    conn = sqlite3.connect(health_db)
+    try:
+        weekly = build_rsv_figure(conn, "2022-01-05", "2023-12-31")
+        monthly = build_rsv_figure(conn, "2022-01-01", "2023-12-31", "monthly")
+    finally:
+        conn.close()
+
+    bars = dict(zip(weekly.data[0].x, weekly.data[0].y))
+    assert weekly.data[0].customdata[0] == "2022-01-08"
+    assert bars["Texas"] == pytest.approx(3.0 * STATE_POPULATIONS["Texas"] / 100000)
+    # Monthly: the January 2022 weeks averaged
+    bars = dict(zip(monthly.data[0].x, monthly.data[0].y))
+    assert bars["Texas"] == pytest.approx(2.5 * STATE_POPULATIONS["Texas"] / 100000)
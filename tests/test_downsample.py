@@ -0,0 +1,43 @@
+import numpy as np
+
+from Backend.downsample import lttb, lttb_indices
+
+
+def test_short_series_is_kept():
+    assert list(lttb_indices([0, 1, 2], [5, 6, 7], 10)) == [0, 1, 2]
+    assert list(lttb_indices(range(10), range(10), 2)) == list(range(10))
+
+
+def test_keeps_endpoints_and_count():
+    x = np.arange(1000)
+    y = np.sin(x / 50)
+    indices = lttb_indices(x, y, 100)
+    assert len(indices) == 100
+    assert indices[0] == 0 and indices[-1] == 999
+    assert np.all(np.diff(indices) > 0)
+
+
+def test_keeps_spikes():
+    x = np.arange(500)
+    y = np.zeros(500)
+    y[123] = 50
+    y[321] = -40
+    indices = lttb_indices(x, y, 20)
+    assert 123 in indices
+    assert 321 in indices
+
+
+def test_one_point_per_bucket():
+    n, threshold = 1000, 50
+    indices = lttb_indices(np.arange(n), np.random.default_rng(0).random(n), threshold)
+    edges = np.floor(np.linspace(1, n - 1, threshold - 1)).astype(int)
+    for i, index in enumerate(indices[1:-1]):
+        assert edges[i] <= index < edges[i + 1]
+
+
+def test_lttb_returns_points():
+    x = np.linspace(0, 1, 300)
+    y = x ** 2
+    xs, ys = lttb(x, y, 30)
+    assert len(xs) == len(ys) == 30
+    assert np.allclose(ys, xs ** 2)
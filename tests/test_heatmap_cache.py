@@ -0,0 +1,83 @@
+import os
+
+from Backend import heatmap_cache
+from Backend.heatmap_cache import HeatmapCache
+from Backend.main import insert_state_metrics
+
+
+def test_generate_then_lookup(health_db, tmp_path):
+    cache = HeatmapCache(cache_dir=tmp_path / "cache", db_name=health_db, mode="browser")
+    assert cache.lookup("RSV", "2023") is None
+
+    path = cache.generate("RSV", "2023")
+    assert path is not None and os.path.exists(path)
+    assert cache.lookup("RSV", "2023") == path
+    assert not [name for name in os.listdir(cache.cache_dir) if ".partial." in name]
+
+
+def test_raster_entry_is_one_self_contained_page(health_db, tmp_path):
+    cache = HeatmapCache(cache_dir=tmp_path / "cache", db_name=health_db, mode="raster")
+    path = cache.generate("RSV", "2023")
+    assert os.listdir(cache.cache_dir) == [os.path.basename(path)]
+    with open(path) as f:
+        assert "data:image/png;base64," in f.read()
+
+
+def test_new_generation_is_a_miss(health_db, tmp_path):
+    cache = HeatmapCache(cache_dir=tmp_path / "cache", db_name=health_db, mode="browser")
+    old_path = cache.get("RSV", "2023")
+
+    insert_state_metrics([("Texas", 9.0, "2023-01-21")], "RSV_Rate", health_db)
+    assert cache.lookup("RSV", "2023") is None
+    new_path = cache.get("RSV", "2023")
+    assert new_path != old_path
+
+
+def test_stale_generations_are_evicted_first(health_db, tmp_path):
+    cache = HeatmapCache(cache_dir=tmp_path / "cache", db_name=health_db, mode="browser")
+    stale = cache.get("RSV", "2022")
+    insert_state_metrics([("Texas", 9.0, "2023-01-21")], "RSV_Rate", health_db)
+    current_2022 = cache.get("RSV", "2022")
+
+    # Room for one entry: the stale one goes, the entry just written stays
+    cache.max_bytes = os.path.getsize(current_2022)
+    cache._evict(keep=current_2022)
+    assert not os.path.exists(stale)
+    assert os.path.exists(current_2022)
+
+
+def test_least_recently_used_is_evicted(health_db, tmp_path):
+    cache = HeatmapCache(cache_dir=tmp_path / "cache", db_name=health_db, mode="browser")
+    first = cache.get("RSV", "2022")
+    os.utime(first, (1, 1))
+    second = cache.get("RSV", "2023")
+
+    cache.max_bytes = os.path.getsize(second)
+    cache._evict(keep=second)
+    assert not os.path.exists(first)
+    assert os.path.exists(second)
+
+
+def test_publish_is_atomic(health_db, tmp_path, monkeypatch):
+    cache = HeatmapCache(cache_dir=tmp_path / "cache", db_name=health_db, mode="browser")
+    final_path = cache.path_for("RSV", "2023")
+    seen = {}
+
+    def fake_render(metric_type, period, output_file, **kwargs):
+        seen["output_file"] = output_file
+        seen["published_while_rendering"] = os.path.exists(final_path)
+        with open(output_file, "w") as f:
+            f.write("<html></html>")
+        return output_file
+
+    monkeypatch.setattr(heatmap_cache, "generate_heatmap_html", fake_render)
+    assert cache.generate("RSV", "2023") == final_path
+    assert seen["output_file"] != final_path
+    assert not seen["published_while_rendering"]
+    assert not os.path.exists(seen["output_file"])
+
+
+def test_no_data_publishes_nothing(health_db, tmp_path):
+    cache = HeatmapCache(cache_dir=tmp_path / "cache", db_name=health_db, mode="browser")
+    assert cache.generate("RSV", "1999") is None
+    assert os.listdir(cache.cache_dir) == []
@@ -0,0 +1,55 @@
+import markdown
+
+from frontend.markdown_stream import IncrementalMarkdown, split_blocks
+
+
+def test_paragraphs_split_on_blank_lines():
+    text = "First paragraph.\n\nSecond paragraph.\n"
+    assert split_blocks(text) == ["First paragraph.\n\n", "Second paragraph.\n"]
+
+
+def test_blocks_join_back_to_the_text():
+    text = "# Title\n\nSome text\nmore text\n\n- a\n- b\n\nEnd"
+    assert "".join(split_blocks(text)) == text
+
+
+def test_partial_last_line_stays_open():
+    # "1" could still become "1. item", so it must not start a new block yet
+    assert split_blocks("Intro.\n\n1") == ["Intro.\n\n1"]
+    assert split_blocks("Intro.\n\n1. item\n") == ["Intro.\n\n", "1. item\n"]
+
+
+def test_loose_list_is_one_block():
+    text = "- one\n\n- two\n\n- three\n"
+    assert split_blocks(text) == [text]
+
+
+def test_fenced_code_with_blank_lines_is_one_block():
+    code = "```\nx = 1\n\ny = 2\n```\n"
+    assert split_blocks("Code:\n\n" + code + "\nAfter.\n") == ["Code:\n\n", code + "\n", "After.\n"]
+
+
+def test_indented_continuation_stays_in_block():
+    text = "- item\n\n    more of the item\n"
+    assert split_blocks(text) == [text]
+
+
+def test_incremental_matches_full_render():
+    text = "**RSV** is common.\n\n- Most recover\n- Infants are at risk\n\n```\ncode\n```\n\nDone."
+    renderer = IncrementalMarkdown()
+    for end in range(1, len(text) + 1):
+        html = renderer.feed(text[:end])
+    assert html == "\n".join(markdown.markdown(block) for block in split_blocks(text))
+
+
+def test_closed_blocks_render_once():
+    calls = []
+
+    def render(block):
+        calls.append(block)
+        return block
+
+    renderer = IncrementalMarkdown(render=render)
+    renderer.feed("One.\n\nTwo\n")
+    renderer.feed("One.\n\nTwo\nmore")
+    assert calls.count("One.\n\n") == 1
@@ -0,0 +1,51 @@
+import sqlite3
+
+import pytest
+
+from Backend.main import insert_state_metrics
+from Backend.metric_queries import get_date_bounds, query_metric_range
+
+
+@pytest.fixture
+def conn(health_db):
+    conn = sqlite3.connect(health_db)
+    yield conn
+    conn.close()
+
+
+def test_date_bounds(conn):
+    assert get_date_bounds(conn, "RSV_Rate") == ("2022-01-01", "2023-01-14")
+    # Positivity rows are 'Past 4 Weeks', with no week_date
+    assert get_date_bounds(conn, "COVID_Positivity") == (None, None)
+
+
+def test_weekly_rows_in_range(conn):
+    rows = query_metric_range(conn, "RSV_Rate", "2022-01-01", "2022-01-08", states=["Texas"])
+    assert rows == [("Texas", "2022-01-01", 2.0), ("Texas", "2022-01-08", 3.0)]
+
+
+def test_monthly_buckets_average_the_weeks(conn):
+    rows = query_metric_range(conn, "RSV_Rate", "2022-01-01", "2023-12-31", "monthly", states=["Colorado"])
+    assert rows == [("Colorado", "2022-01-01", 1.5), ("Colorado", "2022-02-01", 3.0),
+                    ("Colorado", "2023-01-01", 4.5)]
+
+
+def test_range_is_inclusive_and_ordered(conn):
+    rows = query_metric_range(conn, "RSV_Rate", "2022-02-05", "2023-01-07")
+    assert [row[1] for row in rows] == ["2022-02-05"] * 3 + ["2023-01-07"] * 3
+    assert [row[0] for row in rows[:3]] == sorted(row[0] for row in rows[:3])
+
+
+def test_unknown_granularity(conn):
+    with pytest.raises(ValueError):
+        query_metric_range(conn, "RSV_Rate", "2022-01-01", "2022-12-31", "daily")
+
+
+def test_weekly_rows_collapse_duplicates_and_strata(health_db):
+    insert_state_metrics([("Texas", 2.0, "2022-01-01"), ("Texas", 4.0, "2022-01-08")], "RSV_Rate", health_db)
+    conn = sqlite3.connect(health_db)
+    try:
+        rows = query_metric_range(conn, "RSV_Rate", "2022-01-01", "2022-01-08", states=["Texas"])
+    finally:
+        conn.close()
+    assert rows == [("Texas", "2022-01-01", 2.0), ("Texas", "2022-01-08", 3.5)]
@@ -0,0 +1,38 @@
+import sqlite3
+
+from Backend.db import get_data_generation, get_metric_snapshot
+from Backend.main import insert_state_metrics
+
+
+def test_snapshot_averages_each_states_latest_scrape(health_db):
+    # A second scrape of the same 'Past 4 Weeks' period replaces Texas' value
+    insert_state_metrics([("Texas", 11.0, "Past 4 Weeks")], "COVID_Positivity", health_db)
+    values, generation = get_metric_snapshot(health_db)
+    assert values["COVID_Positivity"] == (5.0 + 11.0 + 5.0) / 3
+    assert values["COVID_Deaths"] == 0.0
+    assert generation == get_data_generation(health_db)
+
+
+def test_snapshot_is_written_with_the_data(health_db):
+    conn = sqlite3.connect(health_db)
+    try:
+        rows = conn.execute("SELECT metric_type, generation FROM metric_snapshot").fetchall()
+    finally:
+        conn.close()
+    assert ("COVID_Positivity", get_data_generation(health_db)) in rows
+
+
+def test_reading_a_stale_snapshot_does_not_write(health_db):
+    conn = sqlite3.connect(health_db)
+    conn.execute("UPDATE metric_snapshot SET generation = -1, metric_value = 99")
+    conn.commit()
+    conn.close()
+
+    values, _ = get_metric_snapshot(health_db)
+    assert values["COVID_Positivity"] == 5.0
+
+    conn = sqlite3.connect(health_db)
+    try:
+        assert conn.execute("SELECT DISTINCT generation FROM metric_snapshot").fetchall() == [(-1,)]
+    finally:
+        conn.close()
@@ -0,0 +1,165 @@
+import json
+import os
+import threading
+import time
+import urllib.request
+
+import pytest
+
+from Backend import ollama_client
+from Backend.ollama_stub import CANNED_ANSWER, parse_keep_alive, serve
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    """Start the stub on a free port and point the shared Ollama client at it"""
+    servers = []
+
+    def start(load_seconds=0.0, tokens_per_second=500.0):
+        server = serve(port=0, load_seconds=load_seconds, tokens_per_second=tokens_per_second)
+        servers.append(server)
+        monkeypatch.setattr(ollama_client, "OLLAMA_HOST", f"http://127.0.0.1:{server.server_address[1]}")
+        monkeypatch.setattr(ollama_client, "_client", None)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_parse_keep_alive():
+    assert parse_keep_alive("30m") == 1800
+    assert parse_keep_alive("1h") == 3600
+    assert parse_keep_alive("45s") == 45
+    assert parse_keep_alive(10) == 10
+    assert parse_keep_alive(-1) == float("inf")
+    assert parse_keep_alive(None, default=5) == 5
+
+
+def test_version_and_tags(stub):
+    server = stub()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    with urllib.request.urlopen(f"{base}/api/version") as response:
+        assert json.load(response)["version"].endswith("stub")
+    with urllib.request.urlopen(f"{base}/api/tags") as response:
+        assert json.load(response)["models"][0]["name"] == ollama_client.MODEL_NAME
+
+
+def test_stream_chat_answer_and_metrics(stub):
+    stub()
+    metrics = {}
+    answer = "".join(ollama_client.stream_chat([{"role": "user", "content": "What is RSV?"}], metrics))
+    assert answer == CANNED_ANSWER
+    assert metrics["tokens"] == len(CANNED_ANSWER.split(" "))
+    assert metrics["tokens_per_second"] > 0
+    assert 0 <= metrics["time_to_first_token"] <= metrics["total_seconds"]
+
+
+def test_warm_up_loads_the_model_once(stub):
+    stub(load_seconds=0.3)
+    assert ollama_client.warm_up() >= 0.3
+
+    metrics = {}
+    list(ollama_client.stream_chat([{"role": "user", "content": "hi"}], metrics))
+    assert metrics["time_to_first_token"] < 0.3
+
+
+def test_non_streaming_chat(stub):
+    stub()
+    response = ollama_client.get_client().chat(model=ollama_client.MODEL_NAME,
+                                               messages=[{"role": "user", "content": "hi"}], stream=False)
+    assert response["message"]["content"] == CANNED_ANSWER
+    assert response["done"]
+
+
+def test_first_request_after_start_waits_for_the_load(stub):
+    stub(load_seconds=0.3)
+    start = time.perf_counter()
+    list(ollama_client.stream_chat([{"role": "user", "content": "hi"}], {}))
+    assert time.perf_counter() - start >= 0.3
+
+
+def test_cancel_during_model_load_returns_promptly(stub):
+    stub(load_seconds=2.0)
+    cancelled = threading.Event()
+    threading.Timer(0.2, cancelled.set).start()
+
+    start = time.perf_counter()
+    metrics = {}
+    chunks = list(ollama_client.stream_chat([{"role": "user", "content": "hi"}], metrics, cancelled=cancelled))
+    assert time.perf_counter() - start < 1.0
+    assert chunks == [] and metrics == {}
+
+
+def test_closing_the_stream_stops_the_reader(stub, monkeypatch):
+    stub(tokens_per_second=50.0)
+    # Note this request's reader thread, so other tests' streams don't matter
+    readers = []
+    read_chunks = ollama_client._read_chunks
+
+    def recording_reader(*args):
+        readers.append(threading.current_thread())
+        read_chunks(*args)
+
+    monkeypatch.setattr(ollama_client, "_read_chunks", recording_reader)
+    chunks = ollama_client.stream_chat([{"role": "user", "content": "hi"}], {})
+    assert next(chunks)
+    chunks.close()
+
+    readers[0].join(timeout=2)
+    assert not readers[0].is_alive()
+
+
+def test_worker_stop_during_model_load(stub, monkeypatch):
+    pytest.importorskip("PyQt6")
+    monkeypatch.setenv("QT_QPA_PLATFORM", os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+    from PyQt6.QtCore import QCoreApplication
+    from frontend.pages import ai_assistant
+
+    stub(load_seconds=2.0)
+    monkeypatch.setattr(ai_assistant, "build_prompt_context", lambda prompt: "")
+    app = QCoreApplication.instance() or QCoreApplication([])
+    worker = ai_assistant.AIAssistantWorker()
+    worker.start()
+    worker.submit("What is RSV?")
+    time.sleep(0.3)
+
+    start = time.perf_counter()
+    worker.stop()
+    assert time.perf_counter() - start < 1.0
+    assert worker.isFinished()
+    app.processEvents()
+
+
+def test_late_cancel_does_not_stop_the_next_job(monkeypatch):
+    pytest.importorskip("PyQt6")
+    monkeypatch.setenv("QT_QPA_PLATFORM", os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+    from PyQt6.QtCore import QCoreApplication
+    from frontend.pages import ai_assistant
+
+    started, results = [], []
+
+    def answer(prompt):
+        started.append(prompt)
+        results.append((prompt, worker.cancelled.wait(0.5)))
+
+    app = QCoreApplication.instance() or QCoreApplication([])
+    worker = ai_assistant.AIAssistantWorker()
+    monkeypatch.setattr(worker, "answer", answer)
+    first = worker.submit("first")
+    worker.submit("second")
+    worker.start()
+
+    deadline = time.monotonic() + 2
+    while not started and time.monotonic() < deadline:
+        time.sleep(0.01)
+    worker.cancel(first)
+    while len(started) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    # A second Stop for the first job, arriving after the next one started
+    worker.cancel(first)
+    time.sleep(0.6)
+    worker.stop()
+    app.processEvents()
+    assert results == [("first", True), ("second", False)]
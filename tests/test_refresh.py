@@ -0,0 +1,46 @@
+import subprocess
+import sys
+
+import pytest
+
+from Backend import main as backend
+from Backend.cli import main as cli_main
+
+
+def fail():
+    raise RuntimeError("site unreachable")
+
+
+def offline(monkeypatch, tmp_path):
+    """Run back_main against an empty database in tmp_path, with the scrapers replaced"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(backend, "scrape_cdc_covid_data", fail)
+    monkeypatch.setattr(backend, "add_cases_to_db", lambda: [])
+    monkeypatch.setattr(backend, "download_rsv_data", lambda: None)
+
+
+def test_a_failing_stage_does_not_stop_the_rest(monkeypatch, tmp_path):
+    offline(monkeypatch, tmp_path)
+    stages = []
+    failed = backend.back_main(progress=stages.append, check_model=False)
+
+    assert failed == ["Scraping CDC COVID data"]
+    assert stages == ["Preparing database", "Scraping CDC COVID data", "Updating Worldometers cases",
+                      "Downloading RSV data", "Updating state centroids", "Building AI data digest",
+                      "Cleaning up"]
+
+
+def test_cli_refresh_reports_failed_stages(monkeypatch, tmp_path, capsys):
+    offline(monkeypatch, tmp_path)
+    assert cli_main(["refresh", "--skip-model-check"]) == 1
+    output = capsys.readouterr().out
+    assert "== Scraping CDC COVID data" in output
+    assert "Failed stages: Scraping CDC COVID data" in output
+
+
+def test_export_does_not_import_the_gui():
+    pytest.importorskip("plotly")
+    code = ("import sys, report; "
+            "print(sorted(m for m in sys.modules if m.split('.')[0] in ('frontend', 'PyQt6')))")
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert output.strip() == "[]"